@@ -1,11 +1,23 @@
 -- Basic schema
 
+-- Триграммный поиск по OSDR (/osdr/list?search=)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Секционирована по суткам fetched_at; секции создает и удаляет backend
 CREATE TABLE IF NOT EXISTS iss_fetch_log (
-    id BIGSERIAL PRIMARY KEY,
+    id BIGSERIAL,
     fetched_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     source_url TEXT NOT NULL,
-    payload JSONB NOT NULL
-);
+    payload JSONB NOT NULL,
+    latitude DOUBLE PRECISION,
+    longitude DOUBLE PRECISION,
+    velocity DOUBLE PRECISION,
+    altitude DOUBLE PRECISION,
+    PRIMARY KEY (id, fetched_at)
+) PARTITION BY RANGE (fetched_at);
+
+-- Строки суток без своей секции (секции создаются заранее, это страховка)
+CREATE TABLE IF NOT EXISTS iss_fetch_log_default PARTITION OF iss_fetch_log DEFAULT;
 
 CREATE TABLE IF NOT EXISTS osdr_items (
     id BIGSERIAL PRIMARY KEY,
@@ -27,8 +39,32 @@ BEGIN
                    WHERE table_name='osdr_items' AND column_name='rest_url') THEN
         ALTER TABLE osdr_items ADD COLUMN rest_url TEXT;
     END IF;
+    IF NOT EXISTS (SELECT 1 FROM information_schema.columns 
+                   WHERE table_name='osdr_items' AND column_name='content_hash') THEN
+        ALTER TABLE osdr_items ADD COLUMN content_hash TEXT;
+    END IF;
 END $$;
 
+-- Полнотекстовый и триграммный поиск по OSDR
+ALTER TABLE osdr_items ADD COLUMN IF NOT EXISTS search_text TEXT
+    GENERATED ALWAYS AS (
+        lower(
+            coalesce(dataset_id, '') || ' ' ||
+            coalesce(title, '') || ' ' ||
+            coalesce(status, '') || ' ' ||
+            coalesce(raw->>'description', '') || ' ' ||
+            coalesce(raw->>'accession', '')
+        )
+    ) STORED;
+ALTER TABLE osdr_items ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(dataset_id, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(raw->>'accession', '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(raw->>'description', '')), 'C') ||
+        setweight(to_tsvector('simple', coalesce(status, '')), 'D')
+    ) STORED;
+
 CREATE TABLE IF NOT EXISTS telemetry_legacy (
     id BIGSERIAL PRIMARY KEY,
     recorded_at TIMESTAMPTZ NOT NULL,
@@ -53,11 +89,83 @@ CREATE TABLE IF NOT EXISTS cms_blocks (
     updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 
+-- Версия каталога OSDR: увеличивается при каждом изменении osdr_items,
+-- из нее /osdr/list строит ETag и Last-Modified без чтения строк
+CREATE TABLE IF NOT EXISTS osdr_catalog (
+    id SMALLINT PRIMARY KEY CHECK (id = 1),
+    version BIGINT NOT NULL DEFAULT 0,
+    modified_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+INSERT INTO osdr_catalog(id, version)
+SELECT 1, CASE WHEN EXISTS (SELECT 1 FROM osdr_items) THEN 1 ELSE 0 END
+ON CONFLICT (id) DO NOTHING;
+
+-- Универсальный кэш космических данных; content_hash - хэш payload для
+-- пропуска записи неизменившегося содержимого
+CREATE TABLE IF NOT EXISTS space_cache (
+    id BIGSERIAL PRIMARY KEY,
+    source TEXT NOT NULL,
+    fetched_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    payload JSONB NOT NULL,
+    content_hash TEXT
+);
+ALTER TABLE space_cache ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+-- Сближения NEO, развернутые из NeoWs feed при сохранении
+CREATE TABLE IF NOT EXISTS neo_approaches (
+    id BIGSERIAL PRIMARY KEY,
+    neo_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    approach_at TIMESTAMPTZ NOT NULL,
+    orbiting_body TEXT,
+    miss_distance_km DOUBLE PRECISION,
+    velocity_kmh DOUBLE PRECISION,
+    diameter_m DOUBLE PRECISION,
+    is_hazardous BOOLEAN NOT NULL DEFAULT FALSE,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    UNIQUE (neo_id, approach_at)
+);
+
+-- Объекты NeoWs feed по календарным дням (прошедшие дни не перезапрашиваются)
+CREATE TABLE IF NOT EXISTS neo_feed_days (
+    day DATE PRIMARY KEY,
+    objects JSONB NOT NULL,
+    fetched_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- События DONKI (солнечные вспышки FLR и CME) по activity ID
+CREATE TABLE IF NOT EXISTS donki_events (
+    id BIGSERIAL PRIMARY KEY,
+    activity_id TEXT NOT NULL UNIQUE,
+    event_type TEXT NOT NULL,
+    start_at TIMESTAMPTZ NOT NULL,
+    peak_at TIMESTAMPTZ,
+    end_at TIMESTAMPTZ,
+    class_type TEXT,
+    source_location TEXT,
+    active_region_num INTEGER,
+    linked_activity_ids TEXT[] NOT NULL DEFAULT '{}',
+    link TEXT,
+    payload JSONB NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
 -- Индексы для производительности
-CREATE INDEX IF NOT EXISTS idx_iss_fetch_log_fetched_at ON iss_fetch_log(fetched_at DESC);
+CREATE INDEX IF NOT EXISTS ix_iss_fetch_log_trend ON iss_fetch_log(fetched_at DESC, id DESC)
+    INCLUDE (latitude, longitude, velocity, altitude);
 CREATE INDEX IF NOT EXISTS idx_osdr_items_dataset_id ON osdr_items(dataset_id);
 CREATE INDEX IF NOT EXISTS idx_osdr_items_inserted_at ON osdr_items(inserted_at DESC);
+CREATE INDEX IF NOT EXISTS ix_osdr_items_inserted_at_id ON osdr_items(inserted_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS ix_osdr_items_search_vector ON osdr_items USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS ix_osdr_items_search_trgm ON osdr_items USING GIN (search_text gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_telemetry_legacy_recorded_at_id ON telemetry_legacy(recorded_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS ix_space_cache_source ON space_cache(source, fetched_at DESC);
 CREATE INDEX IF NOT EXISTS idx_cms_blocks_slug_active ON cms_blocks(slug, is_active);
+CREATE INDEX IF NOT EXISTS ix_neo_approaches_approach_at_id ON neo_approaches(approach_at, id);
+CREATE INDEX IF NOT EXISTS ix_neo_approaches_hazardous ON neo_approaches(approach_at, id) WHERE is_hazardous;
+CREATE INDEX IF NOT EXISTS ix_donki_events_type_start_id ON donki_events(event_type, start_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS ix_donki_events_start_id ON donki_events(start_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS ix_donki_events_linked ON donki_events USING GIN (linked_activity_ids);
 
 -- Seed с демо контентом
 INSERT INTO cms_pages(slug, title, body)
@@ -1,14 +1,14 @@
+from .base_client import BaseClient
 from .iss_client import IssClient
 from .osdr_client import OsdrClient
 from .jwst_client import JwstClient
-from .astronomy_client import AstronomyClient
 from .nasa_client import NasaClient
 
 __all__ = [
+    "BaseClient",
     "IssClient",
     "OsdrClient",
     "JwstClient",
-    "AstronomyClient",
     "NasaClient",
 ]
 
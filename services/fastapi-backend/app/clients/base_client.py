@@ -0,0 +1,148 @@
+import httpx
+import hashlib
+import json
+import logging
+from typing import Any, Optional
+from urllib.parse import urlencode, urlsplit
+from app.config.settings import settings
+from app.state.app_state import app_state
+from app.redis.rate_budget import rate_budget
+from app.clients.circuit_breaker import get_breaker
+from app.utils.errors import UpstreamError
+
+logger = logging.getLogger(__name__)
+
+# Коды UpstreamError, означающие недоступность хоста (а не ошибку запроса)
+OUTAGE_CODES = ("UPSTREAM_UNAVAILABLE", "UPSTREAM_HTTP_429", "UPSTREAM_CIRCUIT_OPEN")
+
+
+def is_outage(error: UpstreamError) -> bool:
+    """Ошибка из-за недоступности хоста: сеть, таймаут, 5xx, 429 или открытый breaker"""
+    return error.code in OUTAGE_CODES or error.code.startswith("UPSTREAM_HTTP_5")
+
+
+class BaseClient:
+    """
+    Базовый клиент внешних API поверх общего пула соединений AppState.
+    
+    Все ошибки запросов приводятся к UpstreamError (code - UPSTREAM_HTTP_<status>,
+    UPSTREAM_UNAVAILABLE для сетевых ошибок и таймаутов, UPSTREAM_CIRCUIT_OPEN,
+    если хост отключен circuit breaker-ом).
+    """
+    
+    def __init__(self):
+        self.timeout = settings.api_timeout
+    
+    async def _get(
+        self,
+        url: str,
+        params: Optional[dict[str, Any]] = None,
+        headers: Optional[dict[str, str]] = None,
+        budget: Optional[str] = None,
+    ) -> httpx.Response:
+        """
+        Выполнить GET запрос через пул соединений хоста.
+        
+        Запрос проходит через circuit breaker хоста: при открытом breaker
+        он сразу завершается CircuitOpenError. budget: ключ общего бюджета
+        запросов (см. rate_budget); если задан, перед запросом берется токен,
+        а X-RateLimit-Remaining из ответа обновляет остаток.
+        
+        Raises:
+            UpstreamError: ошибка запроса или недоступность хоста
+            RateBudgetExceeded: если бюджет исчерпан
+        """
+        breaker = get_breaker(url)
+        breaker.before_call()
+        host = breaker.host
+        try:
+            if budget:
+                await rate_budget.acquire(budget)
+            client = await app_state.get_http_client(url)
+            response = await client.get(url, params=params, headers=headers, timeout=self.timeout)
+        except httpx.TransportError as e:
+            breaker.record_failure()
+            raise UpstreamError(
+                detail=f"{host}: {type(e).__name__} {e}".strip(),
+                upstream_code="UPSTREAM_UNAVAILABLE",
+            ) from e
+        except BaseException:
+            breaker.release_probe()
+            raise
+        
+        if budget:
+            await self._observe_budget(budget, response)
+        if response.status_code >= 500 or response.status_code == 429:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        if response.is_error:
+            raise UpstreamError(
+                detail=f"{host}: HTTP {response.status_code}",
+                upstream_code=f"UPSTREAM_HTTP_{response.status_code}",
+            )
+        return response
+    
+    @staticmethod
+    async def _observe_budget(budget: str, response: httpx.Response):
+        """Передать бюджету остаток квоты из ответа"""
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        if remaining is not None:
+            try:
+                await rate_budget.observe(budget, int(remaining))
+            except ValueError:
+                pass
+        elif response.status_code == 429:
+            await rate_budget.observe(budget, 0)
+    
+    async def _get_json(
+        self,
+        url: str,
+        params: Optional[dict[str, Any]] = None,
+        headers: Optional[dict[str, str]] = None,
+        budget: Optional[str] = None,
+        stale_ok: bool = False,
+    ) -> Any:
+        """
+        Выполнить GET запрос и вернуть JSON.
+        
+        stale_ok: для вызовов, которые не сохраняют результат сами (ответ
+        отдается клиенту напрямую). Успешный ответ запоминается в Redis, а при
+        недоступности хоста (в том числе при открытом breaker) возвращается
+        последний удачный ответ на тот же запрос.
+        """
+        try:
+            response = await self._get(url, params=params, headers=headers, budget=budget)
+        except UpstreamError as e:
+            if stale_ok and is_outage(e):
+                stale = await self._load_stale(url, params)
+                if stale is not None:
+                    logger.warning(f"Serving last good response for {urlsplit(url).netloc}: {e.detail}")
+                    return stale
+            raise
+        
+        data = response.json()
+        if stale_ok:
+            await self._store_stale(url, params, response.text)
+        return data
+    
+    @staticmethod
+    def _stale_key(url: str, params: Optional[dict[str, Any]]) -> str:
+        query = urlencode(sorted((k, str(v)) for k, v in (params or {}).items() if k != "api_key"))
+        return "client:last:" + hashlib.sha256(f"{url}?{query}".encode()).hexdigest()
+    
+    async def _store_stale(self, url: str, params: Optional[dict[str, Any]], body: str):
+        try:
+            redis = await app_state.get_redis()
+            await redis.set(self._stale_key(url, params), body, ex=settings.client_stale_ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Could not store last good response: {e}")
+    
+    async def _load_stale(self, url: str, params: Optional[dict[str, Any]]) -> Any:
+        try:
+            redis = await app_state.get_redis()
+            body = await redis.get(self._stale_key(url, params))
+        except Exception as e:
+            logger.warning(f"Could not load last good response: {e}")
+            return None
+        return json.loads(body) if body is not None else None
@@ -0,0 +1,120 @@
+"""
+Circuit breaker для внешних API (по одному на хост).
+
+Breaker считает долю неудачных запросов в скользящем окне последних
+вызовов. Когда доля превышает порог, breaker открывается: запросы к хосту
+сразу завершаются CircuitOpenError, не дожидаясь api_timeout. По истечении
+паузы пропускается один пробный запрос (half-open): успех закрывает
+breaker, неудача открывает снова с удвоенной паузой (со случайным
+разбросом, чтобы воркеры не проверяли хост синхронно). Состояние хранится
+в памяти воркера.
+"""
+from app.state.app_state import app_state
+from app.utils.errors import UpstreamError
+from collections import deque
+from urllib.parse import urlsplit
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(UpstreamError):
+    """Хост временно отключен breaker-ом"""
+    
+    def __init__(self, host: str, retry_after: float):
+        self.host = host
+        self.retry_after = retry_after
+        super().__init__(
+            detail=f"{host} is unavailable, retry in {retry_after:.0f}s",
+            upstream_code="UPSTREAM_CIRCUIT_OPEN",
+        )
+
+
+class CircuitBreaker:
+    """Состояние доступности одного upstream хоста"""
+    
+    def __init__(self, host: str):
+        self.host = host
+        self.state = STATE_CLOSED
+        self._outcomes: deque[bool] = deque(maxlen=app_state.settings.breaker_window)
+        self._opened_count = 0
+        self._open_until = 0.0
+        self._probe_in_flight = False
+    
+    def before_call(self):
+        """
+        Проверить, можно ли выполнить запрос.
+        
+        Raises:
+            CircuitOpenError: если breaker открыт или пробный запрос уже выполняется
+        """
+        if self.state == STATE_CLOSED:
+            return
+        now = time.monotonic()
+        if self.state == STATE_OPEN and now >= self._open_until:
+            self.state = STATE_HALF_OPEN
+        if self.state == STATE_HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return
+        raise CircuitOpenError(self.host, max(self._open_until - now, 0.0))
+    
+    def release_probe(self):
+        """Пробный запрос не дошел до хоста (отмена, бюджет): пропустить следующий"""
+        self._probe_in_flight = False
+    
+    def record_success(self):
+        if self.state != STATE_CLOSED:
+            logger.info(f"Circuit for {self.host} closed")
+        self.state = STATE_CLOSED
+        self._probe_in_flight = False
+        self._opened_count = 0
+        self._outcomes.append(True)
+    
+    def record_failure(self):
+        if self.state == STATE_OPEN:
+            # Запрос, начатый до открытия breaker-а
+            return
+        if self.state == STATE_HALF_OPEN:
+            self._open()
+            return
+        self._outcomes.append(False)
+        settings = app_state.settings
+        failures = self._outcomes.count(False)
+        if (
+            len(self._outcomes) >= settings.breaker_min_calls
+            and failures / len(self._outcomes) >= settings.breaker_failure_ratio
+        ):
+            self._open()
+    
+    def _open(self):
+        """Открыть breaker с экспоненциальной паузой и jitter"""
+        settings = app_state.settings
+        self._opened_count += 1
+        pause = min(
+            settings.breaker_open_seconds * 2 ** (self._opened_count - 1),
+            settings.breaker_max_open_seconds,
+        )
+        pause = random.uniform(pause / 2, pause)
+        self.state = STATE_OPEN
+        self._open_until = time.monotonic() + pause
+        self._probe_in_flight = False
+        self._outcomes.clear()
+        logger.warning(f"Circuit for {self.host} opened for {pause:.0f}s")
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(url: str) -> CircuitBreaker:
+    """Breaker хоста из url (один на воркер)"""
+    host = urlsplit(url).netloc
+    breaker = _breakers.get(host)
+    if breaker is None:
+        breaker = _breakers[host] = CircuitBreaker(host)
+    return breaker
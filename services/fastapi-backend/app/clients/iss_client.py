@@ -1,19 +1,15 @@
-import httpx
 from typing import Any
 from app.config.settings import settings
+from app.clients.base_client import BaseClient
 
 
-class IssClient:
+class IssClient(BaseClient):
     """Клиент для API ISS (Where The ISS At)"""
     
     def __init__(self):
+        super().__init__()
         self.base_url = settings.where_iss_url
-        self.timeout = settings.api_timeout
     
     async def fetch_current_position(self) -> dict[str, Any]:
         """Получить текущую позицию МКС"""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(self.base_url)
-            response.raise_for_status()
-            return response.json()
-
+        return await self._get_json(self.base_url)
@@ -1,102 +1,91 @@
-import httpx
-from typing import Any
-from datetime import datetime, timedelta
+from typing import Any, Optional
+from datetime import date, datetime, timedelta
 from app.config.settings import settings
+from app.clients.base_client import BaseClient
+from app.redis.rate_budget import nasa_credential
 
+NASA_API_BASE = "https://api.nasa.gov"
+SPACEX_API_BASE = "https://api.spacexdata.com"
 
-class NasaClient:
+# Максимальная длина диапазона одного запроса NeoWs feed (дней включительно)
+NEO_FEED_MAX_DAYS = 7
+
+
+class NasaClient(BaseClient):
     """Клиент для различных NASA API (APOD, NEO, DONKI, SpaceX)"""
     
     def __init__(self):
+        super().__init__()
         self.api_key = settings.nasa_api_key
-        self.timeout = settings.api_timeout
+        # Все запросы к api.nasa.gov расходуют общую квоту ключа
+        self.budget = nasa_credential(self.api_key)
     
     async def fetch_apod(self) -> dict[str, Any]:
         """Получить Astronomy Picture of the Day"""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            url = "https://api.nasa.gov/planetary/apod"
-            params = {"thumbs": "true"}
-            if self.api_key:
-                params["api_key"] = self.api_key
-            
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
+        url = f"{NASA_API_BASE}/planetary/apod"
+        params = {"thumbs": "true"}
+        if self.api_key:
+            params["api_key"] = self.api_key
+        
+        return await self._get_json(url, params=params, budget=self.budget)
     
     async def fetch_neo_feed(self, days: int = 2) -> dict[str, Any]:
         """Получить данные о околоземных объектах (NEO)"""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            today = datetime.utcnow().date()
-            start_date = today - timedelta(days=days)
-            
-            url = "https://api.nasa.gov/neo/rest/v1/feed"
-            params = {
-                "start_date": start_date.isoformat(),
-                "end_date": today.isoformat(),
-            }
-            if self.api_key:
-                params["api_key"] = self.api_key
-            
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
+        today = datetime.utcnow().date()
+        return await self.fetch_neo_feed_range(today - timedelta(days=days), today)
+    
+    async def fetch_neo_feed_range(self, start_date: date, end_date: date) -> dict[str, Any]:
+        """Получить NEO feed за диапазон дат (не длиннее NEO_FEED_MAX_DAYS)"""
+        url = f"{NASA_API_BASE}/neo/rest/v1/feed"
+        params = {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+        }
+        if self.api_key:
+            params["api_key"] = self.api_key
+        
+        return await self._get_json(url, params=params, budget=self.budget)
     
-    async def fetch_donki_flr(self, days: int = 5) -> dict[str, Any]:
+    async def fetch_donki_flr(
+        self,
+        days: int = 5,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> list[dict[str, Any]]:
         """Получить данные о солнечных вспышках (FLR)"""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            today = datetime.utcnow().date()
-            start_date = today - timedelta(days=days)
-            
-            url = "https://api.nasa.gov/DONKI/FLR"
-            params = {
-                "startDate": start_date.isoformat(),
-                "endDate": today.isoformat(),
-            }
-            if self.api_key:
-                params["api_key"] = self.api_key
-            
-            try:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                if e.response.status_code == 403:
-                    return {"error": "Forbidden: Check API key and rate limits", "status_code": 403}
-                raise
-            except Exception as e:
-                return {"error": str(e)}
+        return await self._fetch_donki("FLR", days, start_date, end_date)
     
-    async def fetch_donki_cme(self, days: int = 5) -> dict[str, Any]:
+    async def fetch_donki_cme(
+        self,
+        days: int = 5,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> list[dict[str, Any]]:
         """Получить данные о выбросах корональной массы (CME)"""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            today = datetime.utcnow().date()
-            start_date = today - timedelta(days=days)
-            
-            url = "https://api.nasa.gov/DONKI/CME"
-            params = {
-                "startDate": start_date.isoformat(),
-                "endDate": today.isoformat(),
-            }
-            if self.api_key:
-                params["api_key"] = self.api_key
-            
-            try:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                if e.response.status_code == 403:
-                    # 403 Forbidden - возможно нужен API ключ или превышен лимит
-                    return {"error": "Forbidden: Check API key and rate limits", "status_code": 403}
-                raise
-            except Exception as e:
-                return {"error": str(e)}
+        return await self._fetch_donki("CME", days, start_date, end_date)
+    
+    async def _fetch_donki(
+        self,
+        kind: str,
+        days: int,
+        start_date: Optional[date],
+        end_date: Optional[date],
+    ) -> list[dict[str, Any]]:
+        """События DONKI за [start_date, end_date] (по умолчанию - последние days дней)"""
+        end_date = end_date or datetime.utcnow().date()
+        start_date = start_date or end_date - timedelta(days=days)
+        
+        url = f"{NASA_API_BASE}/DONKI/{kind}"
+        params = {
+            "startDate": start_date.isoformat(),
+            "endDate": end_date.isoformat(),
+        }
+        if self.api_key:
+            params["api_key"] = self.api_key
+        
+        return await self._get_json(url, params=params, budget=self.budget)
     
     async def fetch_spacex_next(self) -> dict[str, Any]:
         """Получить данные о следующем запуске SpaceX"""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            url = "https://api.spacexdata.com/v4/launches/next"
-            response = await client.get(url, timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
-
+        url = f"{SPACEX_API_BASE}/v4/launches/next"
+        return await self._get_json(url)
@@ -34,6 +34,100 @@ class Settings(BaseSettings):
     donki_every_seconds: int = 3600  # 1 hour
     spacex_every_seconds: int = 3600  # 1 hour
     
+    # Расписание по содержимому данных: APOD - после смены даты публикации,
+    # SpaceX - чаще по мере приближения запуска, NEO и DONKI - реже, пока данные не меняются
+    apod_publish_timezone: str = "America/New_York"
+    apod_publish_delay_seconds: int = 600
+    apod_retry_seconds: int = 1800  # дата прошла, а новая APOD еще не вышла
+    spacex_lead_ratio: float = 0.25  # следующий запрос через эту долю времени до запуска
+    spacex_min_seconds: int = 120
+    spacex_max_seconds: int = 21600
+    spacex_launch_grace_seconds: int = 3600
+    refresh_backoff_factor: float = 2.0
+    refresh_backoff_max_factor: float = 4.0  # предел задержки в интервалах задачи
+    
+    # Планировщик: параллелизм, разброс запусков и таймаут задачи
+    scheduler_max_concurrency: int = 3
+    scheduler_jitter_ratio: float = 0.1  # доля интервала
+    scheduler_max_jitter_seconds: int = 300
+    scheduler_job_timeout: int = 300
+    
+    # ISS: суточные секции iss_fetch_log, создаваемые заранее, и срок хранения
+    iss_partition_days_ahead: int = 7
+    iss_retention_days: int = 30  # 0 - хранить все
+    iss_partition_every_seconds: int = 3600
+    
+    # ISS: поток позиций /iss/stream (SSE)
+    iss_stream_replay_size: int = 30
+    iss_stream_queue_size: int = 32
+    iss_stream_heartbeat_seconds: int = 15
+    
+    # ISS: stale-while-revalidate для /iss/last и /iss/fetch
+    iss_stale_after_seconds: int = 180  # старше - фоновое обновление
+    iss_max_stale_seconds: int = 900  # старше - ждем обновление, но не дольше iss_refresh_wait_seconds
+    iss_refresh_wait_seconds: float = 2.0
+    iss_refresh_timeout_seconds: float = 15.0
+    
+    # ISS: прореживание /iss/trend при запросе по диапазону from/to
+    iss_trend_max_points: int = 500
+    iss_trend_max_points_cap: int = 5000
+    
+    # Circuit breaker внешних API (на хост) и последний удачный ответ для отдачи при сбое
+    breaker_window: int = 20  # последних запросов в окне
+    breaker_min_calls: int = 5
+    breaker_failure_ratio: float = 0.5
+    breaker_open_seconds: float = 15.0  # первая пауза, дальше удваивается
+    breaker_max_open_seconds: float = 600.0
+    client_stale_ttl_seconds: int = 86400
+    
+    # Общий бюджет запросов к api.nasa.gov (token bucket в Redis)
+    nasa_rate_limit_per_hour: int = 1000
+    nasa_demo_rate_limit_per_hour: int = 30  # DEMO_KEY или пустой ключ
+    rate_budget_reserve_ratio: float = 0.2  # доля квоты только для задач планировщика
+    
+    # Single-flight обновлений из внешних API (блокировка и передача результата через Redis)
+    single_flight_lock_ttl_seconds: int = 60
+    single_flight_result_ttl_seconds: int = 5
+    single_flight_poll_seconds: float = 0.1
+    
+    # /space/refresh: параллельные запросы к источникам и дедлайн одного источника
+    space_refresh_concurrency: int = 5
+    space_refresh_source_timeout_seconds: float = 20.0
+    
+    # NEO feed: окно дней вокруг сегодняшнего, параллельные запросы по 7 дней
+    # и время после окончания дня, после которого день больше не запрашивается.
+    # Неокончательные дни (вчера, сегодня и будущие) укладываются в один запрос
+    neo_past_days: int = 2
+    neo_future_days: int = 5
+    neo_fetch_concurrency: int = 3
+    neo_day_settle_hours: int = 6
+    
+    # DONKI: синхронизация donki_events от последнего события с перекрытием
+    # (DONKI дополняет события задним числом) и окно версии в space_cache
+    donki_initial_days: int = 30
+    donki_sync_overlap_days: int = 3
+    donki_cache_days: int = 5
+    
+    # space_cache: хранение версий по источникам (0 - без ограничения)
+    space_cache_keep_versions: int = 48
+    space_cache_retention_days: int = 30
+    space_cache_source_limits: dict[str, int] = {"neo": 12}  # NEO payload самый большой
+    space_cache_prune_every_seconds: int = 3600
+    
+    # Кэш ответов в Redis (TTL в секундах) и локальная копия в воркере
+    cache_enabled: bool = True
+    cache_space_ttl_seconds: int = 3600
+    cache_summary_ttl_seconds: int = 300
+    cache_iss_ttl_seconds: int = 300
+    cache_cms_ttl_seconds: int = 600
+    cache_local_ttl_seconds: float = 30.0
+    
+    # HTTP Cache-Control: max-age как доля интервала планировщика источника
+    http_cache_max_age_ratio: float = 0.5
+    
+    # OSDR: верхняя граница подсчета total в /osdr/list (count_mode=bounded)
+    osdr_count_cap: int = 1000
+    
     # CORS - принимаем строку и парсим в список
     cors_origins: str = "http://localhost:8080"
     
@@ -46,6 +140,12 @@ class Settings(BaseSettings):
     # API timeouts
     api_timeout: int = 30
     
+    # Пул HTTP соединений к внешним API (один клиент на хост)
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry: float = 60.0
+    http2_enabled: bool = True
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -42,13 +42,30 @@ async def init_db():
     Инициализация таблиц БД.
     
     Создает таблицы для:
-    - iss_fetch_log: логи получения данных ISS (TIMESTAMPTZ для fetched_at)
+    - iss_fetch_log: логи получения данных ISS, секционированы по суткам fetched_at
     - osdr_items: элементы OSDR с Upsert по dataset_id (TIMESTAMPTZ для updated_at, inserted_at)
+    - osdr_catalog: версия каталога OSDR для валидаторов /osdr/list
     - space_cache: универсальный кэш космических данных (TIMESTAMPTZ для fetched_at)
+    - neo_approaches: сближения NEO из NeoWs feed с числовыми колонками
+    - neo_feed_days: объекты NeoWs feed по календарным дням
+    - donki_events: солнечные вспышки и CME из DONKI по activity ID
     
     Все даты используют TIMESTAMPTZ для корректной работы с timezone.
     """
     from sqlalchemy import text
+    from app.database.partitions import (
+        ISS_POSITION_COLUMNS,
+        is_partitioned,
+        create_iss_fetch_log,
+        create_iss_trend_index,
+        migrate_iss_fetch_log,
+        ensure_iss_partitions,
+        drop_expired_iss_partitions,
+    )
+    from app.repo.neo_repo import NeoRepo
+    from app.utils.neo_helpers import normalize_neo_feed
+    from app.repo.donki_repo import DonkiRepo
+    from app.utils.donki_helpers import normalize_donki_events
     import logging
     
     logger = logging.getLogger(__name__)
@@ -56,15 +73,55 @@ async def init_db():
     session_factory = await get_db_pool()
     async with session_factory() as session:
         try:
-            # ISS таблица
-            await session.execute(text("""
-                CREATE TABLE IF NOT EXISTS iss_fetch_log(
-                    id BIGSERIAL PRIMARY KEY,
-                    fetched_at TIMESTAMPTZ NOT NULL DEFAULT now(),
-                    source_url TEXT NOT NULL,
-                    payload JSONB NOT NULL
+            # ISS таблица: секционирована по fetched_at (одна секция на сутки)
+            partitioned = await is_partitioned(session)
+            # Координаты разбираются из payload один раз: для таблицы без колонок
+            # координат и для строк, скопированных миграцией из старой таблицы
+            result = await session.execute(text("""
+                SELECT EXISTS (
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_schema = 'public'
+                      AND table_name = 'iss_fetch_log'
+                      AND column_name = 'latitude'
                 )
             """))
+            needs_backfill = partitioned is False or (partitioned and not result.scalar())
+            if partitioned is None:
+                await create_iss_fetch_log(session)
+            elif not partitioned:
+                await migrate_iss_fetch_log(
+                    session,
+                    days_ahead=settings.iss_partition_days_ahead,
+                    retention_days=settings.iss_retention_days,
+                )
+            await ensure_iss_partitions(session, settings.iss_partition_days_ahead)
+            await drop_expired_iss_partitions(session, settings.iss_retention_days)
+            
+            # Координаты ISS в типизированных колонках: заполняются при вставке,
+            # для старых строк - разбором payload при появлении колонок
+            for column in ISS_POSITION_COLUMNS:
+                await session.execute(text(
+                    f"ALTER TABLE iss_fetch_log ADD COLUMN IF NOT EXISTS {column} DOUBLE PRECISION"
+                ))
+            await create_iss_trend_index(session)
+            await session.execute(text("DROP INDEX IF EXISTS ix_iss_fetch_log_fetched_at_id"))
+            if needs_backfill:
+                backfill = ", ".join(
+                    f"""{column} = CASE
+                        WHEN jsonb_typeof(payload->'{column}') = 'number'
+                            THEN (payload->>'{column}')::double precision
+                        WHEN payload->>'{column}' ~ '^\\s*[-+]?(\\d+\\.?\\d*|\\.\\d+)([eE][-+]?\\d+)?\\s*$'
+                            THEN trim(payload->>'{column}')::double precision
+                    END"""
+                    for column in ISS_POSITION_COLUMNS
+                )
+                result = await session.execute(text(f"""
+                    UPDATE iss_fetch_log SET {backfill}
+                    WHERE latitude IS NULL
+                      AND jsonb_typeof(payload->'latitude') IN ('number', 'string')
+                """))
+                if result.rowcount:
+                    logger.info(f"Backfilled ISS position columns for {result.rowcount} rows")
             
             # OSDR таблица
             await session.execute(text("""
@@ -112,11 +169,97 @@ async def init_db():
             except Exception as e:
                 logger.warning(f"Could not add 'rest_url' column: {e}")
             
+            try:
+                # Хэш нормализованной записи для пропуска неизменившихся датасетов
+                await session.execute(text(
+                    "ALTER TABLE osdr_items ADD COLUMN IF NOT EXISTS content_hash TEXT"
+                ))
+            except Exception as e:
+                logger.warning(f"Could not add 'content_hash' column: {e}")
+            
             await session.execute(text("""
                 CREATE UNIQUE INDEX IF NOT EXISTS ux_osdr_dataset_id
                 ON osdr_items(dataset_id) WHERE dataset_id IS NOT NULL
             """))
             
+            # Полнотекстовый и триграммный поиск по OSDR (/osdr/list?search=)
+            try:
+                async with session.begin_nested():
+                    await session.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            except Exception as e:
+                logger.warning(f"Could not create extension pg_trgm: {e}")
+            
+            await session.execute(text("""
+                ALTER TABLE osdr_items ADD COLUMN IF NOT EXISTS search_text TEXT
+                GENERATED ALWAYS AS (
+                    lower(
+                        coalesce(dataset_id, '') || ' ' ||
+                        coalesce(title, '') || ' ' ||
+                        coalesce(status, '') || ' ' ||
+                        coalesce(raw->>'description', '') || ' ' ||
+                        coalesce(raw->>'accession', '')
+                    )
+                ) STORED
+            """))
+            await session.execute(text("""
+                ALTER TABLE osdr_items ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+                GENERATED ALWAYS AS (
+                    setweight(to_tsvector('simple', coalesce(dataset_id, '')), 'A') ||
+                    setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+                    setweight(to_tsvector('simple', coalesce(raw->>'accession', '')), 'B') ||
+                    setweight(to_tsvector('simple', coalesce(raw->>'description', '')), 'C') ||
+                    setweight(to_tsvector('simple', coalesce(status, '')), 'D')
+                ) STORED
+            """))
+            await session.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_osdr_items_search_vector
+                ON osdr_items USING GIN (search_vector)
+            """))
+            try:
+                async with session.begin_nested():
+                    await session.execute(text("""
+                        CREATE INDEX IF NOT EXISTS ix_osdr_items_search_trgm
+                        ON osdr_items USING GIN (search_text gin_trgm_ops)
+                    """))
+            except Exception as e:
+                logger.warning(f"Could not create trigram index on osdr_items: {e}")
+            
+            # Keyset-пагинация /osdr/list: ORDER BY inserted_at DESC, id DESC
+            await session.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_osdr_items_inserted_at_id
+                ON osdr_items(inserted_at DESC, id DESC)
+            """))
+
+            # Старые строки-обертки {"OSD-1": {...}, ...} без dataset_id: теперь такие
+            # объекты разворачиваются при синхронизации, их датасеты придут отдельными строками
+            removed = await session.execute(text("""
+                DELETE FROM osdr_items o
+                WHERE o.dataset_id IS NULL
+                  AND jsonb_typeof(o.raw) = 'object'
+                  AND EXISTS (
+                      SELECT 1 FROM jsonb_object_keys(o.raw) AS k WHERE k LIKE 'OSD-%'
+                  )
+            """))
+            
+            # Версия каталога OSDR: увеличивается при каждом изменении osdr_items,
+            # из нее /osdr/list строит ETag и Last-Modified без чтения строк
+            await session.execute(text("""
+                CREATE TABLE IF NOT EXISTS osdr_catalog(
+                    id SMALLINT PRIMARY KEY CHECK (id = 1),
+                    version BIGINT NOT NULL DEFAULT 0,
+                    modified_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                )
+            """))
+            await session.execute(text(
+                "INSERT INTO osdr_catalog(id, version) "
+                "SELECT 1, CASE WHEN EXISTS (SELECT 1 FROM osdr_items) THEN 1 ELSE 0 END "
+                "ON CONFLICT (id) DO NOTHING"
+            ))
+            if removed.rowcount:
+                await session.execute(text(
+                    "UPDATE osdr_catalog SET version = version + 1, modified_at = now() WHERE id = 1"
+                ))
+
             # Space cache таблица
             await session.execute(text("""
                 CREATE TABLE IF NOT EXISTS space_cache(
@@ -130,6 +273,97 @@ async def init_db():
                 CREATE INDEX IF NOT EXISTS ix_space_cache_source 
                 ON space_cache(source, fetched_at DESC)
             """))
+            # Хэш payload: повторная запись того же содержимого только обновляет fetched_at
+            await session.execute(text(
+                "ALTER TABLE space_cache ADD COLUMN IF NOT EXISTS content_hash TEXT"
+            ))
+            
+            # Сближения NEO: строки из NeoWs feed с числовыми колонками для /astro/events
+            await session.execute(text("""
+                CREATE TABLE IF NOT EXISTS neo_approaches(
+                    id BIGSERIAL PRIMARY KEY,
+                    neo_id TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    approach_at TIMESTAMPTZ NOT NULL,
+                    orbiting_body TEXT,
+                    miss_distance_km DOUBLE PRECISION,
+                    velocity_kmh DOUBLE PRECISION,
+                    diameter_m DOUBLE PRECISION,
+                    is_hazardous BOOLEAN NOT NULL DEFAULT FALSE,
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                    UNIQUE (neo_id, approach_at)
+                )
+            """))
+            await session.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_neo_approaches_approach_at_id
+                ON neo_approaches(approach_at, id)
+            """))
+            await session.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_neo_approaches_hazardous
+                ON neo_approaches(approach_at, id) WHERE is_hazardous
+            """))
+            # Первое заполнение из уже сохраненных версий NEO feed
+            if (await session.execute(text("SELECT NOT EXISTS (SELECT 1 FROM neo_approaches)"))).scalar():
+                result = await session.execute(text(
+                    "SELECT payload FROM space_cache WHERE source = 'neo' ORDER BY fetched_at"
+                ))
+                neo_repo = NeoRepo(session)
+                backfilled = 0
+                for (payload,) in result.fetchall():
+                    backfilled += await neo_repo.upsert_approaches(normalize_neo_feed(payload))
+                if backfilled:
+                    logger.info(f"Backfilled {backfilled} NEO approaches from space_cache")
+            
+            # NEO feed по дням: прошедшие дни запрашиваются один раз
+            await session.execute(text("""
+                CREATE TABLE IF NOT EXISTS neo_feed_days(
+                    day DATE PRIMARY KEY,
+                    objects JSONB NOT NULL,
+                    fetched_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                )
+            """))
+            
+            # События DONKI (FLR, CME): одна строка на activity ID, полная история
+            await session.execute(text("""
+                CREATE TABLE IF NOT EXISTS donki_events(
+                    id BIGSERIAL PRIMARY KEY,
+                    activity_id TEXT NOT NULL UNIQUE,
+                    event_type TEXT NOT NULL,
+                    start_at TIMESTAMPTZ NOT NULL,
+                    peak_at TIMESTAMPTZ,
+                    end_at TIMESTAMPTZ,
+                    class_type TEXT,
+                    source_location TEXT,
+                    active_region_num INTEGER,
+                    linked_activity_ids TEXT[] NOT NULL DEFAULT '{}',
+                    link TEXT,
+                    payload JSONB NOT NULL,
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                )
+            """))
+            await session.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_donki_events_type_start_id
+                ON donki_events(event_type, start_at DESC, id DESC)
+            """))
+            await session.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_donki_events_start_id
+                ON donki_events(start_at DESC, id DESC)
+            """))
+            await session.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_donki_events_linked
+                ON donki_events USING GIN (linked_activity_ids)
+            """))
+            # Первое заполнение из уже сохраненных версий FLR и CME
+            if (await session.execute(text("SELECT NOT EXISTS (SELECT 1 FROM donki_events)"))).scalar():
+                result = await session.execute(text(
+                    "SELECT source, payload FROM space_cache WHERE source IN ('flr', 'cme') ORDER BY fetched_at"
+                ))
+                donki_repo = DonkiRepo(session)
+                backfilled = 0
+                for source, payload in result.fetchall():
+                    backfilled += await donki_repo.upsert_events(normalize_donki_events(source, payload))
+                if backfilled:
+                    logger.info(f"Backfilled {backfilled} DONKI events from space_cache")
             
             # Telemetry legacy таблица
             await session.execute(text("""
@@ -142,6 +376,12 @@ async def init_db():
                 )
             """))
             
+            # Keyset-пагинация /telemetry/list: ORDER BY recorded_at DESC, id DESC
+            await session.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_telemetry_legacy_recorded_at_id
+                ON telemetry_legacy(recorded_at DESC, id DESC)
+            """))
+            
             # CMS блоки таблица
             await session.execute(text("""
                 CREATE TABLE IF NOT EXISTS cms_blocks(
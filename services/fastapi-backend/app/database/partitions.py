@@ -0,0 +1,241 @@
+"""
+Секционирование iss_fetch_log по времени
+
+Таблица секционирована по диапазону fetched_at: одна секция на сутки (UTC)
+с именем iss_fetch_log_pYYYYMMDD. Секции создаются заранее, а устаревшие
+удаляются целиком (DROP TABLE), без DELETE и раздувания таблицы.
+Секция по умолчанию iss_fetch_log_default принимает строки, для суток
+которых секция еще не создана: вставка не падает, а при создании секции
+эти строки переносятся в нее.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+ISS_TABLE = "iss_fetch_log"
+ISS_DEFAULT_PARTITION = f"{ISS_TABLE}_default"
+# Поля payload, хранимые в отдельных колонках DOUBLE PRECISION
+ISS_POSITION_COLUMNS = ("latitude", "longitude", "velocity", "altitude")
+_PARTITION_RE = re.compile(r"^iss_fetch_log_p(\d{8})$")
+
+
+def _partition_name(day: date) -> str:
+    return f"{ISS_TABLE}_p{day:%Y%m%d}"
+
+
+def _day_start(day: date) -> str:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc).isoformat()
+
+
+async def _list_partitions(session: AsyncSession) -> list[str]:
+    result = await session.execute(text("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = :name
+    """), {"name": ISS_TABLE})
+    return [row[0] for row in result.fetchall()]
+
+
+async def create_iss_fetch_log(session: AsyncSession, sequence: Optional[str] = None):
+    """
+    Создать секционированную таблицу iss_fetch_log (если ее нет).
+    
+    Args:
+        sequence: Существующая последовательность для id (при миграции старой таблицы)
+    """
+    id_column = (
+        f"id BIGINT NOT NULL DEFAULT nextval('{sequence}')" if sequence else "id BIGSERIAL"
+    )
+    await session.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {ISS_TABLE}(
+            {id_column},
+            fetched_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            source_url TEXT NOT NULL,
+            payload JSONB NOT NULL,
+            latitude DOUBLE PRECISION,
+            longitude DOUBLE PRECISION,
+            velocity DOUBLE PRECISION,
+            altitude DOUBLE PRECISION,
+            PRIMARY KEY (id, fetched_at)
+        ) PARTITION BY RANGE (fetched_at)
+    """))
+    await create_iss_trend_index(session)
+
+
+async def create_iss_trend_index(session: AsyncSession):
+    """
+    Создать индекс (fetched_at DESC, id DESC) с координатами в INCLUDE.
+    
+    Индекс наследуется каждой секцией: последние записи читаются из самой новой,
+    а тренд строится index-only сканированием без чтения payload.
+    """
+    await session.execute(text(f"""
+        CREATE INDEX IF NOT EXISTS ix_iss_fetch_log_trend
+        ON {ISS_TABLE}(fetched_at DESC, id DESC)
+        INCLUDE (latitude, longitude, velocity, altitude)
+    """))
+
+
+async def is_partitioned(session: AsyncSession) -> Optional[bool]:
+    """True - таблица секционирована, False - обычная таблица, None - таблицы нет"""
+    result = await session.execute(text("""
+        SELECT c.relkind
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'public' AND c.relname = :name
+    """), {"name": ISS_TABLE})
+    relkind = result.scalar()
+    if relkind is None:
+        return None
+    return relkind == "p"
+
+
+async def _create_day_partition(session: AsyncSession, name: str, day: date):
+    """
+    Создать секцию суток; строки этих суток из секции по умолчанию переносятся в нее.
+    
+    Пока в секции по умолчанию есть строки диапазона, PostgreSQL не даст
+    создать секцию, поэтому они временно выносятся во временную таблицу.
+    """
+    bounds = {"start": _day_start(day), "end": _day_start(day + timedelta(days=1))}
+    range_filter = "fetched_at >= CAST(:start AS timestamptz) AND fetched_at < CAST(:end AS timestamptz)"
+    result = await session.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {ISS_DEFAULT_PARTITION} WHERE {range_filter})"),
+        bounds
+    )
+    stray = bool(result.scalar())
+    if stray:
+        await session.execute(text(f"CREATE TEMP TABLE {name}_moving (LIKE {ISS_TABLE})"))
+        await session.execute(text(f"""
+            WITH moved AS (
+                DELETE FROM {ISS_DEFAULT_PARTITION} WHERE {range_filter} RETURNING *
+            )
+            INSERT INTO {name}_moving SELECT * FROM moved
+        """), bounds)
+    
+    await session.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {name}
+        PARTITION OF {ISS_TABLE}
+        FOR VALUES FROM ('{bounds["start"]}') TO ('{bounds["end"]}')
+    """))
+    
+    if stray:
+        result = await session.execute(text(f"INSERT INTO {ISS_TABLE} SELECT * FROM {name}_moving"))
+        await session.execute(text(f"DROP TABLE {name}_moving"))
+        logger.info(f"Moved {result.rowcount} rows from {ISS_DEFAULT_PARTITION} to {name}")
+
+
+async def ensure_iss_partitions(
+    session: AsyncSession,
+    days_ahead: int,
+    since: Optional[date] = None,
+) -> int:
+    """
+    Создать секцию по умолчанию и суточные секции от since (по умолчанию вчера)
+    до сегодня + days_ahead.
+    
+    Returns:
+        Количество созданных секций
+    """
+    today = datetime.now(timezone.utc).date()
+    day = since or today - timedelta(days=1)
+    last = today + timedelta(days=max(days_ahead, 0))
+    
+    existing = set(await _list_partitions(session))
+    if ISS_DEFAULT_PARTITION not in existing:
+        await session.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {ISS_DEFAULT_PARTITION}
+            PARTITION OF {ISS_TABLE} DEFAULT
+        """))
+    
+    created = 0
+    while day <= last:
+        name = _partition_name(day)
+        if name not in existing:
+            try:
+                async with session.begin_nested():
+                    await _create_day_partition(session, name, day)
+                created += 1
+            except Exception as e:
+                logger.warning(f"Could not create partition {name}: {e}")
+        day += timedelta(days=1)
+    return created
+
+
+async def drop_expired_iss_partitions(session: AsyncSession, retention_days: int) -> list[str]:
+    """
+    Удалить секции, целиком вышедшие за пределы хранения (retention_days <= 0 - хранить все).
+    
+    Returns:
+        Имена удаленных секций
+    """
+    if retention_days <= 0:
+        return []
+    
+    cutoff = datetime.now(timezone.utc).date() - timedelta(days=retention_days)
+    
+    partitions = await _list_partitions(session)
+    dropped = []
+    for name in partitions:
+        match = _PARTITION_RE.match(name)
+        if not match:
+            continue
+        day = datetime.strptime(match.group(1), "%Y%m%d").date()
+        # Секция содержит данные за [day, day + 1); удаляем, если она целиком старше cutoff
+        if day + timedelta(days=1) <= cutoff:
+            await session.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            dropped.append(name)
+    
+    # Строки секции по умолчанию старше срока хранения (она почти всегда пуста)
+    if ISS_DEFAULT_PARTITION in partitions:
+        await session.execute(
+            text(f"DELETE FROM {ISS_DEFAULT_PARTITION} WHERE fetched_at < CAST(:cutoff AS timestamptz)"),
+            {"cutoff": _day_start(cutoff)}
+        )
+    return dropped
+
+
+async def migrate_iss_fetch_log(session: AsyncSession, days_ahead: int, retention_days: int):
+    """
+    Перевести существующую обычную iss_fetch_log в секционированную.
+    
+    Старая таблица переименовывается, данные в пределах срока хранения
+    копируются в секции, последовательность id сохраняется.
+    """
+    legacy = f"{ISS_TABLE}_legacy"
+    await session.execute(text(f"ALTER TABLE {ISS_TABLE} RENAME TO {legacy}"))
+    await session.execute(text(f"ALTER INDEX IF EXISTS {ISS_TABLE}_pkey RENAME TO {legacy}_pkey"))
+    await session.execute(text("DROP INDEX IF EXISTS idx_iss_fetch_log_fetched_at"))
+    
+    await create_iss_fetch_log(session, sequence=f"{ISS_TABLE}_id_seq")
+    
+    since = None
+    if retention_days > 0:
+        since = datetime.now(timezone.utc).date() - timedelta(days=retention_days)
+    result = await session.execute(text(f"""
+        SELECT min(fetched_at) FROM {legacy}
+        WHERE CAST(:since AS timestamptz) IS NULL OR fetched_at >= CAST(:since AS timestamptz)
+    """), {"since": _day_start(since) if since else None})
+    oldest = result.scalar()
+    if oldest is not None:
+        await ensure_iss_partitions(
+            session, days_ahead, since=oldest.astimezone(timezone.utc).date()
+        )
+    
+    result = await session.execute(text(f"""
+        INSERT INTO {ISS_TABLE} (id, fetched_at, source_url, payload)
+        SELECT id, fetched_at, source_url, payload
+        FROM {legacy}
+        WHERE CAST(:since AS timestamptz) IS NULL OR fetched_at >= CAST(:since AS timestamptz)
+    """), {"since": _day_start(since) if since else None})
+    
+    await session.execute(text(f"ALTER SEQUENCE {ISS_TABLE}_id_seq OWNED BY {ISS_TABLE}.id"))
+    await session.execute(text(f"DROP TABLE {legacy}"))
+    logger.info(f"Migrated {ISS_TABLE} to daily partitions ({result.rowcount} rows copied)")
@@ -1,23 +1,29 @@
 from .models import (
     HealthResponse,
+    SchedulerJobStatus,
+    SchedulerStatusResponse,
     IssLastResponse,
     IssTrendResponse,
     OsdrSyncResponse,
     OsdrItem,
     OsdrListResponse,
     SpaceLatestResponse,
+    SpaceRefreshSourceStatus,
     SpaceRefreshResponse,
     SpaceSummaryResponse,
 )
 
 __all__ = [
     "HealthResponse",
+    "SchedulerJobStatus",
+    "SchedulerStatusResponse",
     "IssLastResponse",
     "IssTrendResponse",
     "OsdrSyncResponse",
     "OsdrItem",
     "OsdrListResponse",
     "SpaceLatestResponse",
+    "SpaceRefreshSourceStatus",
     "SpaceRefreshResponse",
     "SpaceSummaryResponse",
 ]
@@ -9,6 +9,27 @@ class HealthResponse(BaseModel):
     now: datetime
 
 
+class SchedulerJobStatus(BaseModel):
+    name: str
+    interval_seconds: float
+    policy: str = "interval"
+    next_delay_seconds: Optional[float] = None
+    jitter_seconds: float
+    timeout_seconds: float
+    next_run_at: Optional[datetime] = None
+    last_started_at: Optional[datetime] = None
+    last_finished_at: Optional[datetime] = None
+    last_duration_seconds: Optional[float] = None
+    last_status: Optional[str] = None
+    last_error: Optional[str] = None
+    runs: int = 0
+
+
+class SchedulerStatusResponse(BaseModel):
+    running: bool
+    jobs: list[SchedulerJobStatus]
+
+
 class IssLastResponse(BaseModel):
     id: Optional[int] = None
     fetched_at: Optional[datetime] = None
@@ -32,6 +53,9 @@ class IssTrendResponse(BaseModel):
 
 class OsdrSyncResponse(BaseModel):
     written: int
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
 
 
 class OsdrItem(BaseModel):
@@ -42,12 +66,14 @@ class OsdrItem(BaseModel):
     rest_url: Optional[str] = None
     updated_at: Optional[datetime] = None
     inserted_at: datetime
-    raw: dict[str, Any]
+    raw: Optional[dict[str, Any]] = None
 
 
 class OsdrListResponse(BaseModel):
     items: list[OsdrItem]
     total: Optional[int] = None
+    total_exact: bool = True
+    next_cursor: Optional[str] = None
 
 
 class SpaceLatestResponse(BaseModel):
@@ -57,8 +83,18 @@ class SpaceLatestResponse(BaseModel):
     message: Optional[str] = None
 
 
+class SpaceRefreshSourceStatus(BaseModel):
+    source: str
+    status: str  # ok / throttled / unavailable / timeout / error
+    duration_ms: int
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
 class SpaceRefreshResponse(BaseModel):
     refreshed: list[str]
+    sources: list[SpaceRefreshSourceStatus] = []
+    duration_ms: Optional[int] = None
 
 
 class SpaceSummaryResponse(BaseModel):
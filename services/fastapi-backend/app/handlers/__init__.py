@@ -1,16 +1,19 @@
-from .health_handler import health_handler
-from .iss_handler import last_iss_handler, trigger_iss_handler, iss_trend_handler, clear_iss_data_handler
+from .health_handler import health_handler, scheduler_status_handler
+from .iss_handler import last_iss_handler, trigger_iss_handler, iss_trend_handler, clear_iss_data_handler, iss_stream_handler
 from .osdr_handler import osdr_sync_handler, osdr_list_handler
 from .space_handler import space_latest_handler, space_refresh_handler, space_summary_handler
 from .jwst_handler import jwst_feed_handler
 from .astronomy_handler import astronomy_events_handler
+from .donki_handler import donki_events_handler
 
 __all__ = [
     "health_handler",
+    "scheduler_status_handler",
     "last_iss_handler",
     "trigger_iss_handler",
     "iss_trend_handler",
     "clear_iss_data_handler",
+    "iss_stream_handler",
     "osdr_sync_handler",
     "osdr_list_handler",
     "space_latest_handler",
@@ -18,5 +21,6 @@ __all__ = [
     "space_summary_handler",
     "jwst_feed_handler",
     "astronomy_events_handler",
+    "donki_events_handler",
 ]
 
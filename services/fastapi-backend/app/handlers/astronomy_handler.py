@@ -1,29 +1,52 @@
-from app.clients.astronomy_client import AstronomyClient
+from app.repo.neo_repo import NeoRepo
 from app.services.astronomy_service import AstronomyService
+from app.utils.cursor import encode_cursor, decode_cursor
+from app.utils.errors import ApiError
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Any, Optional
 
+# Размер страницы /astro/events, если limit не задан
+ASTRO_EVENTS_DEFAULT_LIMIT = 100
+
 
 async def astronomy_events_handler(
+    session: AsyncSession,
     days: int = 7,
+    days_ahead: int = 0,
     limit: Optional[int] = None,
+    hazardous: bool = False,
+    min_distance_km: Optional[float] = None,
+    cursor: Optional[str] = None,
 ) -> dict[str, Any]:
     """
-    Get NEO (Near Earth Objects) events from NASA Asteroids - NeoWs API.
+    Get NEO (Near Earth Objects) close approaches ingested from NASA NeoWs.
     
     Args:
-        days: Number of days from today (1-7)
-        limit: Maximum number of events to return (optional)
+        days: Number of days back from today (today included)
+        days_ahead: Number of days after today
+        limit: Page size
+        hazardous: Only potentially hazardous asteroids
+        min_distance_km: Minimum miss distance in km
+        cursor: next_cursor of the previous page
     """
     try:
-        client = AstronomyClient()
-        service = AstronomyService(client)
+        after = decode_cursor(cursor) if cursor else None
+        service = AstronomyService(NeoRepo(session))
         
         data = await service.get_events(
             days=days,
-            limit=limit
+            days_ahead=days_ahead,
+            limit=limit or ASTRO_EVENTS_DEFAULT_LIMIT,
+            hazardous_only=hazardous,
+            min_distance_km=min_distance_km,
+            after=after,
         )
         
+        next_after = data.pop("next_after")
+        data["next_cursor"] = encode_cursor(*next_after) if next_after else None
         return data
+    except ApiError:
+        raise
     except Exception as e:
         return {"error": f"Error fetching astronomy events: {str(e)}"}
 
@@ -1,8 +1,10 @@
 from app.state.app_state import app_state
 from app.utils.errors import ApiError, InternalServerError
+from app.redis.cache import CachedResponse, response_cache, cms_block_key
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from typing import Any
+import json
 
 
 async def get_cms_block(slug: str) -> dict[str, Any] | None:
@@ -10,6 +12,11 @@ async def get_cms_block(slug: str) -> dict[str, Any] | None:
     import logging
     logger = logging.getLogger(__name__)
     
+    cache_key = cms_block_key(slug)
+    cached, generation = await response_cache.lookup(cache_key)
+    if cached is not None:
+        return json.loads(cached.body)
+    
     session_factory = await app_state.get_db()
     async with session_factory() as session:
         try:
@@ -24,7 +31,14 @@ async def get_cms_block(slug: str) -> dict[str, Any] | None:
             row = result.fetchone()
             if row:
                 logger.info(f"Found CMS block for slug: {slug}")
-                return {"content": row[0]}
+                block = {"content": row[0]}
+                await response_cache.set(
+                    cache_key,
+                    CachedResponse(body=json.dumps(block)),
+                    app_state.settings.cache_cms_ttl_seconds,
+                    generation,
+                )
+                return block
             else:
                 logger.warning(f"CMS block not found for slug: {slug}")
                 return None
@@ -0,0 +1,69 @@
+from app.repo.donki_repo import DonkiRepo
+from app.services.donki_service import DonkiService
+from app.utils.donki_helpers import DONKI_EVENT_TYPES
+from app.utils.cursor import encode_cursor, decode_cursor
+from app.utils.errors import ApiError, BadRequestError, InternalServerError
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+# Размер страницы /donki/events, если limit не задан
+DONKI_EVENTS_DEFAULT_LIMIT = 100
+
+# Окно /donki/events, если задана одна граница или ни одной
+DONKI_EVENTS_DEFAULT_WINDOW = timedelta(days=30)
+
+
+async def donki_events_handler(
+    session: AsyncSession,
+    event_type: Optional[str] = None,
+    class_type: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    linked_to: Optional[str] = None,
+    has_links: Optional[bool] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> dict[str, Any]:
+    """
+    События DONKI (солнечные вспышки и CME) из donki_events.
+    
+    start/end: окно по времени начала события; по умолчанию - последние
+    30 дней, а если задана одна граница - 30 дней от нее.
+    """
+    try:
+        if event_type is not None:
+            event_type = event_type.upper()
+            if event_type not in DONKI_EVENT_TYPES.values():
+                raise BadRequestError(detail=f"Unknown DONKI event type: {event_type}")
+        if start is not None and start.tzinfo is None:
+            start = start.replace(tzinfo=timezone.utc)
+        if end is not None and end.tzinfo is None:
+            end = end.replace(tzinfo=timezone.utc)
+        if end is None:
+            end = start + DONKI_EVENTS_DEFAULT_WINDOW if start is not None else datetime.now(timezone.utc)
+        if start is None:
+            start = end - DONKI_EVENTS_DEFAULT_WINDOW
+        if start >= end:
+            raise BadRequestError(detail="'from' must be earlier than 'to'")
+        
+        before = decode_cursor(cursor) if cursor else None
+        service = DonkiService(DonkiRepo(session))
+        data = await service.get_events(
+            start,
+            end,
+            limit=limit or DONKI_EVENTS_DEFAULT_LIMIT,
+            event_type=event_type,
+            class_prefix=class_type,
+            linked_to=linked_to,
+            has_links=has_links,
+            before=before,
+        )
+        
+        next_before = data.pop("next_before")
+        data["next_cursor"] = encode_cursor(*next_before) if next_before else None
+        return data
+    except ApiError:
+        raise
+    except Exception as e:
+        raise InternalServerError(detail=f"Error fetching DONKI events: {str(e)}")
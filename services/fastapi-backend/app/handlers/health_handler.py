@@ -1,5 +1,6 @@
 from datetime import datetime
-from app.domain.models import HealthResponse
+from app.domain.models import HealthResponse, SchedulerStatusResponse, SchedulerJobStatus
+from app.services.scheduler_service import scheduler_service
 from app.utils.errors import ApiError
 
 
@@ -10,3 +11,10 @@ async def health_handler() -> HealthResponse:
         now=datetime.utcnow()
     )
 
+
+async def scheduler_status_handler() -> SchedulerStatusResponse:
+    """Состояние задач планировщика"""
+    return SchedulerStatusResponse(
+        running=scheduler_service.running,
+        jobs=[SchedulerJobStatus(**job) for job in scheduler_service.get_jobs_status()],
+    )
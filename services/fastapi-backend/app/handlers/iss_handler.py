@@ -3,50 +3,150 @@ from app.repo.iss_repo import IssRepo
 from app.clients.iss_client import IssClient
 from app.services.iss_service import IssService
 from app.domain.models import IssLastResponse, IssTrendResponse
-from app.utils.errors import ApiError, InternalServerError
+from app.utils.errors import ApiError, BadRequestError, InternalServerError
+from app.utils.validators import Validators
+from app.redis.cache import response_cache, iss_last_entry, iss_last_etag, CachedResponse, ISS_LAST_KEY
+from app.utils.http_cache import (
+    conditional_response,
+    http_date,
+    is_conditional,
+    is_not_modified,
+    max_age_for,
+    not_modified_response,
+)
+from app.services.iss_stream_service import iss_stream_service
+from app.services.iss_refresh_service import iss_refresh_service
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Any
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
+import asyncio
+import json
 
+# Окно /iss/trend, если задана только одна из границ from/to
+ISS_TREND_DEFAULT_WINDOW = timedelta(hours=24)
 
-async def last_iss_handler(session: AsyncSession) -> IssLastResponse:
-    """Получить последние данные ISS"""
+# Возраст отдаваемой точки ISS в секундах
+DATA_AGE_HEADER = "X-Data-Age"
+
+
+async def _load_last_entry(session: AsyncSession) -> Optional[CachedResponse]:
+    """Последний ответ /iss/last из кэша или из БД (с наполнением кэша)"""
+    cached, generation = await response_cache.lookup(ISS_LAST_KEY)
+    if cached is not None:
+        return cached
+    return await _load_db_entry(session, generation)
+
+
+async def _load_db_entry(session: AsyncSession, generation: Optional[int]) -> Optional[CachedResponse]:
+    """Последний ответ /iss/last из БД с наполнением кэша (generation - из response_cache.lookup)"""
+    result = await IssRepo(session).get_last_raw()
+    if result is None:
+        return None
+    entry = iss_last_entry(result["id"], result["fetched_at"], result["source_url"], result["payload"])
+    await response_cache.set(ISS_LAST_KEY, entry, app_state.settings.cache_iss_ttl_seconds, generation)
+    return entry
+
+
+def _data_age(last_modified: Optional[str]) -> Optional[float]:
+    """Возраст данных в секундах по Last-Modified ответа"""
+    if not last_modified:
+        return None
     try:
-        repo = IssRepo(session)
-        client = IssClient()
-        service = IssService(repo, client)
-        result = await service.get_last()
+        fetched_at = parsedate_to_datetime(last_modified)
+    except (TypeError, ValueError):
+        return None
+    return max((datetime.now(timezone.utc) - fetched_at).total_seconds(), 0.0)
+
+
+async def _revalidate(age: Optional[float]) -> bool:
+    """
+    Запустить фоновое обновление, если данные устарели.
+    
+    Ждем обновление (не дольше iss_refresh_wait_seconds) только когда данных
+    нет или они старше iss_max_stale_seconds.
+    
+    Returns:
+        True, если за время ожидания появилась новая точка
+    """
+    settings = app_state.settings
+    if age is not None and age < settings.iss_stale_after_seconds:
+        return False
+    if age is None or age >= settings.iss_max_stale_seconds:
+        return await iss_refresh_service.wait(settings.iss_refresh_wait_seconds)
+    iss_refresh_service.trigger()
+    return False
+
+
+def _with_age(response: Response, age: Optional[float]) -> Response:
+    if age is not None:
+        response.headers[DATA_AGE_HEADER] = str(int(age))
+    return response
+
+
+async def last_iss_handler(
+    session: AsyncSession,
+    request: Optional[Request] = None,
+) -> IssLastResponse | Response:
+    """
+    Получить последние данные ISS.
+    
+    Stale-while-revalidate: ответ всегда строится из последней сохраненной
+    точки (кэш ответов или payload::text из БД) и содержит ее возраст в
+    заголовке X-Data-Age. Устаревшие данные отдаются сразу, а обновление
+    из внешнего API идет в фоне; ждать его (ограниченно) приходится только
+    при отсутствии данных или превышении iss_max_stale_seconds. При условном
+    запросе с актуальной версией у клиента отвечаем 304.
+    """
+    try:
+        max_age = max_age_for(app_state.settings.iss_every_seconds)
+        
+        # Один запрос к кэшу: при попадании БД не используется
+        entry, generation = await response_cache.lookup(ISS_LAST_KEY)
+        if entry is None and is_conditional(request):
+            # Без кэша сверяем версию по id последней записи, не читая payload
+            meta = await IssRepo(session).get_last_meta()
+            if meta:
+                etag = iss_last_etag(meta["id"])
+                last_modified = http_date(meta["fetched_at"])
+                age = _data_age(last_modified)
+                if is_not_modified(request, etag, last_modified) and not await _revalidate(age):
+                    return _with_age(not_modified_response(etag, last_modified, max_age), age)
         
-        if "message" in result:
-            # Если данных нет, пытаемся получить их из API
-            try:
-                await service.fetch_and_store()
-                result = await service.get_last()
-            except Exception as fetch_error:
-                # Если не удалось получить, возвращаем сообщение
-                return IssLastResponse(message=result.get("message", "no data"))
+        if entry is None:
+            entry = await _load_db_entry(session, generation)
+        age = _data_age(entry.last_modified) if entry else None
+        if await _revalidate(age):
+            # Появилась новая точка: перечитываем
+            entry = await _load_last_entry(session) or entry
+            age = _data_age(entry.last_modified)
         
-        return IssLastResponse(
-            id=result.get("id"),
-            fetched_at=result.get("fetched_at"),
-            source_url=result.get("source_url"),
-            payload=result.get("payload"),
-        )
+        if entry is None:
+            # Данных еще нет: обновление продолжается в фоне
+            return IssLastResponse(message="no data")
+        
+        response = conditional_response(request, entry.body, entry.etag, entry.last_modified, max_age)
+        return _with_age(response, age)
     except Exception as e:
         raise InternalServerError(detail=f"Error fetching ISS data: {str(e)}")
 
 
-async def trigger_iss_handler(session: AsyncSession) -> IssLastResponse:
-    """Триггер для получения и сохранения данных ISS"""
+async def trigger_iss_handler(session: AsyncSession) -> IssLastResponse | Response:
+    """
+    Триггер обновления данных ISS.
+    
+    Запускает (или присоединяется к уже идущему) фоновому обновлению, ждет
+    его не дольше iss_refresh_wait_seconds и возвращает последние данные.
+    """
     try:
-        repo = IssRepo(session)
-        client = IssClient()
-        service = IssService(repo, client)
-        
-        # Получаем и сохраняем данные
-        await service.fetch_and_store()
-        
-        # Возвращаем последние данные
-        return await last_iss_handler(session)
+        await iss_refresh_service.wait(app_state.settings.iss_refresh_wait_seconds)
+        entry = await _load_last_entry(session)
+        if entry is None:
+            return IssLastResponse(message="no data")
+        response = Response(content=entry.body, media_type="application/json")
+        return _with_age(response, _data_age(entry.last_modified))
     except Exception as e:
         raise InternalServerError(detail=f"Error triggering ISS fetch: {str(e)}")
 
@@ -54,16 +154,44 @@ async def trigger_iss_handler(session: AsyncSession) -> IssLastResponse:
 async def iss_trend_handler(
     session: AsyncSession,
     limit: int = 240,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    max_points: Optional[int] = None,
 ) -> dict[str, Any]:
-    """Получить тренд движения ISS"""
+    """
+    Получить тренд движения ISS.
+    
+    start/end: диапазон времени; если задана только одна граница,
+    вторая берется в ISS_TREND_DEFAULT_WINDOW от нее
+    max_points: целевое количество точек после прореживания
+    """
     try:
+        settings = app_state.settings
+        if start is not None or end is not None:
+            if start is not None and start.tzinfo is None:
+                start = start.replace(tzinfo=timezone.utc)
+            if end is not None and end.tzinfo is None:
+                end = end.replace(tzinfo=timezone.utc)
+            if end is None:
+                end = min(start + ISS_TREND_DEFAULT_WINDOW, datetime.now(timezone.utc))
+            if start is None:
+                start = end - ISS_TREND_DEFAULT_WINDOW
+            if start >= end:
+                raise BadRequestError(detail="'from' must be earlier than 'to'")
+            if max_points is None:
+                max_points = settings.iss_trend_max_points
+        if max_points is not None:
+            max_points = Validators.validate_limit(max_points, min_value=3, max_value=settings.iss_trend_max_points_cap)
+        
         repo = IssRepo(session)
         client = IssClient()
         service = IssService(repo, client)
-        result = await service.calculate_trend(limit=limit)
+        result = await service.calculate_trend(limit=limit, start=start, end=end, max_points=max_points)
         
         # Возвращаем dict для совместимости с фронтендом (points не в IssTrendResponse)
         return result
+    except ApiError:
+        raise
     except Exception as e:
         raise InternalServerError(detail=f"Error calculating ISS trend: {str(e)}")
 
@@ -77,3 +205,42 @@ async def clear_iss_data_handler(session: AsyncSession) -> dict[str, Any]:
     except Exception as e:
         raise InternalServerError(detail=f"Error clearing ISS data: {str(e)}")
 
+
+
+async def iss_stream_handler(request: Request) -> StreamingResponse:
+    """
+    Поток позиций ISS в формате Server-Sent Events.
+    
+    Клиент сначала получает буфер последних точек (после Last-Event-ID, если
+    он передан при переподключении), затем новые точки по мере публикации.
+    БД на этом пути не используется.
+    """
+    after_id = None
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id:
+        try:
+            after_id = int(last_event_id)
+        except ValueError:
+            raise BadRequestError(detail="Invalid Last-Event-ID")
+    heartbeat = app_state.settings.iss_stream_heartbeat_seconds
+    
+    async def events():
+        async with iss_stream_service.subscribe(after_id=after_id) as queue:
+            yield f"retry: {heartbeat * 1000}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    sample = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    # Комментарий держит соединение открытым через прокси
+                    yield ": ping\n\n"
+                    continue
+                yield f"id: {sample.get('id')}\nevent: position\ndata: {json.dumps(sample)}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # nginx не должен буферизовать поток
+        },
+    )
@@ -1,7 +1,7 @@
 from app.state.app_state import app_state
 from app.clients.jwst_client import JwstClient
 from app.services.jwst_service import JwstService
-from app.utils.errors import ApiError, InternalServerError
+from app.utils.errors import ApiError, InternalServerError, UpstreamError
 from app.utils.jwst_helpers import pick_image_url
 from typing import Any
 import re
@@ -166,7 +166,7 @@ async def jwst_feed_handler(
             "items": [],
             "source": source,
             "count": 0,
-            "error": str(e),
+            "error": e.detail if isinstance(e, UpstreamError) else str(e),
         }
 
 
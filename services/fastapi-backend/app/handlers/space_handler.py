@@ -1,33 +1,87 @@
 from app.state.app_state import app_state
 from app.repo.cache_repo import CacheRepo
-from app.repo.iss_repo import IssRepo
-from app.repo.osdr_repo import OsdrRepo
+from app.repo.summary_repo import SummaryRepo
 from app.clients.nasa_client import NasaClient
-from app.domain.models import SpaceLatestResponse, SpaceRefreshResponse, SpaceSummaryResponse
+from app.services.space_service import SpaceService, SPACE_SOURCES
+from app.redis.cache import (
+    CachedResponse,
+    response_cache,
+    space_latest_entry,
+    space_latest_etag,
+    space_latest_key,
+    space_summary_etag,
+    SPACE_SUMMARY_KEY,
+)
+from app.domain.models import SpaceLatestResponse, SpaceRefreshResponse
 from app.utils.errors import ApiError, InternalServerError
-from fastapi import Query
+from app.utils.json_body import dumps_with_raw
+from app.utils.http_cache import (
+    conditional_response,
+    http_date,
+    is_conditional,
+    is_not_modified,
+    max_age_for,
+    not_modified_response,
+)
+from fastapi import Request
+from fastapi.responses import Response
+import time
 
 
+def source_max_age(source: str) -> int:
+    """Cache-Control max-age источника по интервалу его задачи в планировщике"""
+    settings = app_state.settings
+    intervals = {
+        "apod": settings.apod_every_seconds,
+        "neo": settings.neo_every_seconds,
+        "flr": settings.donki_every_seconds,
+        "cme": settings.donki_every_seconds,
+        "spacex": settings.spacex_every_seconds,
+    }
+    return max_age_for(intervals.get(source, min(intervals.values())))
 
 
 async def space_latest_handler(
+    request: Request,
     source: str,
-) -> SpaceLatestResponse:
-    """Получить последние данные из кэша по источнику"""
+) -> SpaceLatestResponse | Response:
+    """
+    Получить последние данные из кэша по источнику.
+    
+    Payload не декодируется: тело ответа собирается из payload::text
+    или берется готовым из кэша ответов. Если у клиента актуальная
+    версия (If-None-Match / If-Modified-Since), отвечаем 304 по метаданным
+    строки, не читая payload.
+    """
     try:
+        max_age = source_max_age(source)
+        cache_key = space_latest_key(source)
+        cached, generation = await response_cache.lookup(cache_key)
+        if cached is not None:
+            return conditional_response(request, cached.body, cached.etag, cached.last_modified, max_age)
+        
         session_factory = await app_state.get_db()
         async with session_factory() as session:
             repo = CacheRepo(session)
-            result = await repo.get_latest(source)
+            
+            if is_conditional(request):
+                meta = await repo.get_latest_meta(source)
+                if meta:
+                    etag = space_latest_etag(meta["id"], meta["fetched_at"], meta["content_hash"])
+                    last_modified = http_date(meta["fetched_at"])
+                    if is_not_modified(request, etag, last_modified):
+                        return not_modified_response(etag, last_modified, max_age)
+            
+            result = await repo.get_latest_raw(source)
             
             if not result:
                 return SpaceLatestResponse(source=source, message="no data")
             
-            return SpaceLatestResponse(
-                source=source,
-                fetched_at=result.get("fetched_at"),
-                payload=result.get("payload"),
+            entry = space_latest_entry(
+                source, result["id"], result["fetched_at"], result["content_hash"], result["payload"]
             )
+            await response_cache.set(cache_key, entry, app_state.settings.cache_space_ttl_seconds, generation)
+            return conditional_response(request, entry.body, entry.etag, entry.last_modified, max_age)
     except Exception as e:
         raise InternalServerError(detail=f"Error fetching space cache: {str(e)}")
 
@@ -35,96 +89,87 @@ async def space_latest_handler(
 async def space_refresh_handler(
     src: str = "apod,neo,flr,cme,spacex",
 ) -> SpaceRefreshResponse:
-    """Обновить кэш для указанных источников"""
+    """
+    Обновить кэш для указанных источников.
+    
+    Источники запрашиваются параллельно с собственными дедлайнами и
+    записываются одной транзакцией; в ответе статус и время по каждому.
+    """
     try:
+        started = time.monotonic()
+        sources = []
+        for source in (s.strip().lower() for s in src.split(",")):
+            if source in SPACE_SOURCES and source not in sources:
+                sources.append(source)
+        
         session_factory = await app_state.get_db()
         async with session_factory() as session:
-            repo = CacheRepo(session)
-            client = NasaClient()
-            refreshed = []
-            
-            sources = [s.strip().lower() for s in src.split(",")]
-            
-            for source in sources:
-                try:
-                    if source == "apod":
-                        data = await client.fetch_apod()
-                        await repo.insert_cache("apod", data)
-                        refreshed.append("apod")
-                    elif source == "neo":
-                        data = await client.fetch_neo_feed()
-                        await repo.insert_cache("neo", data)
-                        refreshed.append("neo")
-                    elif source == "flr":
-                        data = await client.fetch_donki_flr()
-                        await repo.insert_cache("flr", data)
-                        refreshed.append("flr")
-                    elif source == "cme":
-                        data = await client.fetch_donki_cme()
-                        await repo.insert_cache("cme", data)
-                        refreshed.append("cme")
-                    elif source == "spacex":
-                        data = await client.fetch_spacex_next()
-                        await repo.insert_cache("spacex", data)
-                        refreshed.append("spacex")
-                except Exception as e:
-                    # Продолжаем обработку других источников при ошибке
-                    continue
-            
-            return SpaceRefreshResponse(refreshed=refreshed)
+            service = SpaceService(CacheRepo(session), NasaClient())
+            statuses = await service.refresh_many(sources)
+        
+        return SpaceRefreshResponse(
+            refreshed=[status["source"] for status in statuses if status["status"] == "ok"],
+            sources=statuses,
+            duration_ms=int((time.monotonic() - started) * 1000),
+        )
     except Exception as e:
         raise InternalServerError(detail=f"Error refreshing space cache: {str(e)}")
 
 
-async def space_summary_handler() -> SpaceSummaryResponse:
-    """Получить сводку всех космических данных"""
+def _summary_validators(summary: dict) -> tuple[str, str | None]:
+    """ETag и Last-Modified сводки по версиям данных (без payload)"""
+    etag = space_summary_etag(summary["cache"], summary["iss"], summary["osdr_count"])
+    fetched = [data["fetched_at"] for data in [*summary["cache"].values(), summary["iss"]] if data]
+    return etag, http_date(max(fetched)) if fetched else None
+
+
+async def space_summary_handler(request: Request) -> Response:
+    """
+    Получить сводку всех космических данных (payload вклеиваются без декодирования).
+    
+    Валидаторы строятся из версий строк и количества OSDR: на условный
+    запрос без изменений отвечаем 304 по метаданным, не читая payload.
+    """
     try:
+        # Сводка включает ISS - самый часто обновляемый источник
+        max_age = max_age_for(app_state.settings.iss_every_seconds)
+        cached, generation = await response_cache.lookup(SPACE_SUMMARY_KEY)
+        if cached is not None:
+            return conditional_response(request, cached.body, cached.etag, cached.last_modified, max_age)
+        
         session_factory = await app_state.get_db()
         async with session_factory() as session:
-            cache_repo = CacheRepo(session)
-            iss_repo = IssRepo(session)
-            osdr_repo = OsdrRepo(session)
+            repo = SummaryRepo(session)
             
-            # Получаем данные из кэша
-            apod_data = await cache_repo.get_latest("apod")
-            neo_data = await cache_repo.get_latest("neo")
-            flr_data = await cache_repo.get_latest("flr")
-            cme_data = await cache_repo.get_latest("cme")
-            spacex_data = await cache_repo.get_latest("spacex")
+            if is_conditional(request):
+                etag, last_modified = _summary_validators(
+                    await repo.get_summary_meta(list(SPACE_SOURCES))
+                )
+                if is_not_modified(request, etag, last_modified):
+                    return not_modified_response(etag, last_modified, max_age)
             
-            # Получаем последние данные ISS
-            iss_last = await iss_repo.get_last()
+            # Кэш, ISS и количество OSDR - одним запросом
+            summary = await repo.get_summary(list(SPACE_SOURCES))
             
-            # Получаем количество OSDR элементов
-            osdr_count = await osdr_repo.count()
+            def entry(data):
+                return {
+                    "at": data["fetched_at"] if data else None,
+                    "payload": data["payload"] if data else {}
+                }
             
-            return SpaceSummaryResponse(
-                apod={
-                    "at": apod_data["fetched_at"] if apod_data else None,
-                    "payload": apod_data["payload"] if apod_data else {}
-                },
-                neo={
-                    "at": neo_data["fetched_at"] if neo_data else None,
-                    "payload": neo_data["payload"] if neo_data else {}
-                },
-                flr={
-                    "at": flr_data["fetched_at"] if flr_data else None,
-                    "payload": flr_data["payload"] if flr_data else {}
-                },
-                cme={
-                    "at": cme_data["fetched_at"] if cme_data else None,
-                    "payload": cme_data["payload"] if cme_data else {}
-                },
-                spacex={
-                    "at": spacex_data["fetched_at"] if spacex_data else None,
-                    "payload": spacex_data["payload"] if spacex_data else {}
-                },
-                iss={
-                    "at": iss_last["fetched_at"] if iss_last else None,
-                    "payload": iss_last["payload"] if iss_last else {}
-                },
-                osdr_count=osdr_count,
+            # Порядок и формат полей - как у SpaceSummaryResponse
+            cache = summary["cache"]
+            body = dumps_with_raw({
+                **{source: entry(cache.get(source)) for source in SPACE_SOURCES},
+                "iss": entry(summary["iss"]),
+                "osdr_count": summary["osdr_count"],
+            })
+            
+            etag, last_modified = _summary_validators(summary)
+            cached = CachedResponse(body=body, etag=etag, last_modified=last_modified)
+            await response_cache.set(
+                SPACE_SUMMARY_KEY, cached, app_state.settings.cache_summary_ttl_seconds, generation
             )
+            return conditional_response(request, cached.body, cached.etag, cached.last_modified, max_age)
     except Exception as e:
         raise InternalServerError(detail=f"Error fetching space summary: {str(e)}")
-
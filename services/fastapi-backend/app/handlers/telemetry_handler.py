@@ -1,27 +1,42 @@
 from app.state.app_state import app_state
 from app.repo.telemetry_repo import TelemetryRepo
 from app.services.telemetry_service import TelemetryService
-from app.utils.errors import InternalServerError
+from app.utils.errors import ApiError, InternalServerError
+from app.utils.cursor import encode_cursor, decode_cursor
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Any
+from typing import Any, Optional
 
 
 async def telemetry_list_handler(
     session: AsyncSession,
     limit: int = 100,
+    cursor: Optional[str] = None,
 ) -> dict[str, Any]:
-    """Получить список элементов telemetry_legacy"""
+    """
+    Получить страницу элементов telemetry_legacy.
+
+    next_cursor передается в следующий запрос как cursor; None - страниц больше нет.
+    """
     try:
+        after = decode_cursor(cursor) if cursor else None
         repo = TelemetryRepo(session)
         service = TelemetryService(repo)
-        items = await service.list_items(limit=limit)
-        count = await service.count()
+        # Берем на одну строку больше, чтобы понять, есть ли следующая страница
+        items = await service.list_items(limit=limit + 1, after=after)
+        has_more = len(items) > limit
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1]["recorded_at"], items[-1]["id"]) if has_more else None
+        # Общее количество считаем только на первой странице: COUNT(*) на каждой
+        # странице сделал бы обход всей истории квадратичным
+        count = await service.count() if after is None else None
 
         return {
             "items": items,
             "count": count,
             "limit": limit,
+            "next_cursor": next_cursor,
         }
+    except ApiError:
+        raise
     except Exception as e:
         raise InternalServerError(detail=f"Error fetching telemetry data: {str(e)}")
-
@@ -0,0 +1,301 @@
+"""
+Read-through кэш ответов для горячих эндпоинтов.
+
+Два уровня: общий кэш в Redis (hash с готовым JSON-телом ответа и его
+валидаторами ETag/Last-Modified, с TTL) и короткоживущая локальная копия в
+памяти воркера. Тела хранятся строками и отдаются без декодирования. Записи данных (CacheRepo/IssRepo) сразу
+кладут свежий ответ в Redis и публикуют имена ключей в канал инвалидации,
+по которому каждый воркер удаляет свои локальные копии. Ошибки Redis не
+ломают запрос: чтение просто идет в БД.
+
+Каждая запись публикации увеличивает поколение ключа (поле gen hash).
+Read-through запись после чтения из БД проходит, только если поколение не
+изменилось с момента промаха: иначе ответ, прочитанный до публикации,
+затер бы более новый.
+"""
+from app.state.app_state import app_state
+from app.utils.http_cache import make_etag, http_date
+from app.utils.json_body import RawJson, space_latest_body, iss_last_body
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+import asyncio
+import hashlib
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+SPACE_SUMMARY_KEY = "cache:space:summary"
+ISS_LAST_KEY = "cache:iss:last"
+
+
+# Поля hash с телом ответа (поле gen - поколение ключа)
+_ENTRY_FIELDS = ("body", "etag", "last_modified")
+
+# Удаленный публикацией ключ остается с полем gen, пока могут завершаться
+# read-through чтения, начатые до удаления
+_TOMBSTONE_TTL_SECONDS = 3600
+
+# Записать ответ, только если поколение ключа не изменилось (ARGV: gen, ttl, поле, значение, ...)
+_SET_IF_GENERATION_SCRIPT = """
+local gen = tonumber(redis.call("hget", KEYS[1], "gen") or "0")
+if gen ~= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call("hdel", KEYS[1], "body", "etag", "last_modified")
+for i = 3, #ARGV, 2 do
+    redis.call("hset", KEYS[1], ARGV[i], ARGV[i + 1])
+end
+redis.call("expire", KEYS[1], ARGV[2])
+return 1
+"""
+
+
+def space_latest_key(source: str) -> str:
+    return f"cache:space:{source}:latest"
+
+
+def cms_block_key(slug: str) -> str:
+    return f"cache:cms:block:{slug}"
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """Готовое тело ответа и его HTTP-валидаторы"""
+    body: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None  # HTTP-date
+    
+    def to_redis(self) -> dict[str, str]:
+        fields = {"body": self.body}
+        if self.etag:
+            fields["etag"] = self.etag
+        if self.last_modified:
+            fields["last_modified"] = self.last_modified
+        return fields
+    
+    @classmethod
+    def from_redis(cls, fields: dict[str, str]) -> Optional["CachedResponse"]:
+        if "body" not in fields:
+            return None
+        return cls(
+            body=fields["body"],
+            etag=fields.get("etag"),
+            last_modified=fields.get("last_modified"),
+        )
+
+
+def space_latest_etag(row_id: int, fetched_at: datetime, content_hash: Optional[str]) -> str:
+    """ETag версии источника: хэш содержимого и fetched_at (он входит в тело ответа)"""
+    version = content_hash[:32] if content_hash else f"id{row_id}"
+    return make_etag(f"{version}-{int(fetched_at.timestamp() * 1_000_000)}")
+
+
+def iss_last_etag(row_id: int) -> str:
+    """ETag последней записи ISS: строки iss_fetch_log не изменяются"""
+    return make_etag(f"iss-{row_id}")
+
+
+def space_summary_etag(
+    cache: dict[str, dict[str, Any]],
+    iss: Optional[dict[str, Any]],
+    osdr_count: int,
+) -> str:
+    """ETag сводки: версии источников, последняя запись ISS и количество OSDR"""
+    parts = [
+        f"{source}:{meta['id']}:{meta['content_hash'] or ''}:{int(meta['fetched_at'].timestamp() * 1_000_000)}"
+        for source, meta in sorted(cache.items())
+    ]
+    parts.append(f"iss:{iss['id'] if iss else ''}")
+    parts.append(f"osdr:{osdr_count}")
+    return make_etag(hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:32])
+
+
+def space_latest_entry(
+    source: str,
+    row_id: int,
+    fetched_at: datetime,
+    content_hash: Optional[str],
+    payload: RawJson,
+) -> CachedResponse:
+    """Ответ /space/{source}/latest с валидаторами"""
+    return CachedResponse(
+        body=space_latest_body(source, fetched_at, payload),
+        etag=space_latest_etag(row_id, fetched_at, content_hash),
+        last_modified=http_date(fetched_at),
+    )
+
+
+def iss_last_entry(row_id: int, fetched_at: datetime, source_url: str, payload: RawJson) -> CachedResponse:
+    """Ответ /iss/last с валидаторами"""
+    return CachedResponse(
+        body=iss_last_body(row_id, fetched_at, source_url, payload),
+        etag=iss_last_etag(row_id),
+        last_modified=http_date(fetched_at),
+    )
+
+
+class ResponseCache:
+    """Кэш JSON-тел ответов: Redis + локальная копия в воркере"""
+    
+    def __init__(self):
+        self._local: dict[str, tuple[float, CachedResponse]] = {}
+        self._listener: Optional[asyncio.Task] = None
+    
+    @property
+    def enabled(self) -> bool:
+        return app_state.settings.cache_enabled
+    
+    def _set_local(self, key: str, entry: CachedResponse, ttl: Optional[float] = None):
+        local_ttl = app_state.settings.cache_local_ttl_seconds
+        if ttl is not None:
+            local_ttl = min(ttl, local_ttl)
+        if local_ttl > 0:
+            self._local[key] = (time.monotonic() + local_ttl, entry)
+    
+    def _drop_local(self, keys: list[str]):
+        for key in keys:
+            self._local.pop(key, None)
+    
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        """Получить ответ: сначала локальная копия, затем Redis"""
+        entry, _ = await self.lookup(key)
+        return entry
+    
+    async def lookup(self, key: str) -> tuple[Optional[CachedResponse], Optional[int]]:
+        """
+        Получить ответ и поколение ключа.
+        
+        При промахе поколение передается в set() после чтения из БД.
+        None - поколение неизвестно (кэш выключен или Redis недоступен),
+        такой ответ в кэш не записывается.
+        """
+        if not self.enabled:
+            return None, None
+        
+        local = self._local.get(key)
+        if local is not None:
+            expires_at, entry = local
+            if expires_at > time.monotonic():
+                return entry, None
+            self._local.pop(key, None)
+        
+        try:
+            redis = await app_state.get_redis()
+            fields = await redis.hgetall(key)
+        except Exception as e:
+            logger.warning(f"Cache read failed for {key}: {e}")
+            return None, None
+        fields = fields or {}
+        try:
+            generation = int(fields.get("gen", 0))
+        except ValueError:
+            generation = 0
+        entry = CachedResponse.from_redis(fields)
+        if entry is None:
+            return None, generation
+        
+        self._set_local(key, entry)
+        return entry, generation
+    
+    async def set(self, key: str, entry: CachedResponse, ttl: int, generation: Optional[int]):
+        """
+        Сохранить прочитанный из БД ответ в Redis и локально.
+        
+        generation - поколение ключа из lookup() до чтения из БД: если
+        publish() успел записать более новую версию, ответ отбрасывается.
+        """
+        if not self.enabled or generation is None:
+            return
+        fields = [item for pair in entry.to_redis().items() for item in pair]
+        try:
+            redis = await app_state.get_redis()
+            written = await redis.eval(_SET_IF_GENERATION_SCRIPT, 1, key, generation, ttl, *fields)
+        except Exception as e:
+            logger.warning(f"Cache write failed for {key}: {e}")
+            return
+        if written:
+            self._set_local(key, entry, ttl)
+    
+    async def publish(
+        self,
+        set_values: dict[str, tuple[CachedResponse, int]],
+        delete_keys: Optional[list[str]] = None,
+    ):
+        """
+        Записать новые тела ответов, удалить зависимые ключи и разослать инвалидацию.
+        
+        Args:
+            set_values: key -> (ответ, TTL) для немедленного наполнения кэша
+            delete_keys: Ключи, которые нужно удалить (будут перечитаны из БД)
+        """
+        if not self.enabled:
+            return
+        delete_keys = delete_keys or []
+        keys = list(set_values) + delete_keys
+        self._drop_local(keys)
+        try:
+            redis = await app_state.get_redis()
+            async with redis.pipeline(transaction=True) as pipe:
+                # Ключи не удаляются целиком: поле gen должно пережить публикацию
+                for key in keys:
+                    pipe.hdel(key, *_ENTRY_FIELDS)
+                    pipe.hincrby(key, "gen", 1)
+                for key, (entry, ttl) in set_values.items():
+                    pipe.hset(key, mapping=entry.to_redis())
+                    pipe.expire(key, ttl)
+                for key in delete_keys:
+                    pipe.expire(key, _TOMBSTONE_TTL_SECONDS)
+                pipe.publish(INVALIDATION_CHANNEL, json.dumps(keys))
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Cache invalidation failed for {keys}: {e}")
+    
+    async def invalidate(self, *keys: str):
+        """Удалить ключи во всех воркерах"""
+        await self.publish({}, list(keys))
+    
+    async def _listen(self):
+        """Слушать канал инвалидации и удалять локальные копии"""
+        while True:
+            try:
+                redis = await app_state.get_redis()
+                pubsub = redis.pubsub()
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                try:
+                    async for message in pubsub.listen():
+                        if message.get("type") != "message":
+                            continue
+                        try:
+                            self._drop_local(json.loads(message["data"]))
+                        except (ValueError, TypeError):
+                            continue
+                finally:
+                    await pubsub.reset()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Пока подписка не работает, локальным копиям доверять нельзя
+                self._local.clear()
+                logger.warning(f"Cache invalidation listener error: {e}")
+                await asyncio.sleep(5)
+    
+    async def start(self):
+        """Запустить подписку на инвалидации"""
+        if self.enabled and self._listener is None:
+            self._listener = asyncio.create_task(self._listen(), name="cache:invalidation")
+    
+    async def stop(self):
+        """Остановить подписку"""
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        self._local.clear()
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,150 @@
+"""
+Общий бюджет запросов к внешним API по ключу доступа (token bucket в Redis).
+
+У api.nasa.gov часовая квота на ключ (у DEMO_KEY - совсем маленькая), и ее
+делят планировщик, /space/refresh, /astro/events и все воркеры. Перед каждым
+запросом клиент берет токен из общего ведра ключа; ведро пополняется
+равномерно со скоростью квоты. Часть ведра зарезервирована за задачами
+планировщика: обычные запросы не могут опустить остаток ниже резерва.
+Ответы с X-RateLimit-Remaining подтягивают остаток ведра к фактическому.
+Если Redis недоступен, запросы не ограничиваются.
+"""
+from app.state.app_state import app_state
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+import hashlib
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_SCHEDULED = "scheduled"
+PRIORITY_INTERACTIVE = "interactive"
+
+DEMO_KEY = "DEMO_KEY"
+
+_priority: ContextVar[str] = ContextVar("rate_budget_priority", default=PRIORITY_INTERACTIVE)
+
+# KEYS[1] - ведро; ARGV: now (мс), емкость, пополнение в токенах/мс, стоимость, резерв
+_ACQUIRE_SCRIPT = """
+local bucket = redis.call("hmget", KEYS[1], "tokens", "ts")
+local now = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local rate = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local reserve = tonumber(ARGV[5])
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens - cost >= reserve then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call("hset", KEYS[1], "tokens", tostring(tokens), "ts", tostring(now))
+redis.call("pexpire", KEYS[1], math.ceil(capacity / rate) + 60000)
+return {allowed, tostring(tokens)}
+"""
+
+# KEYS[1] - ведро; ARGV: now (мс), остаток по данным внешнего API
+_OBSERVE_SCRIPT = """
+local tokens = tonumber(redis.call("hget", KEYS[1], "tokens"))
+local remaining = tonumber(ARGV[2])
+if tokens == nil or remaining < tokens then
+    redis.call("hset", KEYS[1], "tokens", tostring(remaining), "ts", ARGV[1])
+end
+return 1
+"""
+
+
+class RateBudgetExceeded(Exception):
+    """Запрос не помещается в бюджет ключа; вызывающий должен отдать кэш"""
+    
+    def __init__(self, credential: str, retry_after: float):
+        self.credential = credential
+        self.retry_after = retry_after
+        super().__init__(f"Rate budget for {credential} exhausted, retry in {retry_after:.0f}s")
+
+
+@contextmanager
+def budget_priority(priority: str) -> Iterator[None]:
+    """Приоритет запросов к внешним API в текущем контексте (задаче asyncio)"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def nasa_credential(api_key: Optional[str]) -> str:
+    """Идентификатор ведра для ключа api.nasa.gov (сам ключ в Redis не попадает)"""
+    if not api_key or api_key == DEMO_KEY:
+        return f"nasa:{DEMO_KEY}"
+    return "nasa:" + hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+def _bucket_key(credential: str) -> str:
+    return f"ratelimit:{credential}"
+
+
+class RateBudget:
+    """Token bucket на ключ доступа, общий для всех воркеров"""
+    
+    def _limit_per_hour(self, credential: str) -> int:
+        settings = app_state.settings
+        if credential.endswith(f":{DEMO_KEY}"):
+            return settings.nasa_demo_rate_limit_per_hour
+        return settings.nasa_rate_limit_per_hour
+    
+    async def acquire(self, credential: str, cost: int = 1):
+        """
+        Взять токен перед запросом.
+        
+        Raises:
+            RateBudgetExceeded: если бюджет исчерпан (для обычных запросов -
+                если остаток опустился бы ниже резерва планировщика)
+        """
+        settings = app_state.settings
+        capacity = self._limit_per_hour(credential)
+        rate = capacity / 3_600_000  # токенов в мс
+        reserve = 0.0
+        if _priority.get() != PRIORITY_SCHEDULED:
+            reserve = capacity * settings.rate_budget_reserve_ratio
+        
+        try:
+            redis = await app_state.get_redis()
+            allowed, tokens = await redis.eval(
+                _ACQUIRE_SCRIPT,
+                1,
+                _bucket_key(credential),
+                int(time.time() * 1000),
+                capacity,
+                rate,
+                cost,
+                reserve,
+            )
+        except Exception as e:
+            logger.warning(f"Rate budget check failed for {credential}: {e}")
+            return
+        
+        if not int(allowed):
+            missing = reserve + cost - float(tokens)
+            raise RateBudgetExceeded(credential, max(missing, 0.0) / rate / 1000)
+    
+    async def observe(self, credential: str, remaining: int):
+        """Учесть остаток квоты, который сообщил внешний API"""
+        try:
+            redis = await app_state.get_redis()
+            await redis.eval(
+                _OBSERVE_SCRIPT,
+                1,
+                _bucket_key(credential),
+                int(time.time() * 1000),
+                max(remaining, 0),
+            )
+        except Exception as e:
+            logger.warning(f"Rate budget update failed for {credential}: {e}")
+
+
+rate_budget = RateBudget()
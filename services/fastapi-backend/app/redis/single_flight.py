@@ -0,0 +1,199 @@
+"""
+Single-flight для обращений к внешним API.
+
+Одинаковые обновления (ключ описывает запрос к внешнему API) выполняются
+один раз на кластер. Внутри воркера параллельные вызовы ждут общий Future,
+между воркерами и репликами лидер определяется блокировкой в Redis
+(SET NX PX), а результат передается остальным через короткоживущий ключ.
+Пока результат не истек, повторный вызов получает его без нового запроса.
+Ошибки квоты и недоступности внешнего API передаются ожидающим с типом и
+кодом, чтобы их можно было обработать так же, как у лидера.
+Если Redis недоступен, остается только объединение внутри воркера.
+"""
+from app.state.app_state import app_state
+from app.redis.rate_budget import RateBudgetExceeded
+from app.clients.circuit_breaker import CircuitOpenError
+from app.utils.errors import UpstreamError
+from typing import Any, Awaitable, Callable, Optional
+import asyncio
+import json
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Снять блокировку, только если она все еще наша
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlightError(Exception):
+    """Ошибка лидера, переданная ожидавшим вызовам"""
+
+
+def _encode_error(e: Exception) -> dict[str, Any]:
+    """Ошибка лидера для передачи через Redis (с типом и параметрами)"""
+    error: dict[str, Any] = {"error": str(e) or type(e).__name__}
+    if isinstance(e, RateBudgetExceeded):
+        error.update(kind="rate_budget", credential=e.credential, retry_after=e.retry_after)
+    elif isinstance(e, CircuitOpenError):
+        error.update(kind="circuit_open", host=e.host, retry_after=e.retry_after)
+    elif isinstance(e, UpstreamError):
+        error.update(kind="upstream", detail=e.detail, upstream_code=e.code)
+    return error
+
+
+def _decode_error(key: str, outcome: dict[str, Any]) -> Exception:
+    """Восстановить исключение лидера; неизвестные ошибки - SingleFlightError"""
+    kind = outcome.get("kind")
+    if kind == "rate_budget":
+        return RateBudgetExceeded(outcome["credential"], outcome["retry_after"])
+    if kind == "circuit_open":
+        return CircuitOpenError(outcome["host"], outcome["retry_after"])
+    if kind == "upstream":
+        return UpstreamError(detail=outcome["detail"], upstream_code=outcome["upstream_code"])
+    return SingleFlightError(f"{key}: {outcome['error']}")
+
+
+def _lock_key(key: str) -> str:
+    return f"flight:{key}:lock"
+
+
+def _result_key(key: str) -> str:
+    return f"flight:{key}:result"
+
+
+class SingleFlight:
+    """Объединение одинаковых обновлений внутри воркера и между воркерами"""
+    
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Future] = {}
+    
+    async def run(
+        self,
+        key: str,
+        func: Callable[[], Awaitable[Any]],
+        lock_ttl: Optional[float] = None,
+        result_ttl: Optional[float] = None,
+    ) -> Any:
+        """
+        Выполнить func один раз для всех одновременных вызовов с тем же ключом.
+        
+        Args:
+            key: Ключ запроса к внешнему API (например, "space:apod")
+            func: Корутина обновления; результат должен сериализоваться в JSON
+            lock_ttl: Время жизни блокировки лидера в секундах
+            result_ttl: Сколько секунд результат отдается последующим вызовам
+        
+        Raises:
+            RateBudgetExceeded, CircuitOpenError, UpstreamError: ошибка лидера
+                в другом воркере того же типа
+            SingleFlightError: если обновление у лидера в другом воркере
+                завершилось другой ошибкой
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+        
+        future = asyncio.get_running_loop().create_future()
+        # Исключение лидера без ожидающих не должно попадать в лог как необработанное
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            result = await self._run_cluster(key, func, lock_ttl, result_ttl)
+        except asyncio.CancelledError:
+            future.set_exception(SingleFlightError(f"{key}: cancelled"))
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+    
+    async def _run_cluster(
+        self,
+        key: str,
+        func: Callable[[], Awaitable[Any]],
+        lock_ttl: Optional[float],
+        result_ttl: Optional[float],
+    ) -> Any:
+        """Выполнить func под блокировкой в Redis или дождаться результата лидера"""
+        settings = app_state.settings
+        lock_ttl = lock_ttl or settings.single_flight_lock_ttl_seconds
+        result_ttl = result_ttl or settings.single_flight_result_ttl_seconds
+        
+        try:
+            redis = await app_state.get_redis()
+        except Exception as e:
+            logger.warning(f"Single-flight {key}: Redis unavailable, running locally: {e}")
+            return await func()
+        
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + lock_ttl
+        while True:
+            try:
+                stored = await redis.get(_result_key(key))
+                acquired = stored is None and await redis.set(
+                    _lock_key(key), token, nx=True, px=int(lock_ttl * 1000)
+                )
+            except Exception as e:
+                logger.warning(f"Single-flight {key}: Redis error, running locally: {e}")
+                return await func()
+            
+            if stored is not None:
+                return self._decode(key, stored)
+            if acquired:
+                return await self._lead(redis, key, token, func, result_ttl)
+            if time.monotonic() >= deadline:
+                # Лидер не уложился во время жизни блокировки
+                logger.warning(f"Single-flight {key}: timed out waiting for leader, running locally")
+                return await func()
+            await asyncio.sleep(settings.single_flight_poll_seconds)
+    
+    async def _lead(
+        self,
+        redis,
+        key: str,
+        token: str,
+        func: Callable[[], Awaitable[Any]],
+        result_ttl: float,
+    ) -> Any:
+        """Выполнить обновление лидером и опубликовать результат"""
+        outcome: Optional[dict[str, Any]] = None
+        try:
+            result = await func()
+            outcome = {"value": result}
+            return result
+        except Exception as e:
+            outcome = _encode_error(e)
+            raise
+        finally:
+            # При отмене результат не публикуется: ожидающие займут блокировку сами
+            try:
+                if outcome is not None:
+                    await redis.set(
+                        _result_key(key),
+                        json.dumps(outcome, default=str),
+                        px=int(result_ttl * 1000),
+                    )
+                await redis.eval(_RELEASE_SCRIPT, 1, _lock_key(key), token)
+            except Exception as e:
+                logger.warning(f"Single-flight {key}: could not publish result: {e}")
+    
+    @staticmethod
+    def _decode(key: str, stored: str) -> Any:
+        outcome = json.loads(stored)
+        if "error" in outcome:
+            raise _decode_error(key, outcome)
+        return outcome.get("value")
+
+
+single_flight = SingleFlight()
@@ -1,10 +1,16 @@
 from .iss_repo import IssRepo
 from .osdr_repo import OsdrRepo
 from .cache_repo import CacheRepo
+from .summary_repo import SummaryRepo
+from .neo_repo import NeoRepo
+from .donki_repo import DonkiRepo
 
 __all__ = [
     "IssRepo",
     "OsdrRepo",
     "CacheRepo",
+    "SummaryRepo",
+    "NeoRepo",
+    "DonkiRepo",
 ]
 
@@ -2,6 +2,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from typing import Optional
 from typing import Any
+from app.utils.hashing import content_hash
+from app.state.app_state import app_state
+from app.redis.cache import response_cache, space_latest_key, space_latest_entry, SPACE_SUMMARY_KEY
+from app.utils.json_body import RawJson
 
 
 class CacheRepo:
@@ -10,20 +14,81 @@ class CacheRepo:
     def __init__(self, session: AsyncSession):
         self.session = session
     
-    async def insert_cache(self, source: str, payload: dict[str, Any]) -> int:
-        """Вставить данные в кэш"""
+    async def insert_cache(self, source: str, payload: Any) -> int:
+        """
+        Вставить данные в кэш.
+        
+        payload - ответ источника: объект (APOD, NEO, SpaceX) или список
+        событий (FLR, CME).
+        
+        Если содержимое совпадает с последней версией источника (по хэшу),
+        новая строка не добавляется - у последней обновляется только fetched_at.
+        После записи свежий ответ кладется в кэш, а сводка инвалидируется.
+        """
+        ids = await self.insert_cache_many({source: payload})
+        return ids.get(source, 0)
+    
+    async def insert_cache_many(self, payloads: dict[str, Any]) -> dict[str, int]:
+        """
+        Вставить данные нескольких источников в одной транзакции.
+        
+        Каждый источник записывается как в insert_cache; кэш ответов
+        обновляется одной публикацией после commit. Тело кэша строится из
+        payload::text сохраненной строки - так же, как при чтении из БД,
+        поэтому у одной версии (и одного ETag) всегда одно и то же тело.
+        
+        Returns:
+            source -> id записи space_cache
+        """
         import json
-        result = await self.session.execute(
-            text("""
-                INSERT INTO space_cache(source, payload)
-                VALUES (:source, CAST(:payload AS jsonb))
-                RETURNING id
-            """),
-            {"source": source, "payload": json.dumps(payload)}
-        )
+        ids: dict[str, int] = {}
+        entries = {}
+        for source, payload in payloads.items():
+            payload_json = json.dumps(payload)
+            payload_hash = content_hash(payload)
+            result = await self.session.execute(
+                text("""
+                    WITH latest AS (
+                        SELECT id, content_hash
+                        FROM space_cache
+                        WHERE source = :source
+                        ORDER BY fetched_at DESC, id DESC
+                        LIMIT 1
+                    ),
+                    touched AS (
+                        UPDATE space_cache s
+                        SET fetched_at = now()
+                        FROM latest
+                        WHERE s.id = latest.id AND latest.content_hash = :content_hash
+                        RETURNING s.id, s.payload
+                    ),
+                    inserted AS (
+                        INSERT INTO space_cache(source, payload, content_hash)
+                        SELECT :source, CAST(:payload AS jsonb), :content_hash
+                        WHERE NOT EXISTS (SELECT 1 FROM touched)
+                        RETURNING id, payload
+                    )
+                    SELECT id, now() AS fetched_at, payload::text FROM touched
+                    UNION ALL
+                    SELECT id, now() AS fetched_at, payload::text FROM inserted
+                """),
+                {
+                    "source": source,
+                    "payload": payload_json,
+                    "content_hash": payload_hash,
+                }
+            )
+            row = result.fetchone()
+            if row:
+                ids[source] = row[0]
+                entries[space_latest_key(source)] = (
+                    space_latest_entry(source, row[0], row[1], payload_hash, RawJson(row[2])),
+                    app_state.settings.cache_space_ttl_seconds,
+                )
         await self.session.commit()
-        row = result.fetchone()
-        return row[0] if row else 0
+        if entries:
+            await response_cache.publish(entries, [SPACE_SUMMARY_KEY])
+        return ids
     
     async def get_latest(self, source: str) -> Optional[dict[str, Any]]:
         """Получить последние данные из кэша по источнику"""
@@ -32,7 +97,7 @@ class CacheRepo:
                 SELECT fetched_at, payload
                 FROM space_cache
                 WHERE source = :source
-                ORDER BY id DESC
+                ORDER BY fetched_at DESC, id DESC
                 LIMIT 1
             """),
             {"source": source}
@@ -44,4 +109,91 @@ class CacheRepo:
                 "payload": row[1],
             }
         return None
-
+    
+    async def get_latest_meta(self, source: str) -> Optional[dict[str, Any]]:
+        """Получить версию последних данных источника (id, fetched_at, content_hash) без payload"""
+        result = await self.session.execute(
+            text("""
+                SELECT id, fetched_at, content_hash
+                FROM space_cache
+                WHERE source = :source
+                ORDER BY fetched_at DESC, id DESC
+                LIMIT 1
+            """),
+            {"source": source}
+        )
+        row = result.fetchone()
+        if row:
+            return {
+                "id": row[0],
+                "fetched_at": row[1],
+                "content_hash": row[2],
+            }
+        return None
+    
+    async def get_latest_raw(self, source: str) -> Optional[dict[str, Any]]:
+        """Получить последние данные источника с payload в виде JSON-текста (без декодирования)"""
+        result = await self.session.execute(
+            text("""
+                SELECT id, fetched_at, content_hash, payload::text
+                FROM space_cache
+                WHERE source = :source
+                ORDER BY fetched_at DESC, id DESC
+                LIMIT 1
+            """),
+            {"source": source}
+        )
+        row = result.fetchone()
+        if row:
+            return {
+                "id": row[0],
+                "fetched_at": row[1],
+                "content_hash": row[2],
+                "payload": RawJson(row[3]),
+            }
+        return None
+    
+    async def prune(
+        self,
+        keep_versions: int,
+        retention_days: int,
+        source_limits: Optional[dict[str, int]] = None,
+    ) -> int:
+        """
+        Удалить старые версии кэша. Последняя версия источника не удаляется никогда.
+        
+        Args:
+            keep_versions: Сколько последних версий хранить на источник (0 - без ограничения)
+            retention_days: Сколько дней хранить версии (0 - без ограничения)
+            source_limits: Переопределение keep_versions для отдельных источников
+        
+        Returns:
+            Количество удаленных строк
+        """
+        import json
+        result = await self.session.execute(
+            text("""
+                DELETE FROM space_cache s
+                USING (
+                    SELECT
+                        id,
+                        source,
+                        fetched_at,
+                        row_number() OVER (PARTITION BY source ORDER BY fetched_at DESC, id DESC) AS rn
+                    FROM space_cache
+                ) v
+                WHERE s.id = v.id
+                  AND v.rn > 1
+                  AND (
+                      v.rn > NULLIF(COALESCE((CAST(:source_limits AS jsonb)->>v.source)::int, :keep_versions), 0)
+                      OR (:retention_days > 0 AND v.fetched_at < now() - make_interval(days => :retention_days))
+                  )
+            """),
+            {
+                "keep_versions": keep_versions,
+                "retention_days": retention_days,
+                "source_limits": json.dumps(source_limits or {}),
+            }
+        )
+        await self.session.commit()
+        return result.rowcount
@@ -0,0 +1,201 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from datetime import datetime
+from typing import Any, Optional
+import json
+
+
+class DonkiRepo:
+    """Репозиторий событий DONKI (donki_events): солнечные вспышки и CME"""
+    
+    def __init__(self, session: AsyncSession):
+        self.session = session
+    
+    async def upsert_events(self, rows: list[dict[str, Any]]) -> int:
+        """
+        Вставить или обновить события одним запросом (без commit).
+        
+        Вызывается в транзакции записи DONKI в space_cache; commit делает
+        вызывающий код. Ключ строки - activity_id; DONKI дополняет события
+        задним числом (связи, анализы CME), поэтому строка обновляется, если
+        изменился исходный объект.
+        
+        Args:
+            rows: Строки normalize_donki_events()
+        
+        Returns:
+            Количество вставленных и обновленных строк
+        """
+        keyed = {row["activity_id"]: row for row in rows}
+        if not keyed:
+            return 0
+        batch = list(keyed.values())
+        result = await self.session.execute(
+            text("""
+                INSERT INTO donki_events(
+                    activity_id, event_type, start_at, peak_at, end_at, class_type,
+                    source_location, active_region_num, linked_activity_ids, link, payload
+                )
+                SELECT
+                    activity_id, event_type, start_at, peak_at, end_at, class_type,
+                    source_location, active_region_num,
+                    ARRAY(SELECT jsonb_array_elements_text(CAST(linked AS jsonb))),
+                    link, CAST(payload AS jsonb)
+                FROM unnest(
+                    CAST(:activity_ids AS text[]),
+                    CAST(:event_types AS text[]),
+                    CAST(:start_ats AS timestamptz[]),
+                    CAST(:peak_ats AS timestamptz[]),
+                    CAST(:end_ats AS timestamptz[]),
+                    CAST(:class_types AS text[]),
+                    CAST(:source_locations AS text[]),
+                    CAST(:regions AS integer[]),
+                    CAST(:linked AS text[]),
+                    CAST(:links AS text[]),
+                    CAST(:payloads AS text[])
+                ) AS t(
+                    activity_id, event_type, start_at, peak_at, end_at, class_type,
+                    source_location, active_region_num, linked, link, payload
+                )
+                ON CONFLICT (activity_id) DO UPDATE
+                SET start_at = EXCLUDED.start_at,
+                    peak_at = EXCLUDED.peak_at,
+                    end_at = EXCLUDED.end_at,
+                    class_type = EXCLUDED.class_type,
+                    source_location = EXCLUDED.source_location,
+                    active_region_num = EXCLUDED.active_region_num,
+                    linked_activity_ids = EXCLUDED.linked_activity_ids,
+                    link = EXCLUDED.link,
+                    payload = EXCLUDED.payload,
+                    updated_at = now()
+                WHERE donki_events.payload IS DISTINCT FROM EXCLUDED.payload
+            """),
+            {
+                "activity_ids": [r["activity_id"] for r in batch],
+                "event_types": [r["event_type"] for r in batch],
+                "start_ats": [r["start_at"] for r in batch],
+                "peak_ats": [r["peak_at"] for r in batch],
+                "end_ats": [r["end_at"] for r in batch],
+                "class_types": [r["class_type"] for r in batch],
+                "source_locations": [r["source_location"] for r in batch],
+                "regions": [r["active_region_num"] for r in batch],
+                # Массив массивов разной длины через unnest не передать
+                "linked": [json.dumps(r["linked_activity_ids"]) for r in batch],
+                "links": [r["link"] for r in batch],
+                "payloads": [json.dumps(r["payload"]) for r in batch],
+            }
+        )
+        return result.rowcount
+    
+    async def last_event_at(self, event_type: str) -> Optional[datetime]:
+        """Время начала последнего сохраненного события типа"""
+        result = await self.session.execute(
+            text("SELECT max(start_at) FROM donki_events WHERE event_type = :event_type"),
+            {"event_type": event_type}
+        )
+        return result.scalar()
+    
+    async def recent_payloads(self, event_type: str, since: datetime) -> list[dict[str, Any]]:
+        """Исходные объекты событий типа, начавшихся не раньше since (в порядке DONKI)"""
+        result = await self.session.execute(
+            text("""
+                SELECT payload
+                FROM donki_events
+                WHERE event_type = :event_type AND start_at >= :since
+                ORDER BY start_at, id
+            """),
+            {"event_type": event_type, "since": since}
+        )
+        return [row[0] for row in result.fetchall()]
+    
+    @staticmethod
+    def _filter(
+        start: datetime,
+        end: datetime,
+        event_type: Optional[str],
+        class_prefix: Optional[str],
+        linked_to: Optional[str],
+        has_links: Optional[bool],
+    ) -> tuple[str, dict[str, Any]]:
+        """Условие выборки по окну времени начала и фильтрам"""
+        conditions = ["start_at >= :start", "start_at < :end"]
+        params: dict[str, Any] = {"start": start, "end": end}
+        if event_type:
+            conditions.append("event_type = :event_type")
+            params["event_type"] = event_type
+        if class_prefix:
+            conditions.append("upper(class_type) LIKE :class_prefix")
+            params["class_prefix"] = class_prefix.upper().replace("%", r"\%").replace("_", r"\_") + "%"
+        if linked_to:
+            conditions.append("linked_activity_ids @> ARRAY[CAST(:linked_to AS text)]")
+            params["linked_to"] = linked_to
+        if has_links is not None:
+            conditions.append("cardinality(linked_activity_ids) > 0" if has_links else "cardinality(linked_activity_ids) = 0")
+        return " AND ".join(conditions), params
+    
+    async def list_events(
+        self,
+        start: datetime,
+        end: datetime,
+        limit: int,
+        event_type: Optional[str] = None,
+        class_prefix: Optional[str] = None,
+        linked_to: Optional[str] = None,
+        has_links: Optional[bool] = None,
+        before: Optional[tuple[datetime, int]] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        События в окне [start, end) по времени начала, новые первыми.
+        
+        Порядок (start_at, id) по убыванию обслуживается индексом
+        ix_donki_events_type_start_id (без типа - ix_donki_events_start_id);
+        before - позиция последней строки предыдущей страницы.
+        """
+        where, params = self._filter(start, end, event_type, class_prefix, linked_to, has_links)
+        if before:
+            where += " AND (start_at, id) < (:before_key, :before_id)"
+            params.update(before_key=before[0], before_id=before[1])
+        result = await self.session.execute(
+            text(f"""
+                SELECT id, activity_id, event_type, start_at, peak_at, end_at, class_type,
+                       source_location, active_region_num, linked_activity_ids, link
+                FROM donki_events
+                WHERE {where}
+                ORDER BY start_at DESC, id DESC
+                LIMIT :limit
+            """),
+            {"limit": limit, **params}
+        )
+        return [
+            {
+                "id": row[0],
+                "activity_id": row[1],
+                "event_type": row[2],
+                "start_at": row[3],
+                "peak_at": row[4],
+                "end_at": row[5],
+                "class_type": row[6],
+                "source_location": row[7],
+                "active_region_num": row[8],
+                "linked_activity_ids": list(row[9] or []),
+                "link": row[10],
+            }
+            for row in result.fetchall()
+        ]
+    
+    async def count_events(
+        self,
+        start: datetime,
+        end: datetime,
+        event_type: Optional[str] = None,
+        class_prefix: Optional[str] = None,
+        linked_to: Optional[str] = None,
+        has_links: Optional[bool] = None,
+    ) -> int:
+        """Количество событий в окне с теми же фильтрами"""
+        where, params = self._filter(start, end, event_type, class_prefix, linked_to, has_links)
+        result = await self.session.execute(
+            text(f"SELECT count(*) FROM donki_events WHERE {where}"),
+            params
+        )
+        return result.scalar() or 0
@@ -3,6 +3,11 @@ from sqlalchemy import text
 from typing import Optional
 from datetime import datetime
 from typing import Any
+from app.database.partitions import ISS_POSITION_COLUMNS
+from app.utils.validators import extract_number
+from app.state.app_state import app_state
+from app.redis.cache import response_cache, iss_last_entry, ISS_LAST_KEY, SPACE_SUMMARY_KEY
+from app.utils.json_body import RawJson
 
 
 class IssRepo:
@@ -11,28 +16,68 @@ class IssRepo:
     def __init__(self, session: AsyncSession):
         self.session = session
     
-    async def insert_fetch_log(self, source_url: str, payload: dict[str, Any]) -> int:
-        """Вставить запись о получении данных ISS"""
+    async def insert_fetch_log(self, source_url: str, payload: dict[str, Any]) -> Optional[dict[str, Any]]:
+        """
+        Вставить запись о получении данных ISS (координаты - в типизированные колонки).
+        
+        Тело кэша /iss/last строится из payload::text вставленной строки, как
+        при чтении из БД: у одного ETag всегда одно тело.
+        
+        Returns:
+            {"id", "fetched_at"} вставленной строки (fetched_at - время БД)
+        """
         import json
+        payload_json = json.dumps(payload)
+        position = {
+            column: extract_number(payload.get(column)) if isinstance(payload, dict) else None
+            for column in ISS_POSITION_COLUMNS
+        }
         result = await self.session.execute(
             text("""
-                INSERT INTO iss_fetch_log (source_url, payload)
-                VALUES (:source_url, CAST(:payload AS jsonb))
-                RETURNING id
+                INSERT INTO iss_fetch_log
+                    (source_url, payload, latitude, longitude, velocity, altitude)
+                VALUES
+                    (:source_url, CAST(:payload AS jsonb), :latitude, :longitude, :velocity, :altitude)
+                RETURNING id, fetched_at, payload::text
             """),
-            {"source_url": source_url, "payload": json.dumps(payload)}
+            {"source_url": source_url, "payload": payload_json, **position}
         )
         await self.session.commit()
         row = result.fetchone()
-        return row[0] if row else 0
+        if row:
+            await response_cache.publish(
+                {
+                    ISS_LAST_KEY: (
+                        iss_last_entry(row[0], row[1], source_url, RawJson(row[2])),
+                        app_state.settings.cache_iss_ttl_seconds,
+                    ),
+                },
+                [SPACE_SUMMARY_KEY],
+            )
+        return {"id": row[0], "fetched_at": row[1]} if row else None
+    
+    async def get_last_meta(self) -> Optional[dict[str, Any]]:
+        """Получить id и fetched_at последней записи без payload"""
+        result = await self.session.execute(
+            text("""
+                SELECT id, fetched_at
+                FROM iss_fetch_log
+                ORDER BY fetched_at DESC, id DESC
+                LIMIT 1
+            """)
+        )
+        row = result.fetchone()
+        if row:
+            return {"id": row[0], "fetched_at": row[1]}
+        return None
     
-    async def get_last(self) -> Optional[dict[str, Any]]:
-        """Получить последнюю запись"""
+    async def get_last_raw(self) -> Optional[dict[str, Any]]:
+        """Получить последнюю запись с payload в виде JSON-текста (без декодирования)"""
         result = await self.session.execute(
             text("""
-                SELECT id, fetched_at, source_url, payload
+                SELECT id, fetched_at, source_url, payload::text
                 FROM iss_fetch_log
-                ORDER BY id DESC
+                ORDER BY fetched_at DESC, id DESC
                 LIMIT 1
             """)
         )
@@ -42,17 +87,18 @@ class IssRepo:
                 "id": row[0],
                 "fetched_at": row[1],
                 "source_url": row[2],
-                "payload": row[3],
+                "payload": RawJson(row[3]),
             }
         return None
     
     async def get_trend_data(self, limit: int = 2) -> list[dict[str, Any]]:
-        """Получить данные для расчета тренда"""
+        """Получить точки для расчета тренда (только типизированные колонки, без payload)"""
         result = await self.session.execute(
             text("""
-                SELECT fetched_at, payload
+                SELECT fetched_at, latitude, longitude, velocity, altitude
                 FROM iss_fetch_log
-                ORDER BY id DESC
+                WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+                ORDER BY fetched_at DESC, id DESC
                 LIMIT :limit
             """),
             {"limit": limit}
@@ -62,16 +108,85 @@ class IssRepo:
         return [
             {
                 "fetched_at": row[0],
-                "payload": row[1],
+                "latitude": row[1],
+                "longitude": row[2],
+                "velocity": row[3],
+                "altitude": row[4],
             }
             for row in reversed(rows)
         ]
     
+    async def get_trend_range(
+        self,
+        start: datetime,
+        end: datetime,
+        bucket_seconds: float = 0,
+    ) -> list[dict[str, Any]]:
+        """
+        Получить точки тренда за [start, end) в порядке от старых к новым.
+        
+        Args:
+            bucket_seconds: Ширина временной корзины; если больше нуля, из каждой
+                корзины берется только первая точка (грубое прореживание в БД)
+        """
+        params = {"start": start, "end": end}
+        if bucket_seconds > 0:
+            params["bucket"] = bucket_seconds
+            # Номер корзины вычисляется один раз: DISTINCT ON и ORDER BY
+            # ссылаются на одну колонку, а не на два выражения с разными параметрами
+            query = """
+                SELECT DISTINCT ON (b)
+                    fetched_at, latitude, longitude, velocity, altitude
+                FROM (
+                    SELECT fetched_at, id, latitude, longitude, velocity, altitude,
+                           floor(
+                               CAST(extract(epoch FROM fetched_at) AS double precision)
+                               / CAST(:bucket AS double precision)
+                           ) AS b
+                    FROM iss_fetch_log
+                    WHERE fetched_at >= :start AND fetched_at < :end
+                      AND latitude IS NOT NULL AND longitude IS NOT NULL
+                ) t
+                ORDER BY b, fetched_at, id
+            """
+        else:
+            query = """
+                SELECT fetched_at, latitude, longitude, velocity, altitude
+                FROM iss_fetch_log
+                WHERE fetched_at >= :start AND fetched_at < :end
+                  AND latitude IS NOT NULL AND longitude IS NOT NULL
+                ORDER BY fetched_at, id
+            """
+        result = await self.session.execute(text(query), params)
+        return [
+            {
+                "fetched_at": row[0],
+                "latitude": row[1],
+                "longitude": row[2],
+                "velocity": row[3],
+                "altitude": row[4],
+            }
+            for row in result.fetchall()
+        ]
+    
     async def clear_all_data(self) -> int:
-        """Удалить все данные из iss_fetch_log"""
+        """
+        Удалить все данные из iss_fetch_log (TRUNCATE всех секций, без DELETE).
+        
+        Returns:
+            Оценка количества удаленных строк по pg_class.reltuples секций
+            (без COUNT(*) по всей таблице)
+        """
         result = await self.session.execute(
-            text("DELETE FROM iss_fetch_log")
+            text("""
+                SELECT COALESCE(sum(GREATEST(c.reltuples, 0)), 0)::bigint
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'iss_fetch_log'::regclass
+            """)
         )
+        deleted = result.scalar() or 0
+        await self.session.execute(text("TRUNCATE iss_fetch_log"))
         await self.session.commit()
-        return result.rowcount
-
+        await response_cache.invalidate(ISS_LAST_KEY, SPACE_SUMMARY_KEY)
+        return deleted
@@ -0,0 +1,239 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from datetime import date, datetime
+from typing import Any, Optional
+import json
+
+
+class NeoRepo:
+    """Репозиторий NEO: сближения (neo_approaches) и feed по дням (neo_feed_days)"""
+    
+    def __init__(self, session: AsyncSession):
+        self.session = session
+    
+    async def upsert_approaches(self, rows: list[dict[str, Any]]) -> int:
+        """
+        Вставить или обновить сближения одним запросом (без commit).
+        
+        Вызывается в транзакции записи NEO feed в space_cache; commit делает
+        вызывающий код. Ключ строки - (neo_id, approach_at).
+        
+        Args:
+            rows: Строки normalize_neo_feed()
+        
+        Returns:
+            Количество вставленных и обновленных строк
+        """
+        # Внутри одного INSERT ... ON CONFLICT строка не может обновиться дважды
+        keyed = {(row["neo_id"], row["approach_at"]): row for row in rows}
+        if not keyed:
+            return 0
+        batch = list(keyed.values())
+        result = await self.session.execute(
+            text("""
+                INSERT INTO neo_approaches(
+                    neo_id, name, approach_at, orbiting_body,
+                    miss_distance_km, velocity_kmh, diameter_m, is_hazardous
+                )
+                SELECT * FROM unnest(
+                    CAST(:neo_ids AS text[]),
+                    CAST(:names AS text[]),
+                    CAST(:approach_ats AS timestamptz[]),
+                    CAST(:orbiting_bodies AS text[]),
+                    CAST(:distances AS double precision[]),
+                    CAST(:velocities AS double precision[]),
+                    CAST(:diameters AS double precision[]),
+                    CAST(:hazardous AS boolean[])
+                )
+                ON CONFLICT (neo_id, approach_at) DO UPDATE
+                SET name = EXCLUDED.name,
+                    orbiting_body = EXCLUDED.orbiting_body,
+                    miss_distance_km = EXCLUDED.miss_distance_km,
+                    velocity_kmh = EXCLUDED.velocity_kmh,
+                    diameter_m = EXCLUDED.diameter_m,
+                    is_hazardous = EXCLUDED.is_hazardous,
+                    updated_at = now()
+                WHERE (
+                    neo_approaches.miss_distance_km, neo_approaches.velocity_kmh,
+                    neo_approaches.diameter_m, neo_approaches.is_hazardous
+                ) IS DISTINCT FROM (
+                    EXCLUDED.miss_distance_km, EXCLUDED.velocity_kmh,
+                    EXCLUDED.diameter_m, EXCLUDED.is_hazardous
+                )
+            """),
+            {
+                "neo_ids": [r["neo_id"] for r in batch],
+                "names": [r["name"] for r in batch],
+                "approach_ats": [r["approach_at"] for r in batch],
+                "orbiting_bodies": [r["orbiting_body"] for r in batch],
+                "distances": [r["miss_distance_km"] for r in batch],
+                "velocities": [r["velocity_kmh"] for r in batch],
+                "diameters": [r["diameter_m"] for r in batch],
+                "hazardous": [r["is_hazardous"] for r in batch],
+            }
+        )
+        return result.rowcount
+    
+    async def get_feed_days(self, start: date, end: date) -> dict[date, dict[str, Any]]:
+        """
+        Сохраненные дни NEO feed в диапазоне [start, end] включительно.
+        
+        Returns:
+            {день: {"objects": список объектов дня, "fetched_at": время запроса}}
+        """
+        result = await self.session.execute(
+            text("""
+                SELECT day, objects, fetched_at
+                FROM neo_feed_days
+                WHERE day BETWEEN :start AND :end
+            """),
+            {"start": start, "end": end}
+        )
+        return {
+            row[0]: {"objects": row[1], "fetched_at": row[2]}
+            for row in result.fetchall()
+        }
+    
+    async def upsert_feed_days(self, days: dict[date, list[dict[str, Any]]], settle_hours: int) -> int:
+        """
+        Сохранить объекты feed по дням (без commit).
+        
+        День, запрошенный позже чем через settle_hours после его окончания
+        (UTC), считается окончательным и больше не перезаписывается.
+        
+        Returns:
+            Количество вставленных и обновленных дней
+        """
+        if not days:
+            return 0
+        ordered = sorted(days.items())
+        result = await self.session.execute(
+            text("""
+                INSERT INTO neo_feed_days(day, objects)
+                SELECT day, CAST(objects AS jsonb)
+                FROM unnest(CAST(:days AS date[]), CAST(:objects AS text[])) AS t(day, objects)
+                ON CONFLICT (day) DO UPDATE
+                SET objects = EXCLUDED.objects,
+                    fetched_at = now()
+                WHERE neo_feed_days.fetched_at <
+                    (neo_feed_days.day + 1)::timestamp AT TIME ZONE 'UTC'
+                    + make_interval(hours => :settle_hours)
+            """),
+            {
+                "days": [day for day, _ in ordered],
+                "objects": [json.dumps(objects) for _, objects in ordered],
+                "settle_hours": settle_hours,
+            }
+        )
+        return result.rowcount
+    
+    async def prune_feed_days(self, retention_days: int) -> int:
+        """Удалить дни feed старше retention_days (0 - хранить все)"""
+        if retention_days <= 0:
+            return 0
+        result = await self.session.execute(
+            text("""
+                DELETE FROM neo_feed_days
+                WHERE day < CAST(now() AT TIME ZONE 'UTC' AS date) - :retention_days
+            """),
+            {"retention_days": retention_days}
+        )
+        await self.session.commit()
+        return result.rowcount
+    
+    async def prune_approaches(self, retention_days: int) -> int:
+        """
+        Удалить сближения, прошедшие больше retention_days назад (0 - хранить все).
+        
+        Удаление идет по индексу ix_neo_approaches_approach_at_id; будущие
+        и недавние сближения остаются для /astro/events.
+        """
+        if retention_days <= 0:
+            return 0
+        result = await self.session.execute(
+            text("""
+                DELETE FROM neo_approaches
+                WHERE approach_at < now() - make_interval(days => :retention_days)
+            """),
+            {"retention_days": retention_days}
+        )
+        await self.session.commit()
+        return result.rowcount
+    
+    @staticmethod
+    def _filter(
+        start: datetime,
+        end: datetime,
+        hazardous_only: bool,
+        min_distance_km: Optional[float],
+    ) -> tuple[str, dict[str, Any]]:
+        """Условие выборки по окну времени сближения и фильтрам"""
+        conditions = ["approach_at >= :start", "approach_at < :end"]
+        params: dict[str, Any] = {"start": start, "end": end}
+        if hazardous_only:
+            conditions.append("is_hazardous")
+        if min_distance_km is not None:
+            conditions.append("miss_distance_km >= :min_distance_km")
+            params["min_distance_km"] = min_distance_km
+        return " AND ".join(conditions), params
+    
+    async def list_approaches(
+        self,
+        start: datetime,
+        end: datetime,
+        limit: int,
+        hazardous_only: bool = False,
+        min_distance_km: Optional[float] = None,
+        after: Optional[tuple[datetime, int]] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Сближения в окне [start, end) по времени сближения.
+        
+        Порядок (approach_at, id) по возрастанию обслуживается индексом
+        ix_neo_approaches_approach_at_id (для hazardous_only - частичным
+        индексом); after - позиция последней строки предыдущей страницы.
+        """
+        where, params = self._filter(start, end, hazardous_only, min_distance_km)
+        if after:
+            where += " AND (approach_at, id) > (:after_key, :after_id)"
+            params.update(after_key=after[0], after_id=after[1])
+        result = await self.session.execute(
+            text(f"""
+                SELECT id, neo_id, name, approach_at, orbiting_body,
+                       miss_distance_km, velocity_kmh, diameter_m, is_hazardous
+                FROM neo_approaches
+                WHERE {where}
+                ORDER BY approach_at, id
+                LIMIT :limit
+            """),
+            {"limit": limit, **params}
+        )
+        return [
+            {
+                "id": row[0],
+                "neo_id": row[1],
+                "name": row[2],
+                "approach_at": row[3],
+                "orbiting_body": row[4],
+                "miss_distance_km": row[5],
+                "velocity_kmh": row[6],
+                "diameter_m": row[7],
+                "is_hazardous": row[8],
+            }
+            for row in result.fetchall()
+        ]
+    
+    async def count_approaches(
+        self,
+        start: datetime,
+        end: datetime,
+        hazardous_only: bool = False,
+        min_distance_km: Optional[float] = None,
+    ) -> int:
+        """Количество сближений в окне с теми же фильтрами"""
+        where, params = self._filter(start, end, hazardous_only, min_distance_km)
+        result = await self.session.execute(
+            text(f"SELECT count(*) FROM neo_approaches WHERE {where}"),
+            params
+        )
+        return result.scalar() or 0
@@ -1,5 +1,6 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
+import re
 from typing import Optional
 from datetime import datetime
 from typing import Any
@@ -11,101 +12,236 @@ class OsdrRepo:
     def __init__(self, session: AsyncSession):
         self.session = session
     
-    async def upsert_item(
+    async def get_content_hashes(
         self,
-        dataset_id: Optional[str],
-        title: Optional[str],
-        status: Optional[str],
-        rest_url: Optional[str],
-        updated_at: Optional[datetime],
-        raw: dict[str, Any],
-    ) -> int:
+        dataset_ids: list[str],
+        hashes: list[str],
+    ) -> tuple[dict[str, Optional[str]], set[str]]:
         """
-        Вставить или обновить элемент OSDR.
+        Получить сохраненные хэши содержимого.
         
-        Использует Upsert по бизнес-ключу dataset_id (вместо слепого INSERT).
-        Это позволяет обновлять существующие записи при повторном получении данных,
-        избегая дубликатов и сохраняя актуальность данных.
+        Args:
+            dataset_ids: Бизнес-ключи датасетов
+            hashes: Хэши записей без dataset_id
+        
+        Returns:
+            Словарь dataset_id -> content_hash и множество уже сохраненных
+            хэшей среди записей без dataset_id
+        """
+        if not dataset_ids and not hashes:
+            return {}, set()
+        result = await self.session.execute(
+            text("""
+                SELECT dataset_id, content_hash
+                FROM osdr_items
+                WHERE dataset_id = ANY(CAST(:dataset_ids AS text[]))
+                   OR (dataset_id IS NULL AND content_hash = ANY(CAST(:hashes AS text[])))
+            """),
+            {"dataset_ids": dataset_ids, "hashes": hashes}
+        )
+        keyed: dict[str, Optional[str]] = {}
+        unkeyed: set[str] = set()
+        for dataset_id, stored_hash in result.fetchall():
+            if dataset_id is None:
+                unkeyed.add(stored_hash)
+            else:
+                keyed[dataset_id] = stored_hash
+        return keyed, unkeyed
+    
+    async def get_catalog_version(self) -> Optional[dict[str, Any]]:
+        """
+        Версия каталога OSDR (version, modified_at) без чтения osdr_items.
+        
+        version увеличивается bulk_upsert при каждой вставке или изменении
+        строк; 0 - каталог еще ни разу не синхронизировался.
+        """
+        result = await self.session.execute(
+            text("SELECT version, modified_at FROM osdr_catalog WHERE id = 1")
+        )
+        row = result.fetchone()
+        if row:
+            return {"version": row[0], "modified_at": row[1]}
+        return None
+    
+    async def bulk_upsert(self, rows: list[dict[str, Any]]) -> dict[str, int]:
+        """
+        Вставить или обновить пачку элементов OSDR одной транзакцией.
+        
+        Все строки передаются массивами через unnest(), поэтому синхронизация
+        делает один INSERT ... ON CONFLICT на всю пачку и один commit,
+        вместо отдельного запроса и fsync на каждый датасет.
         
         Args:
-            dataset_id: Бизнес-ключ для идентификации элемента
-            title: Название элемента
-            status: Статус элемента
-            updated_at: Дата обновления (TIMESTAMPTZ)
-            raw: Сырые данные в формате JSONB
+            rows: Словари с ключами dataset_id, title, status, rest_url, updated_at, raw, content_hash
         
         Returns:
-            ID вставленной/обновленной записи
+            Количество вставленных и обновленных записей
         """
         import json
-        if dataset_id:
-            # Upsert по бизнес-ключу dataset_id через ON CONFLICT
-            result = await self.session.execute(
-                text("""
-                    INSERT INTO osdr_items(dataset_id, title, status, rest_url, updated_at, raw)
-                    VALUES (:dataset_id, :title, :status, :rest_url, :updated_at, CAST(:raw AS jsonb))
-                    ON CONFLICT (dataset_id) DO UPDATE
-                    SET title = EXCLUDED.title,
-                        status = EXCLUDED.status,
-                        rest_url = EXCLUDED.rest_url,
-                        updated_at = EXCLUDED.updated_at,
-                        raw = EXCLUDED.raw
-                    RETURNING id
-                """),
-                {
-                    "dataset_id": dataset_id,
-                    "title": title,
-                    "status": status,
-                    "rest_url": rest_url,
-                    "updated_at": updated_at,
-                    "raw": json.dumps(raw),
-                }
-            )
-        else:
-            # Простой INSERT если нет dataset_id
-            result = await self.session.execute(
-                text("""
-                    INSERT INTO osdr_items(dataset_id, title, status, rest_url, updated_at, raw)
-                    VALUES (NULL, :title, :status, :rest_url, :updated_at, CAST(:raw AS jsonb))
-                    RETURNING id
-                """),
-                {
-                    "title": title,
-                    "status": status,
-                    "rest_url": rest_url,
-                    "updated_at": updated_at,
-                    "raw": json.dumps(raw),
-                }
-            )
+        # Внутри одного INSERT ... ON CONFLICT строка не может обновиться дважды,
+        # поэтому дубликаты dataset_id схлопываем (побеждает последний)
+        keyed: dict[str, dict[str, Any]] = {}
+        unkeyed: list[dict[str, Any]] = []
+        for row in rows:
+            if row.get("dataset_id"):
+                keyed[row["dataset_id"]] = row
+            else:
+                unkeyed.append(row)
         
-        await self.session.commit()
-        row = result.fetchone()
-        return row[0] if row else 0
+        inserted = 0
+        updated = 0
+        try:
+            if keyed:
+                batch = list(keyed.values())
+                result = await self.session.execute(
+                    text("""
+                        INSERT INTO osdr_items(dataset_id, title, status, rest_url, updated_at, raw, content_hash)
+                        SELECT * FROM unnest(
+                            CAST(:dataset_ids AS text[]),
+                            CAST(:titles AS text[]),
+                            CAST(:statuses AS text[]),
+                            CAST(:rest_urls AS text[]),
+                            CAST(:updated_ats AS timestamptz[]),
+                            CAST(CAST(:raws AS text[]) AS jsonb[]),
+                            CAST(:content_hashes AS text[])
+                        )
+                        ON CONFLICT (dataset_id) WHERE dataset_id IS NOT NULL DO UPDATE
+                        SET title = EXCLUDED.title,
+                            status = EXCLUDED.status,
+                            rest_url = EXCLUDED.rest_url,
+                            updated_at = EXCLUDED.updated_at,
+                            raw = EXCLUDED.raw,
+                            content_hash = EXCLUDED.content_hash
+                        WHERE osdr_items.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+                        RETURNING (xmax = 0) AS inserted
+                    """),
+                    {
+                        "dataset_ids": [r["dataset_id"] for r in batch],
+                        "titles": [r.get("title") for r in batch],
+                        "statuses": [r.get("status") for r in batch],
+                        "rest_urls": [r.get("rest_url") for r in batch],
+                        "updated_ats": [r.get("updated_at") for r in batch],
+                        "raws": [json.dumps(r["raw"]) for r in batch],
+                        "content_hashes": [r.get("content_hash") for r in batch],
+                    }
+                )
+                for (was_inserted,) in result.fetchall():
+                    if was_inserted:
+                        inserted += 1
+                    else:
+                        updated += 1
+            
+            if unkeyed:
+                # Без бизнес-ключа upsert невозможен - простая вставка
+                result = await self.session.execute(
+                    text("""
+                        INSERT INTO osdr_items(dataset_id, title, status, rest_url, updated_at, raw, content_hash)
+                        SELECT NULL, * FROM unnest(
+                            CAST(:titles AS text[]),
+                            CAST(:statuses AS text[]),
+                            CAST(:rest_urls AS text[]),
+                            CAST(:updated_ats AS timestamptz[]),
+                            CAST(CAST(:raws AS text[]) AS jsonb[]),
+                            CAST(:content_hashes AS text[])
+                        )
+                    """),
+                    {
+                        "titles": [r.get("title") for r in unkeyed],
+                        "statuses": [r.get("status") for r in unkeyed],
+                        "rest_urls": [r.get("rest_url") for r in unkeyed],
+                        "updated_ats": [r.get("updated_at") for r in unkeyed],
+                        "raws": [json.dumps(r["raw"]) for r in unkeyed],
+                        "content_hashes": [r.get("content_hash") for r in unkeyed],
+                    }
+                )
+                inserted += result.rowcount
+            
+            if inserted or updated:
+                # В той же транзакции: версия не опережает и не отстает от строк
+                await self.session.execute(text("""
+                    INSERT INTO osdr_catalog(id, version, modified_at) VALUES (1, 1, now())
+                    ON CONFLICT (id) DO UPDATE
+                    SET version = osdr_catalog.version + 1, modified_at = now()
+                """))
+            
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            raise
+        
+        return {"inserted": inserted, "updated": updated}
+    
+    @staticmethod
+    def _search_filter(search: str) -> tuple[str, dict[str, Any]]:
+        """
+        Условие поиска, которое обслуживается GIN индексами.
+        
+        Слова запроса ищутся префиксно по search_vector (полнотекстовый индекс),
+        а подстрока целиком - по search_text через триграммный индекс
+        (pg_trgm использует его для LIKE '%...%' от 3 символов).
+        """
+        term = search.lower().strip()
+        words = re.findall(r"[^\W_]+", term)
+        conditions = []
+        params: dict[str, Any] = {}
+        if words:
+            conditions.append("search_vector @@ to_tsquery('simple', :tsquery)")
+            params["tsquery"] = " & ".join(f"{word}:*" for word in words)
+        if len(term) >= 3 or not words:
+            escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            conditions.append("search_text LIKE :search_pattern")
+            params["search_pattern"] = f"%{escaped}%"
+        return "(" + " OR ".join(conditions) + ")", params
     
-    async def list_items(self, limit: int = 20, search: Optional[str] = None) -> list[dict[str, Any]]:
+    async def list_items(
+        self,
+        limit: int = 20,
+        search: Optional[str] = None,
+        after: Optional[tuple[datetime, int]] = None,
+        include_raw: bool = False,
+    ) -> list[dict[str, Any]]:
+        """
+        Получить список элементов OSDR.
+        
+        Без поиска элементы идут по (inserted_at, id) от новых к старым, а after -
+        позиция последней строки предыдущей страницы (keyset-пагинация по индексу
+        ix_osdr_items_inserted_at_id). При поиске результаты упорядочены по
+        релевантности (ts_rank), затем по дате вставки. Сырой JSONB читается
+        только при include_raw, иначе стоимость страницы не зависит от его размера.
+        """
+        columns = "id, dataset_id, title, status, rest_url, updated_at, inserted_at, " + (
+            "raw" if include_raw else "NULL AS raw"
+        )
         if search:
-            # Поиск по dataset_id, title или status (без учета регистра)
-            # Также ищем в JSONB поле raw (включая ключи вида OSD-xxx)
-            search_pattern = f"%{search.lower()}%"
+            where, params = self._search_filter(search)
+            rank = "ts_rank(search_vector, to_tsquery('simple', :tsquery))" if "tsquery" in params else "0"
             result = await self.session.execute(
-                text("""
-                    SELECT id, dataset_id, title, status, rest_url, updated_at, inserted_at, raw
+                text(f"""
+                    SELECT {columns}
                     FROM osdr_items
-                    WHERE LOWER(COALESCE(dataset_id, '')) LIKE :search_pattern
-                       OR LOWER(COALESCE(title, '')) LIKE :search_pattern
-                       OR LOWER(COALESCE(status, '')) LIKE :search_pattern
-                       OR LOWER(raw::text) LIKE :search_pattern
-                    ORDER BY inserted_at DESC
+                    WHERE {where}
+                    ORDER BY {rank} DESC, inserted_at DESC
                     LIMIT :limit
                 """),
-                {"limit": limit, "search_pattern": search_pattern}
+                {"limit": limit, **params}
+            )
+        elif after:
+            result = await self.session.execute(
+                text(f"""
+                    SELECT {columns}
+                    FROM osdr_items
+                    WHERE (inserted_at, id) < (:after_key, :after_id)
+                    ORDER BY inserted_at DESC, id DESC
+                    LIMIT :limit
+                """),
+                {"limit": limit, "after_key": after[0], "after_id": after[1]}
             )
         else:
             result = await self.session.execute(
-                text("""
-                    SELECT id, dataset_id, title, status, rest_url, updated_at, inserted_at, raw
+                text(f"""
+                    SELECT {columns}
                     FROM osdr_items
-                    ORDER BY inserted_at DESC
+                    ORDER BY inserted_at DESC, id DESC
                     LIMIT :limit
                 """),
                 {"limit": limit}
@@ -126,19 +262,12 @@ class OsdrRepo:
         ]
     
     async def count(self, search: Optional[str] = None) -> int:
-        """Получить количество элементов OSDR с опциональным поиском"""
+        """Получить точное количество элементов OSDR с опциональным поиском"""
         if search:
-            search_pattern = f"%{search.lower()}%"
+            where, params = self._search_filter(search)
             result = await self.session.execute(
-                text("""
-                    SELECT COUNT(*)
-                    FROM osdr_items
-                    WHERE LOWER(COALESCE(dataset_id, '')) LIKE :search_pattern
-                       OR LOWER(COALESCE(title, '')) LIKE :search_pattern
-                       OR LOWER(COALESCE(status, '')) LIKE :search_pattern
-                       OR LOWER(raw::text) LIKE :search_pattern
-                """),
-                {"search_pattern": search_pattern}
+                text(f"SELECT COUNT(*) FROM osdr_items WHERE {where}"),
+                params
             )
         else:
             result = await self.session.execute(
@@ -146,4 +275,41 @@ class OsdrRepo:
             )
         row = result.fetchone()
         return row[0] if row else 0
-
+    
+    async def count_bounded(self, search: Optional[str] = None, cap: int = 1000) -> tuple[int, bool]:
+        """
+        Посчитать элементы, но не больше cap.
+        
+        Returns:
+            Количество и признак того, что оно точное (False - найдено больше cap)
+        """
+        where, params = self._search_filter(search) if search else ("TRUE", {})
+        result = await self.session.execute(
+            text(f"""
+                SELECT COUNT(*) FROM (
+                    SELECT 1 FROM osdr_items WHERE {where} LIMIT :cap_plus_one
+                ) AS matched
+            """),
+            {"cap_plus_one": cap + 1, **params}
+        )
+        row = result.fetchone()
+        found = row[0] if row else 0
+        if found > cap:
+            return cap, False
+        return found, True
+    
+    async def count_estimate(self) -> tuple[int, bool]:
+        """
+        Оценка количества элементов по статистике планировщика (pg_class.reltuples).
+        
+        Returns:
+            Количество и признак того, что оно точное
+        """
+        result = await self.session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'osdr_items'::regclass")
+        )
+        row = result.fetchone()
+        if row is None or row[0] < 0:
+            # Таблица еще ни разу не анализировалась - считаем точно
+            return await self.count(), True
+        return row[0], False
@@ -0,0 +1,93 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from typing import Any, Optional
+from app.utils.json_body import RawJson
+
+
+class SummaryRepo:
+    """Репозиторий для сводки /space/summary (все данные одним запросом)"""
+    
+    def __init__(self, session: AsyncSession):
+        self.session = session
+    
+    async def _fetch(self, sources: list[str], with_payload: bool) -> dict[str, Any]:
+        """
+        Последние версии источников space_cache, последняя запись ISS и
+        количество OSDR за один запрос.
+        
+        Последняя версия каждого источника берется через LATERAL по индексу
+        (source, fetched_at DESC); количество OSDR - оценка из pg_class.reltuples
+        (точный COUNT(*) только если таблица еще не анализировалась).
+        Без with_payload payload не читаются - только версии строк.
+        """
+        payload = "payload::text" if with_payload else "NULL::text"
+        result = await self.session.execute(
+            text(f"""
+                WITH latest AS (
+                    SELECT 'cache' AS kind, c.source, c.id, c.fetched_at, c.content_hash, c.payload
+                    FROM unnest(CAST(:sources AS text[])) AS src(source)
+                    CROSS JOIN LATERAL (
+                        SELECT source, id, fetched_at, content_hash, {payload} AS payload
+                        FROM space_cache
+                        WHERE source = src.source
+                        ORDER BY fetched_at DESC, id DESC
+                        LIMIT 1
+                    ) c
+                    UNION ALL
+                    SELECT 'iss' AS kind, NULL, i.id, i.fetched_at, NULL, i.payload
+                    FROM (
+                        SELECT id, fetched_at, {payload} AS payload
+                        FROM iss_fetch_log
+                        ORDER BY fetched_at DESC, id DESC
+                        LIMIT 1
+                    ) i
+                ),
+                osdr AS (
+                    SELECT CASE
+                        WHEN reltuples >= 0 THEN reltuples::bigint
+                        ELSE (SELECT COUNT(*) FROM osdr_items)
+                    END AS osdr_count
+                    FROM pg_class
+                    WHERE oid = 'osdr_items'::regclass
+                )
+                SELECT o.osdr_count, l.kind, l.source, l.id, l.fetched_at, l.content_hash, l.payload
+                FROM osdr o
+                LEFT JOIN latest l ON TRUE
+            """),
+            {"sources": sources}
+        )
+        
+        cache: dict[str, dict[str, Any]] = {}
+        iss: Optional[dict[str, Any]] = None
+        osdr_count = 0
+        for row in result.fetchall():
+            osdr_count = row[0] or 0
+            entry = {"id": row[3], "fetched_at": row[4], "content_hash": row[5]}
+            if with_payload:
+                entry["payload"] = RawJson(row[6]) if row[6] is not None else None
+            if row[1] == "cache":
+                cache[row[2]] = entry
+            elif row[1] == "iss":
+                iss = entry
+        
+        return {"cache": cache, "iss": iss, "osdr_count": osdr_count}
+    
+    async def get_summary(self, sources: list[str]) -> dict[str, Any]:
+        """
+        Получить сводку с payload (JSON-текстом, RawJson, без декодирования).
+        
+        Returns:
+            {"cache": {source: {"id", "fetched_at", "content_hash", "payload"}},
+             "iss": {...} | None, "osdr_count": int}
+        """
+        return await self._fetch(sources, with_payload=True)
+    
+    async def get_summary_meta(self, sources: list[str]) -> dict[str, Any]:
+        """
+        Получить версии данных сводки без payload - для проверки
+        If-None-Match / If-Modified-Since до чтения тел.
+        
+        Returns:
+            Как get_summary(), но без ключа "payload"
+        """
+        return await self._fetch(sources, with_payload=False)
@@ -10,17 +10,39 @@ class TelemetryRepo:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def list_items(self, limit: int = 100) -> list[dict[str, Any]]:
-        """Получить список элементов telemetry_legacy"""
-        result = await self.session.execute(
-            text("""
-                SELECT id, recorded_at, voltage, temp, source_file
-                FROM telemetry_legacy
-                ORDER BY recorded_at DESC
-                LIMIT :limit
-            """),
-            {"limit": limit}
-        )
+    async def list_items(
+        self,
+        limit: int = 100,
+        after: Optional[tuple[datetime, int]] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Получить список элементов telemetry_legacy.
+
+        Элементы идут по (recorded_at, id) от новых к старым; after - позиция
+        последней строки предыдущей страницы (keyset-пагинация по индексу
+        ix_telemetry_legacy_recorded_at_id, без OFFSET).
+        """
+        if after:
+            result = await self.session.execute(
+                text("""
+                    SELECT id, recorded_at, voltage, temp, source_file
+                    FROM telemetry_legacy
+                    WHERE (recorded_at, id) < (:after_key, :after_id)
+                    ORDER BY recorded_at DESC, id DESC
+                    LIMIT :limit
+                """),
+                {"limit": limit, "after_key": after[0], "after_id": after[1]}
+            )
+        else:
+            result = await self.session.execute(
+                text("""
+                    SELECT id, recorded_at, voltage, temp, source_file
+                    FROM telemetry_legacy
+                    ORDER BY recorded_at DESC, id DESC
+                    LIMIT :limit
+                """),
+                {"limit": limit}
+            )
         rows = result.fetchall()
         return [
             {
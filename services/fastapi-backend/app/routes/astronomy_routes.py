@@ -10,18 +10,34 @@ router = APIRouter()
 @limiter.limit("50/minute")
 async def events(
     request: Request,
-    days: Optional[int] = Query(7, ge=1, le=7, description="Number of days from today (NEO API ограничен 7 днями)"),
-    limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum number of events to return"),
+    days: Optional[int] = Query(7, ge=1, le=90, description="Number of days back from today"),
+    days_ahead: int = Query(0, ge=0, le=7, description="Number of days after today (upcoming approaches)"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size (default 100)"),
+    hazardous: bool = Query(False, description="Only potentially hazardous asteroids"),
+    min_distance_km: Optional[float] = Query(None, ge=0, description="Minimum miss distance, km"),
+    cursor: Optional[str] = Query(None, description="next_cursor предыдущей страницы"),
 ):
     """
-    Get NEO (Near Earth Objects) events from NASA Asteroids - NeoWs API.
+    Get NEO (Near Earth Objects) close approaches from ingested NASA NeoWs data.
     
     Args:
-        days: Number of days from today (1-7, default: 7)
-        limit: Maximum number of events to return (optional)
+        days: Number of days back from today (1-90, default: 7)
+        days_ahead: Number of days after today (0-7, default: 0)
+        limit: Page size (default: 100)
+        hazardous: Only potentially hazardous asteroids
+        min_distance_km: Minimum miss distance in km
+        cursor: next_cursor of the previous page
     """
-    return await astronomy_events_handler(
-        days=days,
-        limit=limit,
-    )
+    from app.state.app_state import app_state
+    session_factory = await app_state.get_db()
+    async with session_factory() as session:
+        return await astronomy_events_handler(
+            session,
+            days=days,
+            days_ahead=days_ahead,
+            limit=limit,
+            hazardous=hazardous,
+            min_distance_km=min_distance_km,
+            cursor=cursor,
+        )
 
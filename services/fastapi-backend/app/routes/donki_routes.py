@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Query, Request
+from datetime import datetime
+from typing import Optional
+from app.handlers.donki_handler import donki_events_handler
+from app.middleware.rate_limit import limiter
+
+router = APIRouter()
+
+
+@router.get("/donki/events")
+@limiter.limit("50/minute")
+async def events(
+    request: Request,
+    event_type: Optional[str] = Query(None, alias="type", description="FLR или CME"),
+    class_type: Optional[str] = Query(None, max_length=8, description="Начало класса: X, M5; для CME - тип S, C, O, R, ER"),
+    start: Optional[datetime] = Query(None, alias="from", description="Начало диапазона (ISO 8601)"),
+    end: Optional[datetime] = Query(None, alias="to", description="Конец диапазона (ISO 8601)"),
+    linked_to: Optional[str] = Query(None, description="Только события, связанные с activity ID"),
+    has_links: Optional[bool] = Query(None, description="Только события со связями (true) или без (false)"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Размер страницы (по умолчанию 100)"),
+    cursor: Optional[str] = Query(None, description="next_cursor предыдущей страницы"),
+):
+    """Солнечные вспышки и CME из сохраненных данных NASA DONKI, новые первыми"""
+    from app.state.app_state import app_state
+    session_factory = await app_state.get_db()
+    async with session_factory() as session:
+        return await donki_events_handler(
+            session,
+            event_type=event_type,
+            class_type=class_type,
+            start=start,
+            end=end,
+            linked_to=linked_to,
+            has_links=has_links,
+            limit=limit,
+            cursor=cursor,
+        )
@@ -1,5 +1,6 @@
 from fastapi import APIRouter
-from app.handlers.health_handler import health_handler
+from app.handlers.health_handler import health_handler, scheduler_status_handler
+from app.domain.models import SchedulerStatusResponse
 
 router = APIRouter()
 
@@ -9,3 +10,8 @@ async def health():
     """Health check endpoint"""
     return await health_handler()
 
+
+@router.get("/health/scheduler", response_model=SchedulerStatusResponse)
+async def scheduler_status():
+    """Состояние задач планировщика: последний и следующий запуск"""
+    return await scheduler_status_handler()
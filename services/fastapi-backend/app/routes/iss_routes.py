@@ -1,5 +1,7 @@
-from fastapi import APIRouter, Request
-from app.handlers.iss_handler import last_iss_handler, trigger_iss_handler, iss_trend_handler, clear_iss_data_handler
+from fastapi import APIRouter, Query, Request
+from datetime import datetime
+from typing import Optional
+from app.handlers.iss_handler import last_iss_handler, trigger_iss_handler, iss_trend_handler, clear_iss_data_handler, iss_stream_handler
 from app.domain.models import IssLastResponse, IssTrendResponse
 from app.middleware.rate_limit import limiter
 
@@ -13,7 +15,7 @@ async def last(request: Request):
     from app.state.app_state import app_state
     session_factory = await app_state.get_db()
     async with session_factory() as session:
-        return await last_iss_handler(session)
+        return await last_iss_handler(session, request)
 
 
 @router.get("/fetch", response_model=IssLastResponse)
@@ -28,12 +30,27 @@ async def fetch(request: Request):
 
 @router.get("/trend")
 @limiter.limit("30/minute")
-async def trend(request: Request, limit: int = 240):
+async def trend(
+    request: Request,
+    limit: int = 240,
+    start: Optional[datetime] = Query(None, alias="from", description="Начало диапазона (ISO 8601)"),
+    end: Optional[datetime] = Query(None, alias="to", description="Конец диапазона (ISO 8601)"),
+    max_points: Optional[int] = Query(None, description="Целевое количество точек после прореживания"),
+):
     """Получить тренд движения ISS"""
     from app.state.app_state import app_state
     session_factory = await app_state.get_db()
     async with session_factory() as session:
-        return await iss_trend_handler(session=session, limit=limit)
+        return await iss_trend_handler(
+            session=session, limit=limit, start=start, end=end, max_points=max_points
+        )
+
+
+@router.get("/stream")
+@limiter.limit("10/minute")
+async def stream(request: Request):
+    """Поток позиций ISS (Server-Sent Events)"""
+    return await iss_stream_handler(request)
 
 
 @router.delete("/clear")
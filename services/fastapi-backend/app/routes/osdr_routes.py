@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Request
-from typing import Optional
+from fastapi import APIRouter, Query, Request
+from typing import Literal, Optional
 from app.handlers.osdr_handler import osdr_sync_handler, osdr_list_handler
 from app.domain.models import OsdrSyncResponse, OsdrListResponse
 from app.middleware.rate_limit import limiter
@@ -19,9 +19,16 @@ async def sync(request: Request):
 
 @router.get("/osdr/list", response_model=OsdrListResponse)
 @limiter.limit("20/minute")
-async def list(request: Request, limit: int = 20, search: Optional[str] = None):
+async def list(
+    request: Request,
+    limit: int = 20,
+    search: Optional[str] = None,
+    count_mode: Literal["exact", "bounded", "estimate"] = Query("bounded", description="Способ подсчета total"),
+    cursor: Optional[str] = Query(None, description="next_cursor предыдущей страницы"),
+    include_raw: bool = Query(False, description="Вернуть сырые данные датасета"),
+):
     from app.state.app_state import app_state
     session_factory = await app_state.get_db()
     async with session_factory() as session:
-        return await osdr_list_handler(session, limit=limit, search=search)
+        return await osdr_list_handler(session, request, limit=limit, search=search, count_mode=count_mode, cursor=cursor, include_raw=include_raw)
 
@@ -10,7 +10,7 @@ router = APIRouter()
 @limiter.limit("100/minute")
 async def latest(request: Request, source: str):
     """Получить последние данные из кэша по источнику"""
-    return await space_latest_handler(source)
+    return await space_latest_handler(request, source)
 
 
 @router.get("/space/refresh", response_model=SpaceRefreshResponse)
@@ -24,5 +24,5 @@ async def refresh(request: Request, src: str = Query("apod,neo,flr,cme,spacex",
 @limiter.limit("100/minute")
 async def summary(request: Request):
     """Получить сводку всех космических данных"""
-    return await space_summary_handler()
+    return await space_summary_handler(request)
 
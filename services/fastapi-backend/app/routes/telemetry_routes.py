@@ -2,7 +2,7 @@ from fastapi import APIRouter, Query, Request
 from app.handlers.telemetry_handler import telemetry_list_handler
 from app.state.app_state import app_state
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Any
+from typing import Any, Optional
 from app.middleware.rate_limit import limiter
 
 router = APIRouter()
@@ -13,9 +13,10 @@ router = APIRouter()
 async def list(
     request: Request,
     limit: int = Query(default=100, ge=1, le=1000),
+    cursor: Optional[str] = Query(default=None, description="next_cursor предыдущей страницы"),
 ) -> dict[str, Any]:
-    """Получить список элементов telemetry_legacy"""
+    """Получить список элементов telemetry_legacy (keyset-пагинация через cursor)"""
     session_factory = await app_state.get_db()
     async with session_factory() as session:
-        return await telemetry_list_handler(session, limit=limit)
+        return await telemetry_list_handler(session, limit=limit, cursor=cursor)
 
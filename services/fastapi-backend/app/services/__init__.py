@@ -1,14 +1,18 @@
 from .iss_service import IssService
 from .osdr_service import OsdrService
+from .space_service import SpaceService
 from .jwst_service import JwstService
 from .astronomy_service import AstronomyService
+from .donki_service import DonkiService
 from .scheduler_service import SchedulerService
 
 __all__ = [
     "IssService",
     "OsdrService",
+    "SpaceService",
     "JwstService",
     "AstronomyService",
+    "DonkiService",
     "SchedulerService",
 ]
 
@@ -1,50 +1,79 @@
-from app.clients.astronomy_client import AstronomyClient
+from app.repo.neo_repo import NeoRepo
+from app.utils.neo_helpers import format_neo_event
+from datetime import datetime, time, timedelta, timezone
 from typing import Any, Optional, Dict
 
 
 class AstronomyService:
-    """Сервис для работы с Astronomy API"""
+    """Сервис космических событий (сближения NEO) из neo_approaches"""
     
-    def __init__(self, client: AstronomyClient):
-        self.client = client
+    def __init__(self, repo: NeoRepo):
+        self.repo = repo
     
     async def get_events(
         self,
         days: int = 7,
-        limit: Optional[int] = None
+        days_ahead: int = 0,
+        limit: int = 100,
+        hazardous_only: bool = False,
+        min_distance_km: Optional[float] = None,
+        after: Optional[tuple[datetime, int]] = None,
     ) -> Dict[str, Any]:
         """
-        Get NEO (Near Earth Objects) events from NASA Asteroids - NeoWs API.
+        Сближения NEO за последние days дней (включая сегодня) и следующие days_ahead дней.
+        
+        Данные берутся из neo_approaches, которую наполняет задача neo_fetch,
+        поэтому запрос не обращается к NeoWs, а фильтрация, сортировка по
+        времени сближения и пагинация выполняются в SQL по индексу.
         
         Args:
-            days: Number of days from today (1-7)
-            limit: Maximum number of events to return (optional)
+            days: Количество дней до сегодня включительно
+            days_ahead: Количество дней после сегодня (прогноз сближений из feed)
+            limit: Размер страницы
+            hazardous_only: Только потенциально опасные объекты
+            min_distance_km: Минимальное расстояние сближения
+            after: Позиция последнего события предыдущей страницы
             
         Returns:
-            Astronomical events data
+            События страницы, общее количество и next_after для следующей страницы
         """
-        try:
-            data = await self.client.get_events(
-                days=days,
-                limit=limit
-            )
-            
-            # Если есть ошибка, возвращаем её
-            if "error" in data:
-                return data
-            
-            # NASA API уже возвращает структурированные события
-            if isinstance(data, dict) and "events" in data:
-                return data
-            else:
-                # Неизвестный формат
-                return {
-                    "filters": {
-                        "days": days,
-                        "limit": limit
-                    },
-                    "events": []
-                }
-        except Exception as e:
-            return {"error": f"Error fetching astronomy events: {str(e)}"}
+        today = datetime.now(timezone.utc).date()
+        start = datetime.combine(today - timedelta(days=days), time.min, tzinfo=timezone.utc)
+        end = datetime.combine(today + timedelta(days=1 + days_ahead), time.min, tzinfo=timezone.utc)
+        
+        # На одну строку больше, чтобы понять, есть ли следующая страница
+        rows = await self.repo.list_approaches(
+            start,
+            end,
+            limit=limit + 1,
+            hazardous_only=hazardous_only,
+            min_distance_km=min_distance_km,
+            after=after,
+        )
+        next_after = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_after = (rows[-1]["approach_at"], rows[-1]["id"])
+        
+        total_count = await self.repo.count_approaches(
+            start,
+            end,
+            hazardous_only=hazardous_only,
+            min_distance_km=min_distance_km,
+        )
+        
+        return {
+            "filters": {
+                "days": days,
+                "days_ahead": days_ahead,
+                "limit": limit,
+                "hazardous": hazardous_only,
+                "min_distance_km": min_distance_km,
+            },
+            "events": [format_neo_event(row, number) for number, row in enumerate(rows, start=1)],
+            "source": "NASA Asteroids - NeoWs API",
+            "count": len(rows),
+            "total_count": total_count,
+            "next_after": next_after,
+        }
 
@@ -0,0 +1,82 @@
+from app.repo.donki_repo import DonkiRepo
+from app.utils.donki_helpers import format_donki_event
+from datetime import datetime
+from typing import Any, Optional, Dict
+
+
+class DonkiService:
+    """Сервис событий DONKI (солнечные вспышки и CME) из donki_events"""
+    
+    def __init__(self, repo: DonkiRepo):
+        self.repo = repo
+    
+    async def get_events(
+        self,
+        start: datetime,
+        end: datetime,
+        limit: int = 100,
+        event_type: Optional[str] = None,
+        class_prefix: Optional[str] = None,
+        linked_to: Optional[str] = None,
+        has_links: Optional[bool] = None,
+        before: Optional[tuple[datetime, int]] = None,
+    ) -> Dict[str, Any]:
+        """
+        События DONKI в окне [start, end), новые первыми.
+        
+        Данные берутся из donki_events, которую наполняет задача donki_fetch;
+        фильтрация и пагинация выполняются в SQL по индексу.
+        
+        Args:
+            start/end: Окно по времени начала события
+            limit: Размер страницы
+            event_type: FLR или CME
+            class_prefix: Начало класса (X, M5, для CME - тип S, C, O, R, ER)
+            linked_to: Только события, связанные с этим activity ID
+            has_links: Только события со связями (True) или без них (False)
+            before: Позиция последнего события предыдущей страницы
+        
+        Returns:
+            События страницы, общее количество и next_before для следующей страницы
+        """
+        # На одну строку больше, чтобы понять, есть ли следующая страница
+        rows = await self.repo.list_events(
+            start,
+            end,
+            limit=limit + 1,
+            event_type=event_type,
+            class_prefix=class_prefix,
+            linked_to=linked_to,
+            has_links=has_links,
+            before=before,
+        )
+        next_before = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_before = (rows[-1]["start_at"], rows[-1]["id"])
+        
+        total_count = await self.repo.count_events(
+            start,
+            end,
+            event_type=event_type,
+            class_prefix=class_prefix,
+            linked_to=linked_to,
+            has_links=has_links,
+        )
+        
+        return {
+            "filters": {
+                "from": start.isoformat(),
+                "to": end.isoformat(),
+                "type": event_type,
+                "class_type": class_prefix,
+                "linked_to": linked_to,
+                "has_links": has_links,
+                "limit": limit,
+            },
+            "events": [format_donki_event(row) for row in rows],
+            "source": "NASA DONKI",
+            "count": len(rows),
+            "total_count": total_count,
+            "next_before": next_before,
+        }
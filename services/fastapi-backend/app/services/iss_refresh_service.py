@@ -0,0 +1,99 @@
+"""
+Фоновое обновление позиции ISS для stale-while-revalidate.
+
+Запросы к /iss/last и /iss/fetch не ходят во внешний API сами: они
+отдают последнюю сохраненную точку и при необходимости запускают фоновое
+обновление. В воркере одновременно выполняется не больше одного
+обновления, а с планировщиком и другими воркерами их объединяет
+single-flight по ключу ISS_POSITION_FLIGHT. Новая точка записывается в БД
+(это наполняет кэш ответов) и публикуется в поток /iss/stream.
+"""
+from app.state.app_state import app_state
+from app.repo.iss_repo import IssRepo
+from app.clients.iss_client import IssClient
+from app.services.iss_service import IssService
+from app.services.iss_stream_service import iss_stream_service
+from app.redis.single_flight import single_flight
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+ISS_POSITION_FLIGHT = "iss:position"
+
+
+async def refresh_position(session: AsyncSession) -> dict[str, Any]:
+    """
+    Получить позицию ISS, сохранить и опубликовать в поток /iss/stream.
+    
+    Одновременные вызовы (планировщик, /iss/last, /iss/fetch, другие
+    воркеры) выполняют один запрос к API и получают одну и ту же точку.
+    """
+    async def fetch() -> dict[str, Any]:
+        service = IssService(IssRepo(session), IssClient())
+        sample = await service.fetch_and_store_position()
+        # Одна публикация на замер: воркеры раздают точку своим SSE клиентам
+        await iss_stream_service.publish(sample)
+        return sample
+    
+    return await single_flight.run(ISS_POSITION_FLIGHT, fetch)
+
+
+class IssRefreshService:
+    """Дедуплицированное фоновое обновление данных ISS"""
+    
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def in_flight(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def trigger(self) -> asyncio.Task:
+        """Запустить обновление или вернуть уже выполняющееся"""
+        if not self.in_flight:
+            self._task = asyncio.create_task(self._refresh(), name="iss:refresh")
+        return self._task
+    
+    async def wait(self, timeout: float) -> bool:
+        """
+        Запустить обновление и подождать его не дольше timeout.
+        
+        Returns:
+            True, если обновление успело завершиться и записало новую точку
+        """
+        task = self.trigger()
+        try:
+            return bool(await asyncio.wait_for(asyncio.shield(task), timeout))
+        except Exception:
+            # Таймаут ожидания: обновление продолжается в фоне
+            return False
+    
+    async def _refresh(self) -> bool:
+        """Получить позицию из API, сохранить и опубликовать"""
+        try:
+            session_factory = await app_state.get_db()
+            async with session_factory() as session:
+                await asyncio.wait_for(
+                    refresh_position(session),
+                    app_state.settings.iss_refresh_timeout_seconds,
+                )
+            logger.info("ISS data refreshed on demand")
+            return True
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"ISS refresh failed: {e}")
+            return False
+    
+    async def stop(self):
+        """Отменить незавершенное обновление"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+iss_refresh_service = IssRefreshService()
@@ -1,9 +1,13 @@
 from app.repo.iss_repo import IssRepo
 from app.clients.iss_client import IssClient
 from app.utils.validators import extract_number, haversine_km
-from typing import Any
+from app.utils.downsample import lttb
+from typing import Any, Optional
 from datetime import datetime
 
+# Во сколько раз больше точек, чем max_points, оставляет прореживание в БД перед LTTB
+TREND_PREBUCKET_FACTOR = 4
+
 
 class IssService:
     """Сервис для работы с данными ISS"""
@@ -12,47 +16,59 @@ class IssService:
         self.repo = repo
         self.client = client
     
-    async def fetch_and_store(self) -> dict[str, Any]:
-        """Получить и сохранить данные ISS"""
+    async def fetch_and_store_position(self) -> dict[str, Any]:
+        """
+        Получить и сохранить данные ISS, вернуть точку для потока позиций.
+        
+        Время точки - fetched_at сохраненной строки, как у точек /iss/trend.
+        """
         data = await self.client.fetch_current_position()
-        source_url = self.client.base_url
-        await self.repo.insert_fetch_log(source_url, data)
-        return data
-    
-    async def get_last(self) -> dict[str, Any]:
-        """Получить последние данные"""
-        result = await self.repo.get_last()
-        if result:
-            return {
-                "id": result["id"],
-                "fetched_at": result["fetched_at"],
-                "source_url": result["source_url"],
-                "payload": result["payload"],
-            }
-        return {"message": "no data"}
+        row = await self.repo.insert_fetch_log(self.client.base_url, data)
+        return {
+            "id": row["id"] if row else 0,
+            "at": row["fetched_at"].isoformat() if row else None,
+            "lat": extract_number(data.get("latitude")),
+            "lon": extract_number(data.get("longitude")),
+            "velocity": extract_number(data.get("velocity")),
+            "altitude": extract_number(data.get("altitude")),
+        }
     
-    async def calculate_trend(self, limit: int = 240) -> dict[str, Any]:
-        """Рассчитать тренд движения ISS"""
-        data = await self.repo.get_trend_data(limit=limit)
+    async def calculate_trend(
+        self,
+        limit: int = 240,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        max_points: Optional[int] = None,
+    ) -> dict[str, Any]:
+        """
+        Рассчитать тренд движения ISS.
+        
+        Без start/end берутся последние limit точек. С диапазоном точки
+        читаются за [start, end): в БД они грубо прореживаются по времени до
+        TREND_PREBUCKET_FACTOR * max_points, затем LTTB оставляет max_points.
+        """
+        if start is not None and end is not None:
+            bucket_seconds = 0.0
+            if max_points:
+                bucket_seconds = (end - start).total_seconds() / (max_points * TREND_PREBUCKET_FACTOR)
+            data = await self.repo.get_trend_range(start, end, bucket_seconds=bucket_seconds)
+        else:
+            data = await self.repo.get_trend_data(limit=limit)
         
         # Формируем points для фронтенда (от старых к новым)
-        points = []
-        for item in data:
-            payload = item.get("payload", {})
-            if isinstance(payload, dict):
-                lat = extract_number(payload.get("latitude"))
-                lon = extract_number(payload.get("longitude"))
-                velocity = extract_number(payload.get("velocity"))
-                altitude = extract_number(payload.get("altitude"))
-                
-                if lat is not None and lon is not None:
-                    points.append({
-                        "lat": lat,
-                        "lon": lon,
-                        "at": item.get("fetched_at"),
-                        "velocity": velocity,
-                        "altitude": altitude,
-                    })
+        points = [
+            {
+                "lat": item["latitude"],
+                "lon": item["longitude"],
+                "at": item["fetched_at"],
+                "velocity": item["velocity"],
+                "altitude": item["altitude"],
+            }
+            for item in data
+        ]
+        
+        if max_points:
+            points = lttb(points, max_points)
         
         if len(points) < 2:
             return {
@@ -0,0 +1,118 @@
+"""
+Поток позиций ISS (Server-Sent Events) с раздачей через Redis pub/sub.
+
+Планировщик публикует каждую новую точку один раз: в канал iss:positions и
+в короткий список последних точек в Redis. Каждый API воркер держит одну
+подписку на канал и раздает точки своим клиентам через ограниченные
+очереди; новые клиенты сначала получают буфер последних точек.
+"""
+from app.state.app_state import app_state
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, Optional
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+POSITIONS_CHANNEL = "iss:positions"
+RECENT_POSITIONS_KEY = "iss:positions:recent"
+
+
+class IssStreamService:
+    """Раздача позиций ISS подключенным клиентам воркера"""
+    
+    def __init__(self):
+        self._subscribers: set[asyncio.Queue] = set()
+        self._recent: deque[dict[str, Any]] = deque(maxlen=app_state.settings.iss_stream_replay_size)
+        self._listener: Optional[asyncio.Task] = None
+    
+    async def publish(self, sample: dict[str, Any]):
+        """Опубликовать точку для всех воркеров (вызывается один раз на замер)"""
+        message = json.dumps(sample, default=str)
+        try:
+            redis = await app_state.get_redis()
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.lpush(RECENT_POSITIONS_KEY, message)
+                pipe.ltrim(RECENT_POSITIONS_KEY, 0, app_state.settings.iss_stream_replay_size - 1)
+                pipe.publish(POSITIONS_CHANNEL, message)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Could not publish ISS position: {e}")
+    
+    def _dispatch(self, sample: dict[str, Any]):
+        """Передать точку всем клиентам воркера; медленный клиент теряет самые старые точки"""
+        self._recent.append(sample)
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(sample)
+    
+    async def _load_recent(self):
+        """Заполнить буфер последних точек из Redis"""
+        redis = await app_state.get_redis()
+        messages = await redis.lrange(RECENT_POSITIONS_KEY, 0, app_state.settings.iss_stream_replay_size - 1)
+        self._recent.clear()
+        for message in reversed(messages):
+            self._recent.append(json.loads(message))
+    
+    async def _listen(self):
+        """Подписка воркера на канал позиций"""
+        while True:
+            try:
+                redis = await app_state.get_redis()
+                pubsub = redis.pubsub()
+                await pubsub.subscribe(POSITIONS_CHANNEL)
+                try:
+                    # Буфер читается после подписки, чтобы не потерять точку между ними
+                    await self._load_recent()
+                    async for message in pubsub.listen():
+                        if message.get("type") != "message":
+                            continue
+                        try:
+                            self._dispatch(json.loads(message["data"]))
+                        except (ValueError, TypeError):
+                            continue
+                finally:
+                    await pubsub.reset()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"ISS stream listener error: {e}")
+                await asyncio.sleep(5)
+    
+    @asynccontextmanager
+    async def subscribe(self, after_id: Optional[int] = None) -> AsyncGenerator[asyncio.Queue, None]:
+        """
+        Подписать клиента на поток позиций.
+        
+        Args:
+            after_id: id последней полученной клиентом точки (Last-Event-ID);
+                из буфера отдаются только более новые точки
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=app_state.settings.iss_stream_queue_size)
+        for sample in list(self._recent)[-queue.maxsize:]:
+            if after_id is None or (sample.get("id") or 0) > after_id:
+                queue.put_nowait(sample)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+    
+    async def start(self):
+        """Запустить подписку воркера на канал позиций"""
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen(), name="iss:stream")
+    
+    async def stop(self):
+        """Остановить подписку"""
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        self._subscribers.clear()
+
+
+iss_stream_service = IssStreamService()
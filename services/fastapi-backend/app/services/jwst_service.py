@@ -1,4 +1,5 @@
 from app.clients.jwst_client import JwstClient
+from app.redis.single_flight import single_flight
 from typing import Any
 
 
@@ -29,5 +30,10 @@ class JwstService:
             "perPage": per_page,
         }
         
-        return await self.client.fetch_data(path, query_params)
+        # Одинаковые запросы ленты из разных воркеров уходят в API один раз
+        flight_key = f"jwst:{path}:{page}:{per_page}"
+        return await single_flight.run(
+            flight_key,
+            lambda: self.client.fetch_data(path, query_params),
+        )
 
@@ -1,9 +1,31 @@
 from app.repo.osdr_repo import OsdrRepo
 from app.clients.osdr_client import OsdrClient
 from app.utils.validators import extract_string, extract_datetime
-from typing import Any
+from app.utils.hashing import content_hash
+from app.utils.osdr_helpers import flatten_osdr_item, normalize_rest_url
+from app.redis.single_flight import single_flight
+from app.state.app_state import app_state
+from typing import Any, Optional
 from datetime import datetime, timezone
 
+OSDR_SYNC_FLIGHT = "osdr:sync"
+
+
+def _parse_updated_at(value: dict[str, Any]) -> Optional[datetime]:
+    """Дата обновления датасета (TIMESTAMPTZ требует datetime с timezone)"""
+    updated_str = extract_datetime(value, ["updated", "updated_at", "modified", "lastUpdated", "timestamp"])
+    if not updated_str:
+        return None
+    try:
+        # Парсим ISO формат и убеждаемся, что есть timezone
+        dt = datetime.fromisoformat(updated_str.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    # Если timezone не указан, используем UTC
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
 
 class OsdrService:
     """Сервис для работы с данными OSDR"""
@@ -12,42 +34,91 @@ class OsdrService:
         self.repo = repo
         self.client = client
     
-    async def sync_and_store(self) -> int:
-        """Синхронизировать и сохранить данные OSDR"""
+    async def sync(self) -> dict[str, int]:
+        """
+        Синхронизировать OSDR один раз для всех одновременных вызовов.
+        
+        Планировщик, /osdr/sync и другие воркеры объединяются через
+        single-flight и получают результат одной синхронизации.
+        """
+        return await single_flight.run(
+            OSDR_SYNC_FLIGHT,
+            self.sync_and_store,
+            lock_ttl=app_state.settings.scheduler_job_timeout,
+        )
+    
+    async def sync_and_store(self) -> dict[str, int]:
+        """
+        Синхронизировать и сохранить данные OSDR.
+        
+        Для каждой нормализованной записи считается хэш содержимого; записи,
+        хэш которых совпадает с сохраненным, не перезаписываются. Остальные
+        записываются одной пачкой в одной транзакции.
+        
+        Returns:
+            written - сколько датасетов обработано, inserted/updated - сколько
+            строк вставлено и обновлено, unchanged - сколько пропущено без изменений
+        """
         items = await self.client.fetch_datasets()
-        written = 0
+        rows = [row for item in items for row in self._normalize_item(item)]
+        
+        stored, stored_unkeyed = await self.repo.get_content_hashes(
+            dataset_ids=[r["dataset_id"] for r in rows if r["dataset_id"]],
+            hashes=[r["content_hash"] for r in rows if not r["dataset_id"]],
+        )
+        changed = [
+            r for r in rows
+            if (stored.get(r["dataset_id"]) != r["content_hash"] if r["dataset_id"]
+                else r["content_hash"] not in stored_unkeyed)
+        ]
+        
+        result = await self.repo.bulk_upsert(changed)
+        return {
+            "written": len(rows),
+            "inserted": result["inserted"],
+            "updated": result["updated"],
+            "unchanged": len(rows) - result["inserted"] - result["updated"],
+        }
+    
+    @staticmethod
+    def _normalize_item(item: dict[str, Any]) -> list[dict[str, Any]]:
+        """
+        Извлечь строки osdr_items из сырого элемента.
         
-        for item in items:
-            dataset_id = extract_string(item, ["dataset_id", "id", "uuid", "studyId", "accession", "osdr_id"])
-            title = extract_string(item, ["title", "name", "label"])
-            status = extract_string(item, ["status", "state", "lifecycle"])
-            rest_url = extract_string(item, ["REST_URL", "rest_url", "rest", "url", "link"])
+        Элемент вида {"OSD-1": {...}, "OSD-2": {...}} разворачивается в отдельные
+        датасеты (как flattenOsdr() в PHP), rest_url приводится к ссылке на
+        страницу датасета, а title при отсутствии берется из последнего
+        сегмента URL (как basename() в PHP). Так /osdr/list читает готовые
+        строки и ничего не пересчитывает на каждый запрос.
+        """
+        rows = []
+        parent_status = extract_string(item, ["status", "state", "lifecycle"])
+        for key, value in flatten_osdr_item(item):
+            if key:
+                dataset_id = key
+                rest_url = extract_string(value, ["REST_URL", "rest_url", "rest"])
+            else:
+                dataset_id = extract_string(value, ["dataset_id", "id", "uuid", "studyId", "accession", "osdr_id"])
+                rest_url = extract_string(value, ["REST_URL", "rest_url", "rest", "url", "link"])
+            rest_url = normalize_rest_url(rest_url, dataset_id)
             
-            # Парсим дату обновления (TIMESTAMPTZ требует datetime с timezone)
-            updated_str = extract_datetime(item, ["updated", "updated_at", "modified", "lastUpdated", "timestamp"])
-            updated_at = None
-            if updated_str:
-                try:
-                    # Парсим ISO формат и убеждаемся, что есть timezone
-                    dt = datetime.fromisoformat(updated_str.replace("Z", "+00:00"))
-                    # Если timezone не указан, используем UTC
-                    if dt.tzinfo is None:
-                        dt = dt.replace(tzinfo=timezone.utc)
-                    updated_at = dt
-                except ValueError:
-                    pass
+            title = extract_string(value, ["title", "name", "label"])
+            if not title and key and rest_url:
+                title = rest_url.split("?")[0].rstrip("/").split("/")[-1]
             
-            await self.repo.upsert_item(
-                dataset_id=dataset_id,
-                title=title,
-                status=status,
-                rest_url=rest_url,
-                updated_at=updated_at,
-                raw=item,
-            )
-            written += 1
-        
-        return written
+            status = extract_string(value, ["status", "state", "lifecycle"]) or (parent_status if key else None)
+            
+            row = {
+                "dataset_id": dataset_id,
+                "title": title,
+                "status": status,
+                "rest_url": rest_url,
+                "updated_at": _parse_updated_at(value) or (_parse_updated_at(item) if key else None),
+                "raw": value,
+            }
+            row["content_hash"] = content_hash(row)
+            rows.append(row)
+        return rows
     
     async def list_items(self, limit: int = 20) -> list[dict[str, Any]]:
         """Получить список элементов OSDR"""
@@ -0,0 +1,136 @@
+"""
+Политики следующего запуска задач планировщика по содержимому данных.
+
+Политика получает результат запуска задачи (последнюю сохраненную версию
+источника) и возвращает задержку до следующего запуска в секундах. None
+означает обычную сетку интервала задачи - так же планируются запуски,
+которые завершились ошибкой или были пропущены из-за advisory lock.
+
+- ApodPolicy: APOD меняется раз в сутки в полночь по времени публикации,
+  запрос выполняется сразу после этой границы, а если сохранена еще
+  вчерашняя APOD - повторяется через apod_retry_seconds;
+- LaunchPolicy: интервал SpaceX "next launch" сокращается по мере
+  приближения date_utc;
+- BackoffPolicy: базовый интервал, который увеличивается, пока данные
+  источника не меняются (NEO, DONKI).
+"""
+from app.state.app_state import app_state
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from typing import Any, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Точность date_utc SpaceX, при которой время запуска известно
+_PRECISE_LAUNCH = {"hour", "day", None}
+
+
+class RefreshPolicy:
+    """Политика по умолчанию: сетка интервала задачи"""
+    
+    name = "interval"
+    
+    def next_delay(self, result: Any, now: datetime) -> Optional[float]:
+        return None
+
+
+def _publish_timezone() -> tzinfo:
+    """Часовой пояс публикации APOD (без базы tzdata - UTC-5)"""
+    name = app_state.settings.apod_publish_timezone
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.warning(f"Time zone {name} not available, using UTC-5 for APOD schedule")
+        return timezone(timedelta(hours=-5))
+
+
+class ApodPolicy(RefreshPolicy):
+    """APOD: сразу после смены даты публикации"""
+    
+    name = "apod_daily"
+    
+    def next_delay(self, result: Any, now: datetime) -> Optional[float]:
+        settings = app_state.settings
+        tz = _publish_timezone()
+        local_today = now.astimezone(tz).date()
+        
+        if not isinstance(result, dict):
+            return None
+        payload = result.get("payload")
+        published = payload.get("date") if isinstance(payload, dict) else None
+        try:
+            published_date = date.fromisoformat(published) if published else None
+        except ValueError:
+            published_date = None
+        if published_date is None:
+            return None
+        if published_date < local_today:
+            # Граница прошла, но новая картинка еще не опубликована
+            return float(settings.apod_retry_seconds)
+        
+        boundary = datetime.combine(local_today + timedelta(days=1), time.min, tzinfo=tz)
+        return max((boundary - now).total_seconds(), 0.0) + settings.apod_publish_delay_seconds
+
+
+class LaunchPolicy(RefreshPolicy):
+    """SpaceX: чем ближе запуск, тем чаще"""
+    
+    name = "launch_countdown"
+    
+    def next_delay(self, result: Any, now: datetime) -> Optional[float]:
+        settings = app_state.settings
+        payload = result.get("payload") if isinstance(result, dict) else None
+        if not isinstance(payload, dict) or not isinstance(payload.get("date_utc"), str):
+            return None
+        try:
+            launch_at = datetime.fromisoformat(payload["date_utc"].replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if launch_at.tzinfo is None:
+            launch_at = launch_at.replace(tzinfo=timezone.utc)
+        
+        if payload.get("date_precision") not in _PRECISE_LAUNCH:
+            # Запуск запланирован с точностью до месяца и грубее
+            return float(settings.spacex_max_seconds)
+        
+        remaining = (launch_at - now).total_seconds()
+        if remaining <= 0:
+            # Запуск прошел: ждем, пока API переключится на следующий,
+            # а давно прошедшую дату опрашиваем с обычным интервалом
+            if -remaining <= settings.spacex_launch_grace_seconds:
+                return float(settings.spacex_min_seconds)
+            return None
+        return min(
+            max(remaining * settings.spacex_lead_ratio, settings.spacex_min_seconds),
+            settings.spacex_max_seconds,
+        )
+
+
+class BackoffPolicy(RefreshPolicy):
+    """Базовый интервал с увеличением, пока данные не меняются"""
+    
+    name = "backoff"
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._fingerprint: Any = None
+        self._delay = interval
+    
+    def next_delay(self, result: Any, now: datetime) -> Optional[float]:
+        """
+        result - отпечаток данных (например, content_hash последней версии);
+        совпадение с прошлым запуском увеличивает задержку.
+        """
+        if result is None:
+            return None
+        settings = app_state.settings
+        if result == self._fingerprint:
+            self._delay = min(
+                self._delay * settings.refresh_backoff_factor,
+                self.interval * settings.refresh_backoff_max_factor,
+            )
+        else:
+            self._fingerprint = result
+            self._delay = self.interval
+        return self._delay
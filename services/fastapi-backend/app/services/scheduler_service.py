@@ -1,182 +1,330 @@
 import asyncio
+import math
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.state.app_state import app_state
-from app.repo.iss_repo import IssRepo
 from app.repo.osdr_repo import OsdrRepo
 from app.repo.cache_repo import CacheRepo
-from app.clients.iss_client import IssClient
+from app.repo.neo_repo import NeoRepo
 from app.clients.osdr_client import OsdrClient
 from app.clients.nasa_client import NasaClient
-from app.services.iss_service import IssService
 from app.services.osdr_service import OsdrService
+from app.services.space_service import SpaceService
+from app.services.iss_refresh_service import refresh_position
+from app.services.refresh_policy import RefreshPolicy, ApodPolicy, LaunchPolicy, BackoffPolicy
+from app.database.partitions import ensure_iss_partitions, drop_expired_iss_partitions
 from app.utils.advisory_lock import advisory_lock
+from app.redis.rate_budget import budget_priority, PRIORITY_SCHEDULED
 import logging
 
 logger = logging.getLogger(__name__)
 
+JobFunc = Callable[[AsyncSession], Awaitable[Any]]
+
+
+@dataclass
+class ScheduledJob:
+    """Периодическая задача планировщика и её состояние"""
+    name: str
+    func: JobFunc
+    interval: float
+    jitter: float
+    timeout: float
+    lock_name: str
+    policy: RefreshPolicy
+    next_run: Optional[float] = None  # time.monotonic()
+    next_delay: Optional[float] = None  # задержка, выбранная политикой
+    last_started_at: Optional[datetime] = None
+    last_finished_at: Optional[datetime] = None
+    last_duration: Optional[float] = None
+    last_status: Optional[str] = None
+    last_error: Optional[str] = None
+    runs: int = 0
+
 
 class SchedulerService:
-    """Сервис для фоновых задач планировщика"""
+    """
+    Сервис для фоновых задач планировщика.
+    
+    Задачи описываются декларативно через register() и выполняются по
+    дедлайнам на монотонных часах: следующий запуск считается от расписания,
+    а не от окончания работы, поэтому интервалы не дрейфуют. Задача с
+    политикой (RefreshPolicy) планирует следующий запуск по результату
+    последнего: времени публикации, дате запуска, неизменности данных. К каждому
+    запуску добавляется случайный jitter, чтобы реплики не срабатывали
+    синхронно, число одновременно работающих задач ограничено семафором,
+    а каждая задача выполняется под advisory lock и с собственным таймаутом.
+    """
     
     def __init__(self):
         self.running = False
         self.tasks = []
+        self.jobs: dict[str, ScheduledJob] = {}
+        self._semaphore = asyncio.Semaphore(app_state.settings.scheduler_max_concurrency)
+        self._register_default_jobs()
     
-    async def _fetch_iss(self):
-        """Фоновая задача для получения данных ISS с защитой от наложения"""
-        while self.running:
-            try:
-                session_factory = await app_state.get_db()
-                async with session_factory() as session:
-                    async with advisory_lock(session, "iss_fetch") as locked:
-                        if not locked:
-                            logger.warning("ISS fetch task already running, skipping")
-                            await asyncio.sleep(app_state.settings.iss_every_seconds)
-                            continue
-                        
-                        repo = IssRepo(session)
-                        client = IssClient()
-                        service = IssService(repo, client)
-                        await service.fetch_and_store()
-                        logger.info("ISS data fetched successfully")
-            except Exception as e:
-                logger.error(f"Error fetching ISS data: {e}")
-            
-            await asyncio.sleep(app_state.settings.iss_every_seconds)
+    def register(
+        self,
+        name: str,
+        func: JobFunc,
+        interval: float,
+        lock_name: Optional[str] = None,
+        jitter: Optional[float] = None,
+        timeout: Optional[float] = None,
+        policy: Optional[RefreshPolicy] = None,
+    ) -> ScheduledJob:
+        """
+        Зарегистрировать периодическую задачу.
+        
+        Args:
+            name: Имя задачи (для логов и статуса)
+            func: Корутина, получающая сессию БД
+            interval: Интервал между запусками в секундах
+            lock_name: Имя advisory lock (по умолчанию совпадает с name)
+            jitter: Максимальный случайный сдвиг запуска в секундах
+            timeout: Таймаут выполнения задачи в секундах
+            policy: Политика следующего запуска по результату задачи
+                (по умолчанию - сетка interval)
+        """
+        settings = app_state.settings
+        if jitter is None:
+            jitter = min(interval * settings.scheduler_jitter_ratio, settings.scheduler_max_jitter_seconds)
+        if timeout is None:
+            timeout = min(interval, settings.scheduler_job_timeout)
+        
+        job = ScheduledJob(
+            name=name,
+            func=func,
+            interval=interval,
+            jitter=jitter,
+            timeout=timeout,
+            lock_name=lock_name or name,
+            policy=policy or RefreshPolicy(),
+        )
+        self.jobs[name] = job
+        return job
     
-    async def _fetch_osdr(self):
-        """Фоновая задача для получения данных OSDR с защитой от наложения"""
-        while self.running:
-            try:
-                session_factory = await app_state.get_db()
-                async with session_factory() as session:
-                    async with advisory_lock(session, "osdr_sync") as locked:
-                        if not locked:
-                            logger.warning("OSDR sync task already running, skipping")
-                            await asyncio.sleep(app_state.settings.fetch_every_seconds)
-                            continue
-                        
-                        repo = OsdrRepo(session)
-                        client = OsdrClient()
-                        service = OsdrService(repo, client)
-                        await service.sync_and_store()
-                        logger.info("OSDR data synced successfully")
-            except Exception as e:
-                logger.error(f"Error syncing OSDR data: {e}")
-            
-            await asyncio.sleep(app_state.settings.fetch_every_seconds)
+    def _register_default_jobs(self):
+        """Зарегистрировать стандартные задачи сбора данных"""
+        settings = app_state.settings
+        self.register("iss_fetch", self._fetch_iss, settings.iss_every_seconds)
+        self.register("iss_partitions", self._maintain_iss_partitions, settings.iss_partition_every_seconds)
+        self.register("osdr_sync", self._fetch_osdr, settings.fetch_every_seconds)
+        self.register("apod_fetch", self._fetch_apod, settings.apod_every_seconds, policy=ApodPolicy())
+        self.register(
+            "neo_fetch", self._fetch_neo, settings.neo_every_seconds,
+            policy=BackoffPolicy(settings.neo_every_seconds),
+        )
+        self.register(
+            "donki_fetch", self._fetch_donki, settings.donki_every_seconds,
+            policy=BackoffPolicy(settings.donki_every_seconds),
+        )
+        self.register("spacex_fetch", self._fetch_spacex, settings.spacex_every_seconds, policy=LaunchPolicy())
+        self.register("space_cache_prune", self._prune_space_cache, settings.space_cache_prune_every_seconds)
     
-    async def _fetch_apod(self):
-        """Фоновая задача для получения APOD с защитой от наложения"""
-        while self.running:
-            try:
-                session_factory = await app_state.get_db()
-                async with session_factory() as session:
-                    async with advisory_lock(session, "apod_fetch") as locked:
-                        if not locked:
-                            logger.warning("APOD fetch task already running, skipping")
-                            await asyncio.sleep(app_state.settings.apod_every_seconds)
-                            continue
-                        
-                        repo = CacheRepo(session)
-                        client = NasaClient()
-                        data = await client.fetch_apod()
-                        await repo.insert_cache("apod", data)
-                        logger.info("APOD data fetched successfully")
-            except Exception as e:
-                logger.error(f"Error fetching APOD: {e}")
-            
-            await asyncio.sleep(app_state.settings.apod_every_seconds)
+    async def _fetch_iss(self, session: AsyncSession):
+        """Получить данные ISS"""
+        await refresh_position(session)
+        logger.info("ISS data fetched successfully")
     
-    async def _fetch_neo(self):
-        """Фоновая задача для получения NEO данных с защитой от наложения"""
-        while self.running:
-            try:
-                session_factory = await app_state.get_db()
-                async with session_factory() as session:
-                    async with advisory_lock(session, "neo_fetch") as locked:
-                        if not locked:
-                            logger.warning("NEO fetch task already running, skipping")
-                            await asyncio.sleep(app_state.settings.neo_every_seconds)
-                            continue
-                        
-                        repo = CacheRepo(session)
-                        client = NasaClient()
-                        data = await client.fetch_neo_feed()
-                        await repo.insert_cache("neo", data)
-                        logger.info("NEO data fetched successfully")
-            except Exception as e:
-                logger.error(f"Error fetching NEO: {e}")
-            
-            await asyncio.sleep(app_state.settings.neo_every_seconds)
+    async def _maintain_iss_partitions(self, session: AsyncSession):
+        """Создать секции iss_fetch_log наперед и удалить вышедшие за срок хранения"""
+        settings = app_state.settings
+        created = await ensure_iss_partitions(session, settings.iss_partition_days_ahead)
+        dropped = await drop_expired_iss_partitions(session, settings.iss_retention_days)
+        await session.commit()
+        logger.info(
+            f"ISS partitions maintained: {created} created, {len(dropped)} dropped"
+        )
     
-    async def _fetch_donki(self):
-        """Фоновая задача для получения DONKI данных с защитой от наложения"""
-        while self.running:
-            try:
-                session_factory = await app_state.get_db()
-                async with session_factory() as session:
-                    async with advisory_lock(session, "donki_fetch") as locked:
-                        if not locked:
-                            logger.warning("DONKI fetch task already running, skipping")
-                            await asyncio.sleep(app_state.settings.donki_every_seconds)
-                            continue
-                        
-                        repo = CacheRepo(session)
-                        client = NasaClient()
-                        
-                        # FLR
-                        try:
-                            flr_data = await client.fetch_donki_flr()
-                            await repo.insert_cache("flr", flr_data)
-                        except Exception as e:
-                            logger.error(f"Error fetching DONKI FLR: {e}")
-                        
-                        # CME
-                        try:
-                            cme_data = await client.fetch_donki_cme()
-                            await repo.insert_cache("cme", cme_data)
-                        except Exception as e:
-                            logger.error(f"Error fetching DONKI CME: {e}")
-                        
-                        logger.info("DONKI data fetched successfully")
-            except Exception as e:
-                logger.error(f"Error fetching DONKI: {e}")
-            
-            await asyncio.sleep(app_state.settings.donki_every_seconds)
+    async def _fetch_osdr(self, session: AsyncSession):
+        """Синхронизировать данные OSDR"""
+        repo = OsdrRepo(session)
+        client = OsdrClient()
+        service = OsdrService(repo, client)
+        result = await service.sync()
+        logger.info(
+            f"OSDR data synced successfully: {result['inserted']} inserted, "
+            f"{result['updated']} updated, {result['unchanged']} unchanged"
+        )
     
-    async def _fetch_spacex(self):
-        """Фоновая задача для получения SpaceX данных с защитой от наложения"""
+    async def _fetch_apod(self, session: AsyncSession) -> Optional[dict[str, Any]]:
+        """Получить APOD. Возвращает сохраненную версию для ApodPolicy"""
+        repo = CacheRepo(session)
+        service = SpaceService(repo, NasaClient())
+        await service.refresh("apod")
+        logger.info("APOD data fetched successfully")
+        return await repo.get_latest("apod")
+    
+    async def _fetch_neo(self, session: AsyncSession) -> Optional[str]:
+        """Получить NEO данные. Возвращает хэш сохраненной версии для BackoffPolicy"""
+        repo = CacheRepo(session)
+        service = SpaceService(repo, NasaClient())
+        await service.refresh("neo")
+        logger.info("NEO data fetched successfully")
+        meta = await repo.get_latest_meta("neo")
+        return meta["content_hash"] if meta else None
+    
+    async def _fetch_donki(self, session: AsyncSession) -> Optional[tuple]:
+        """Получить DONKI данные. Возвращает хэши версий FLR и CME для BackoffPolicy"""
+        repo = CacheRepo(session)
+        service = SpaceService(repo, NasaClient())
+        
+        # FLR и CME запрашиваются параллельно и записываются одной транзакцией
+        statuses = await service.refresh_many(["flr", "cme"])
+        for status in statuses:
+            if status["status"] != "ok":
+                logger.error(f"Error fetching DONKI {status['source'].upper()}: {status.get('error')}")
+        
+        if any(status["status"] != "ok" for status in statuses):
+            # Неудачный запрос не считается "данные не изменились"
+            return None
+        logger.info("DONKI data fetched successfully")
+        metas = [await repo.get_latest_meta(source) for source in ("flr", "cme")]
+        return tuple(meta["content_hash"] if meta else None for meta in metas)
+    
+    async def _fetch_spacex(self, session: AsyncSession) -> Optional[dict[str, Any]]:
+        """Получить SpaceX данные. Возвращает сохраненную версию для LaunchPolicy"""
+        repo = CacheRepo(session)
+        service = SpaceService(repo, NasaClient())
+        await service.refresh("spacex")
+        logger.info("SpaceX data fetched successfully")
+        return await repo.get_latest("spacex")
+    
+    async def _prune_space_cache(self, session: AsyncSession):
+        """Удалить версии space_cache, дни NEO feed и прошедшие сближения сверх лимитов хранения"""
+        settings = app_state.settings
+        repo = CacheRepo(session)
+        deleted = await repo.prune(
+            keep_versions=settings.space_cache_keep_versions,
+            retention_days=settings.space_cache_retention_days,
+            source_limits=settings.space_cache_source_limits,
+        )
+        logger.info(f"space_cache pruned: {deleted} rows deleted")
+        neo_repo = NeoRepo(session)
+        days_deleted = await neo_repo.prune_feed_days(settings.space_cache_retention_days)
+        if days_deleted:
+            logger.info(f"neo_feed_days pruned: {days_deleted} days deleted")
+        approaches_deleted = await neo_repo.prune_approaches(settings.space_cache_retention_days)
+        if approaches_deleted:
+            logger.info(f"neo_approaches pruned: {approaches_deleted} rows deleted")
+    
+    async def _run_locked(self, job: ScheduledJob) -> tuple[bool, Any]:
+        """
+        Выполнить задачу под advisory lock.
+        
+        Returns:
+            (False, None), если lock занят; иначе (True, результат задачи)
+        """
+        session_factory = await app_state.get_db()
+        async with session_factory() as session:
+            async with advisory_lock(session, job.lock_name) as locked:
+                if not locked:
+                    logger.warning(f"{job.name} task already running, skipping")
+                    return False, None
+                # Задачи планировщика могут расходовать резерв бюджета NASA API
+                with budget_priority(PRIORITY_SCHEDULED):
+                    result = await job.func(session)
+                return True, result
+    
+    async def _execute(self, job: ScheduledJob) -> Any:
+        """
+        Выполнить один запуск задачи с таймаутом и учётом статуса.
+        
+        Returns:
+            Результат задачи; None, если запуск пропущен или завершился ошибкой
+        """
+        job.last_started_at = datetime.now(timezone.utc)
+        started = time.monotonic()
+        result = None
+        try:
+            ran, result = await asyncio.wait_for(self._run_locked(job), timeout=job.timeout)
+            job.last_status = "ok" if ran else "skipped"
+            job.last_error = None
+        except asyncio.TimeoutError:
+            job.last_status = "timeout"
+            job.last_error = f"Timed out after {job.timeout:.0f}s"
+            logger.error(f"Job {job.name} timed out after {job.timeout:.0f}s")
+        except Exception as e:
+            job.last_status = "error"
+            job.last_error = str(e)
+            logger.error(f"Error in job {job.name}: {e}")
+        finally:
+            job.runs += 1
+            job.last_duration = time.monotonic() - started
+            job.last_finished_at = datetime.now(timezone.utc)
+        return result
+    
+    def _next_delay(self, job: ScheduledJob, result: Any) -> Optional[float]:
+        """Задержка следующего запуска по политике задачи (None - сетка интервала)"""
+        try:
+            return job.policy.next_delay(result, datetime.now(timezone.utc))
+        except Exception as e:
+            logger.error(f"Refresh policy of {job.name} failed: {e}")
+            return None
+    
+    async def _run_job(self, job: ScheduledJob):
+        """Цикл задачи: запуски по сетке интервалов или по политике задачи"""
+        scheduled = time.monotonic()
+        jitter = job.jitter
         while self.running:
-            try:
-                session_factory = await app_state.get_db()
-                async with session_factory() as session:
-                    async with advisory_lock(session, "spacex_fetch") as locked:
-                        if not locked:
-                            logger.warning("SpaceX fetch task already running, skipping")
-                            await asyncio.sleep(app_state.settings.spacex_every_seconds)
-                            continue
-                        
-                        repo = CacheRepo(session)
-                        client = NasaClient()
-                        data = await client.fetch_spacex_next()
-                        await repo.insert_cache("spacex", data)
-                        logger.info("SpaceX data fetched successfully")
-            except Exception as e:
-                logger.error(f"Error fetching SpaceX: {e}")
+            job.next_run = scheduled + random.uniform(0, jitter)
+            await asyncio.sleep(max(0.0, job.next_run - time.monotonic()))
             
-            await asyncio.sleep(app_state.settings.spacex_every_seconds)
+            async with self._semaphore:
+                result = await self._execute(job)
+            
+            job.next_delay = self._next_delay(job, result)
+            if job.next_delay is not None:
+                # Дедлайн от окончания запуска; разброс не больше доли задержки
+                scheduled = time.monotonic() + job.next_delay
+                jitter = min(job.jitter, job.next_delay * app_state.settings.scheduler_jitter_ratio)
+                continue
+            
+            # Следующий дедлайн - от расписания; пропущенные тики не догоняем
+            jitter = job.jitter
+            scheduled += job.interval
+            now = time.monotonic()
+            if scheduled < now:
+                scheduled += math.ceil((now - scheduled) / job.interval) * job.interval
+    
+    def get_jobs_status(self) -> list[dict[str, Any]]:
+        """Получить состояние задач: время последнего и следующего запуска"""
+        now_monotonic = time.monotonic()
+        now = datetime.now(timezone.utc)
+        status = []
+        for job in self.jobs.values():
+            next_run_at = None
+            if self.running and job.next_run is not None:
+                next_run_at = now + timedelta(seconds=job.next_run - now_monotonic)
+            status.append({
+                "name": job.name,
+                "interval_seconds": job.interval,
+                "policy": job.policy.name,
+                "next_delay_seconds": job.next_delay,
+                "jitter_seconds": job.jitter,
+                "timeout_seconds": job.timeout,
+                "next_run_at": next_run_at,
+                "last_started_at": job.last_started_at,
+                "last_finished_at": job.last_finished_at,
+                "last_duration_seconds": job.last_duration,
+                "last_status": job.last_status,
+                "last_error": job.last_error,
+                "runs": job.runs,
+            })
+        return status
     
     async def start(self):
         """Запустить все фоновые задачи"""
         self.running = True
         
         self.tasks = [
-            asyncio.create_task(self._fetch_iss()),
-            asyncio.create_task(self._fetch_osdr()),
-            asyncio.create_task(self._fetch_apod()),
-            asyncio.create_task(self._fetch_neo()),
-            asyncio.create_task(self._fetch_donki()),
-            asyncio.create_task(self._fetch_spacex()),
+            asyncio.create_task(self._run_job(job), name=f"scheduler:{job.name}")
+            for job in self.jobs.values()
         ]
         
         logger.info("Scheduler started")
@@ -189,3 +337,5 @@ class SchedulerService:
         await asyncio.gather(*self.tasks, return_exceptions=True)
         logger.info("Scheduler stopped")
 
+
+scheduler_service = SchedulerService()
@@ -0,0 +1,241 @@
+from app.state.app_state import app_state
+from app.repo.cache_repo import CacheRepo
+from app.repo.neo_repo import NeoRepo
+from app.repo.donki_repo import DonkiRepo
+from app.utils.neo_helpers import normalize_neo_feed, feed_days, merge_neo_feed, split_neo_windows
+from app.utils.donki_helpers import normalize_donki_events, DONKI_EVENT_TYPES
+from app.clients.nasa_client import NasaClient, NEO_FEED_MAX_DAYS
+from app.redis.single_flight import single_flight
+from app.redis.rate_budget import RateBudgetExceeded
+from app.clients.circuit_breaker import CircuitOpenError
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from functools import partial
+from typing import Any, Awaitable, Callable, Optional
+import asyncio
+import time
+
+# Источники space_cache, обновляемые из внешних API
+SPACE_SOURCES = ("apod", "neo", "flr", "cme", "spacex")
+
+
+class SpaceService:
+    """Сервис обновления space_cache из NASA и SpaceX API"""
+    
+    def __init__(
+        self,
+        repo: CacheRepo,
+        client: NasaClient,
+        neo_repo: Optional[NeoRepo] = None,
+        donki_repo: Optional[DonkiRepo] = None,
+    ):
+        self.repo = repo
+        self.client = client
+        # Сближения NEO и события DONKI пишутся в той же сессии (и транзакции), что и space_cache
+        self.neo_repo = neo_repo or NeoRepo(repo.session)
+        self.donki_repo = donki_repo or DonkiRepo(repo.session)
+    
+    def _fetcher(self, source: str, state: dict[str, Any]) -> Callable[[], Awaitable[dict[str, Any]]]:
+        fetchers = {
+            "apod": self.client.fetch_apod,
+            "neo": partial(self._fetch_neo, state.get("neo") or {}),
+            "flr": partial(self._fetch_donki, "flr", state.get("flr")),
+            "cme": partial(self._fetch_donki, "cme", state.get("cme")),
+            "spacex": self.client.fetch_spacex_next,
+        }
+        if source not in fetchers:
+            raise ValueError(f"Unknown space source: {source}")
+        return fetchers[source]
+    
+    def _neo_day_settled(self, day: date, fetched_at: datetime) -> bool:
+        """День запрошен после своего окончания с запасом: данные больше не меняются"""
+        day_end = datetime.combine(day + timedelta(days=1), dt_time.min, tzinfo=timezone.utc)
+        return fetched_at >= day_end + timedelta(hours=app_state.settings.neo_day_settle_hours)
+    
+    @staticmethod
+    def _neo_window() -> list[date]:
+        """Дни окна NEO: [сегодня - neo_past_days, сегодня + neo_future_days]"""
+        settings = app_state.settings
+        start = datetime.now(timezone.utc).date() - timedelta(days=settings.neo_past_days)
+        return [start + timedelta(days=i) for i in range(settings.neo_past_days + settings.neo_future_days + 1)]
+    
+    async def _fetch_neo(self, cached: dict[date, dict[str, Any]]) -> dict[str, Any]:
+        """
+        NEO feed за окно _neo_window().
+        
+        Окончательные прошедшие дни берутся из cached (строки neo_feed_days),
+        остальные запрашиваются диапазонами по NEO_FEED_MAX_DAYS параллельно
+        (не больше neo_fetch_concurrency). Результат - обычный ответ feed по
+        всем дням окна.
+        """
+        settings = app_state.settings
+        today = datetime.now(timezone.utc).date()
+        window = self._neo_window()
+        
+        days = {
+            day: row["objects"]
+            for day, row in cached.items()
+            if day < today and self._neo_day_settled(day, row["fetched_at"])
+        }
+        missing = [day for day in window if day not in days]
+        semaphore = asyncio.Semaphore(settings.neo_fetch_concurrency)
+        
+        async def fetch_range(start_date: date, end_date: date) -> dict[date, list[dict[str, Any]]]:
+            async with semaphore:
+                feed = await self.client.fetch_neo_feed_range(start_date, end_date)
+            fetched = feed_days(feed)
+            # День без объектов может отсутствовать в ответе
+            return {
+                start_date + timedelta(days=i): fetched.get(start_date + timedelta(days=i), [])
+                for i in range((end_date - start_date).days + 1)
+            }
+        
+        for fetched in await asyncio.gather(
+            *(fetch_range(s, e) for s, e in split_neo_windows(missing, NEO_FEED_MAX_DAYS))
+        ):
+            days.update(fetched)
+        return merge_neo_feed(days)
+    
+    async def _load_sync_state(self, sources: list[str]) -> dict[str, Any]:
+        """
+        Прочитать курсоры синхронизации источников из БД.
+        
+        Читаются по очереди до параллельных запросов к API: сессия (и
+        соединение) одна на все источники, а параллельные запросы к БД на
+        одном соединении asyncpg не выполняет.
+        """
+        state: dict[str, Any] = {}
+        for source in sources:
+            if source in DONKI_EVENT_TYPES:
+                state[source] = await self.donki_repo.last_event_at(DONKI_EVENT_TYPES[source])
+            elif source == "neo":
+                window = self._neo_window()
+                state[source] = await self.neo_repo.get_feed_days(window[0], window[-1])
+        return state
+    
+    async def _fetch_donki(self, source: str, last_event_at: Optional[datetime]) -> list[dict[str, Any]]:
+        """
+        События DONKI, начиная с последнего сохраненного события.
+        
+        Окно начинается за donki_sync_overlap_days до последнего события в
+        donki_events (DONKI дополняет недавние события связями и анализами),
+        а без сохраненных событий - за donki_initial_days до сегодня.
+        """
+        settings = app_state.settings
+        today = datetime.now(timezone.utc).date()
+        if last_event_at is not None:
+            start_date = min(last_event_at.date(), today) - timedelta(days=settings.donki_sync_overlap_days)
+        else:
+            start_date = today - timedelta(days=settings.donki_initial_days)
+        
+        fetch = self.client.fetch_donki_flr if source == "flr" else self.client.fetch_donki_cme
+        return await fetch(start_date=start_date, end_date=today)
+    
+    async def fetch(self, source: str, state: Optional[dict[str, Any]] = None) -> dict[str, Any]:
+        """
+        Получить данные источника из внешнего API.
+        
+        Одновременные запросы одного источника (планировщик, /space/refresh,
+        другие воркеры) выполняются один раз через single-flight. Запрос к API
+        не обращается к сессии: курсоры синхронизации передаются в state
+        (см. _load_sync_state), без state они читаются здесь же.
+        """
+        if state is None:
+            state = await self._load_sync_state([source])
+        return await single_flight.run(f"space:{source}", self._fetcher(source, state))
+    
+    async def refresh(self, source: str) -> int:
+        """
+        Получить данные источника и сохранить в space_cache.
+        
+        Returns:
+            id записи space_cache
+        """
+        data = await self.fetch(source)
+        payloads = await self._stage_derived({source: data})
+        return await self.repo.insert_cache(source, payloads[source])
+    
+    async def _stage_derived(self, payloads: dict[str, Any]) -> dict[str, Any]:
+        """
+        Записать производные таблицы до commit записи space_cache.
+        
+        Returns:
+            Payload для space_cache: для FLR и CME - события последних
+            donki_cache_days дней из donki_events, а не окно синхронизации
+        """
+        payloads = dict(payloads)
+        for source, event_type in DONKI_EVENT_TYPES.items():
+            if source in payloads:
+                await self.donki_repo.upsert_events(normalize_donki_events(source, payloads[source]))
+                since = datetime.combine(
+                    datetime.now(timezone.utc).date() - timedelta(days=app_state.settings.donki_cache_days),
+                    dt_time.min,
+                    tzinfo=timezone.utc,
+                )
+                payloads[source] = await self.donki_repo.recent_payloads(event_type, since)
+        if "neo" in payloads:
+            feed = payloads["neo"]
+            # Окончательные дни не перезаписываются (см. NeoRepo.upsert_feed_days)
+            await self.neo_repo.upsert_feed_days(feed_days(feed), app_state.settings.neo_day_settle_hours)
+            await self.neo_repo.upsert_approaches(normalize_neo_feed(feed))
+        return payloads
+    
+    async def refresh_many(
+        self,
+        sources: list[str],
+        timeout: Optional[float] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Обновить несколько источников параллельно.
+        
+        Запросы к API идут одновременно (не больше space_refresh_concurrency),
+        у каждого источника свой дедлайн; успешные результаты записываются
+        одной транзакцией. Время обновления определяется самым медленным
+        источником, а не суммой.
+        
+        Args:
+            sources: Источники из SPACE_SOURCES
+            timeout: Дедлайн одного источника в секундах
+        
+        Returns:
+            Статус каждого источника: source, status (ok/throttled/unavailable/timeout/error),
+            duration_ms, id записи и текст ошибки
+        """
+        settings = app_state.settings
+        timeout = timeout or settings.space_refresh_source_timeout_seconds
+        state = await self._load_sync_state(sources)
+        semaphore = asyncio.Semaphore(settings.space_refresh_concurrency)
+        
+        async def fetch_one(source: str) -> tuple[dict[str, Any], Optional[dict[str, Any]]]:
+            async with semaphore:
+                started = time.monotonic()
+                status: dict[str, Any] = {"source": source, "status": "ok"}
+                data = None
+                try:
+                    data = await asyncio.wait_for(self.fetch(source, state), timeout)
+                except RateBudgetExceeded as e:
+                    # Квота ключа на исходе: остается последняя сохраненная версия
+                    status.update(status="throttled", error=str(e))
+                except CircuitOpenError as e:
+                    # API недоступен: запрос даже не отправлялся
+                    status.update(status="unavailable", error=e.detail)
+                except asyncio.TimeoutError:
+                    status.update(status="timeout", error=f"no response in {timeout:g}s")
+                except Exception as e:
+                    status.update(status="error", error=str(e) or type(e).__name__)
+                status["duration_ms"] = int((time.monotonic() - started) * 1000)
+                return status, data
+        
+        results = await asyncio.gather(*(fetch_one(source) for source in sources))
+        
+        payloads = {status["source"]: data for status, data in results if data is not None}
+        ids = {}
+        if payloads:
+            payloads = await self._stage_derived(payloads)
+            ids = await self.repo.insert_cache_many(payloads)
+        
+        statuses = []
+        for status, _ in results:
+            if status["source"] in ids:
+                status["id"] = ids[status["source"]]
+            statuses.append(status)
+        return statuses
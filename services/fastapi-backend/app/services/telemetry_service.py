@@ -1,5 +1,6 @@
 from app.repo.telemetry_repo import TelemetryRepo
-from typing import Any
+from typing import Any, Optional
+from datetime import datetime
 
 
 class TelemetryService:
@@ -8,9 +9,13 @@ class TelemetryService:
     def __init__(self, repo: TelemetryRepo):
         self.repo = repo
 
-    async def list_items(self, limit: int = 100) -> list[dict[str, Any]]:
+    async def list_items(
+        self,
+        limit: int = 100,
+        after: Optional[tuple[datetime, int]] = None,
+    ) -> list[dict[str, Any]]:
         """Получить список элементов telemetry_legacy"""
-        return await self.repo.list_items(limit=limit)
+        return await self.repo.list_items(limit=limit, after=after)
 
     async def count(self) -> int:
         """Получить количество элементов"""
@@ -2,13 +2,16 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from app.database.connection import get_db_pool
 from app.config.settings import settings
 import redis.asyncio as aioredis
+import httpx
 from typing import Optional
+from urllib.parse import urlsplit
 
 
 class AppState:
     def __init__(self):
         self._db_pool: Optional[async_sessionmaker[AsyncSession]] = None
         self._redis: Optional[aioredis.Redis] = None
+        self._http_clients: dict[str, httpx.AsyncClient] = {}
         self.settings = settings
     
     async def get_db(self):
@@ -27,11 +30,44 @@ class AppState:
             )
         return self._redis
     
+    async def get_http_client(self, url: str) -> httpx.AsyncClient:
+        """
+        Получить HTTP клиент для хоста из url.
+        
+        На каждый upstream хост создается один долгоживущий клиент с пулом
+        keep-alive соединений (HTTP/2, если сервер его поддерживает),
+        поэтому DNS/TCP/TLS рукопожатие выполняется один раз, а не на каждый запрос.
+        """
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        client = self._http_clients.get(origin)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                http2=settings.http2_enabled,
+                timeout=settings.api_timeout,
+                limits=httpx.Limits(
+                    max_connections=settings.http_max_connections,
+                    max_keepalive_connections=settings.http_max_keepalive_connections,
+                    keepalive_expiry=settings.http_keepalive_expiry,
+                ),
+            )
+            self._http_clients[origin] = client
+        return client
+    
+    async def open_http_clients(self, urls: list[str]):
+        """Заранее создать HTTP клиенты для известных upstream хостов"""
+        for url in urls:
+            if url:
+                await self.get_http_client(url)
+    
     async def close(self):
         """Закрыть соединения"""
         if self._redis:
             await self._redis.close()
             self._redis = None
+        for client in self._http_clients.values():
+            await client.aclose()
+        self._http_clients.clear()
         # БД пул закрывается автоматически при завершении приложения
 
 
@@ -1,9 +1,15 @@
-from .errors import ApiError, NotFoundError, InternalServerError, UpstreamError
+from .errors import ApiError, BadRequestError, NotFoundError, InternalServerError, UpstreamError
 from .validators import extract_number, extract_string, extract_datetime, haversine_km, Validators
 from .advisory_lock import advisory_lock, get_lock_key
+from .hashing import content_hash
+from .cursor import encode_cursor, decode_cursor
+from .downsample import lttb
+from .json_body import RawJson, dumps_with_raw
+from .http_cache import make_etag, http_date, conditional_response
 
 __all__ = [
     "ApiError",
+    "BadRequestError",
     "NotFoundError",
     "InternalServerError",
     "UpstreamError",
@@ -13,5 +19,14 @@ __all__ = [
     "haversine_km",
     "advisory_lock",
     "get_lock_key",
+    "content_hash",
+    "encode_cursor",
+    "decode_cursor",
+    "lttb",
+    "RawJson",
+    "dumps_with_raw",
+    "make_etag",
+    "http_date",
+    "conditional_response",
     "Validators",
 ]
@@ -0,0 +1,28 @@
+"""
+Непрозрачные курсоры для keyset-пагинации.
+
+Курсор хранит ключ сортировки и id последней строки страницы; следующая
+страница читается условием (sort_key, id) < (:key, :id) по составному
+индексу, поэтому время ответа не зависит от глубины страницы.
+"""
+from typing import Any
+from datetime import datetime
+import base64
+import json
+from app.utils.errors import BadRequestError
+
+
+def encode_cursor(sort_key: datetime, row_id: int) -> str:
+    """Закодировать позицию последней строки страницы в курсор"""
+    raw = json.dumps({"k": sort_key.isoformat(), "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Раскодировать курсор в (sort_key, id)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data: dict[str, Any] = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(data["k"]), int(data["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise BadRequestError(detail=f"Invalid cursor: {e}")
@@ -0,0 +1,100 @@
+"""
+Утилиты для нормализации событий DONKI (солнечные вспышки FLR и CME).
+
+Каждое событие ответа DONKI становится строкой donki_events с ключом
+activity_id (flrID у вспышек, activityID у CME), временем начала, классом
+(classType вспышки, тип наиболее точного анализа CME) и идентификаторами
+связанных событий. Исходный объект события хранится в payload строки.
+"""
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+# Источник space_cache -> тип события donki_events
+DONKI_EVENT_TYPES = {"flr": "FLR", "cme": "CME"}
+
+# Ключ идентификатора события в ответе DONKI
+_ID_KEYS = {"FLR": "flrID", "CME": "activityID"}
+
+# Время начала события в ответе DONKI
+_START_KEYS = {"FLR": "beginTime", "CME": "startTime"}
+
+
+def parse_donki_time(value: Any) -> Optional[datetime]:
+    """Время DONKI ("2024-01-01T12:34Z") в datetime UTC"""
+    if not isinstance(value, str):
+        return None
+    for fmt in ("%Y-%m-%dT%H:%MZ", "%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%dT%H:%M:%S.%fZ"):
+        try:
+            return datetime.strptime(value, fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    return None
+
+
+def _cme_class(event: dict[str, Any]) -> Optional[str]:
+    """Тип CME (S, C, O, R, ER) из наиболее точного анализа"""
+    analyses = [a for a in event.get("cmeAnalyses") or [] if isinstance(a, dict)]
+    if not analyses:
+        return None
+    accurate = [a for a in analyses if a.get("isMostAccurate")]
+    return (accurate or analyses)[-1].get("type")
+
+
+def normalize_donki_events(source: str, events: Any) -> list[dict[str, Any]]:
+    """
+    Развернуть ответ DONKI FLR/CME в строки событий.
+    
+    Returns:
+        Словари с ключами activity_id, event_type, start_at, peak_at, end_at,
+        class_type, source_location, active_region_num, linked_activity_ids,
+        link, payload
+    """
+    event_type = DONKI_EVENT_TYPES[source]
+    if not isinstance(events, list):
+        return []
+    rows = []
+    for event in events:
+        if not isinstance(event, dict):
+            continue
+        activity_id = event.get(_ID_KEYS[event_type])
+        start_at = parse_donki_time(event.get(_START_KEYS[event_type]))
+        if not activity_id or start_at is None:
+            continue
+        region = event.get("activeRegionNum")
+        rows.append({
+            "activity_id": str(activity_id),
+            "event_type": event_type,
+            "start_at": start_at,
+            "peak_at": parse_donki_time(event.get("peakTime")),
+            "end_at": parse_donki_time(event.get("endTime")),
+            "class_type": event.get("classType") if event_type == "FLR" else _cme_class(event),
+            "source_location": event.get("sourceLocation") or None,
+            "active_region_num": region if isinstance(region, int) else None,
+            "linked_activity_ids": [
+                str(linked["activityID"])
+                for linked in event.get("linkedEvents") or []
+                if isinstance(linked, dict) and linked.get("activityID")
+            ],
+            "link": event.get("link"),
+            "payload": event,
+        })
+    return rows
+
+
+def format_donki_event(row: dict[str, Any]) -> dict[str, Any]:
+    """Событие ответа /donki/events из строки donki_events"""
+    def iso(value: Optional[datetime]) -> Optional[str]:
+        return value.isoformat() if value else None
+    
+    return {
+        "activity_id": row["activity_id"],
+        "type": row["event_type"],
+        "start_at": iso(row["start_at"]),
+        "peak_at": iso(row["peak_at"]),
+        "end_at": iso(row["end_at"]),
+        "class_type": row["class_type"],
+        "source_location": row["source_location"],
+        "active_region_num": row["active_region_num"],
+        "linked_activity_ids": row["linked_activity_ids"],
+        "link": row["link"],
+    }
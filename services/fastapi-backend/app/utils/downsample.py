@@ -0,0 +1,54 @@
+"""
+Прореживание траектории ISS алгоритмом LTTB (Largest-Triangle-Three-Buckets).
+
+Точки делятся на корзины по порядку времени; из каждой корзины берется
+точка, образующая наибольший треугольник с выбранной точкой предыдущей
+корзины и средней точкой следующей. Площадь считается на плоскости
+(lon, lat), поэтому сохраняются повороты трассы и переходы через
+антимеридиан. Первая и последняя точки сохраняются всегда.
+"""
+from typing import Any
+
+
+def lttb(points: list[dict[str, Any]], threshold: int) -> list[dict[str, Any]]:
+    """
+    Проредить точки до threshold штук с сохранением формы.
+    
+    Args:
+        points: Точки с ключами lat/lon, упорядоченные по времени
+        threshold: Целевое количество точек (меньше 3 - без прореживания)
+    """
+    n = len(points)
+    if threshold < 3 or n <= threshold:
+        return points
+    
+    xs = [p["lon"] for p in points]
+    ys = [p["lat"] for p in points]
+    
+    sampled = [points[0]]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    
+    for i in range(threshold - 2):
+        # Средняя точка следующей корзины
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        count = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / count
+        avg_y = sum(ys[next_start:next_end]) / count
+        
+        # Точка текущей корзины с наибольшей площадью треугольника
+        start = int(i * every) + 1
+        end = next_start
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        
+        sampled.append(points[best])
+        a = best
+    
+    sampled.append(points[-1])
+    return sampled
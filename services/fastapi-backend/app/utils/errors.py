@@ -17,6 +17,15 @@ class ApiError(HTTPException):
         super().__init__(status_code=status_code, detail=detail)
 
 
+class BadRequestError(ApiError):
+    def __init__(self, detail: str = "Bad request"):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail,
+            code="BAD_REQUEST",
+        )
+
+
 class NotFoundError(ApiError):
     def __init__(self, detail: str = "Resource not found"):
         super().__init__(
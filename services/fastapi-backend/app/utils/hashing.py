@@ -0,0 +1,14 @@
+from typing import Any
+import hashlib
+import json
+
+
+def content_hash(value: Any) -> str:
+    """
+    Стабильный хэш содержимого JSON-совместимого значения.
+    
+    Ключи сортируются, а разделители фиксированы, поэтому одинаковые по
+    содержимому данные дают одинаковый хэш независимо от порядка ключей.
+    """
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
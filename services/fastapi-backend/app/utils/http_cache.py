@@ -0,0 +1,118 @@
+"""
+Условные HTTP-запросы: ETag / Last-Modified / 304 и Cache-Control.
+
+ETag строится из id строки или хэша содержимого, Last-Modified - из
+fetched_at. Обработчики проверяют If-None-Match / If-Modified-Since по
+метаданным (без чтения payload) и отвечают 304 без тела.
+"""
+from fastapi import Request
+from fastapi.responses import Response
+from app.config.settings import settings
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+
+def make_etag(value: str, weak: bool = False) -> str:
+    """ETag из идентификатора версии (id строки или хэш содержимого)"""
+    tag = f'"{value}"'
+    return f"W/{tag}" if weak else tag
+
+
+def http_date(value: Optional[datetime]) -> Optional[str]:
+    """Дата в формате HTTP (RFC 7231) для Last-Modified"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def max_age_for(interval_seconds: float) -> int:
+    """max-age, согласованный с интервалом планировщика источника"""
+    return max(0, int(interval_seconds * settings.http_cache_max_age_ratio))
+
+
+def is_conditional(request: Optional[Request]) -> bool:
+    """Есть ли в запросе условные заголовки"""
+    if request is None:
+        return False
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def is_not_modified(
+    request: Optional[Request],
+    etag: Optional[str],
+    last_modified: Optional[str],
+) -> bool:
+    """
+    Проверить условные заголовки запроса.
+    
+    If-None-Match имеет приоритет над If-Modified-Since (RFC 7232);
+    ETag сравниваются слабо (без учета префикса W/).
+    """
+    if request is None:
+        return False
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag is None:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        current = etag.removeprefix("W/")
+        return any(
+            candidate.strip().removeprefix("W/") == current
+            for candidate in if_none_match.split(",")
+        )
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+            modified = parsedate_to_datetime(last_modified)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return modified <= since
+    return False
+
+
+def cache_headers(
+    etag: Optional[str],
+    last_modified: Optional[str],
+    max_age: int,
+) -> dict[str, str]:
+    """Заголовки валидаторов и Cache-Control для ответа"""
+    headers = {"Cache-Control": f"public, max-age={max_age}"}
+    if etag:
+        headers["ETag"] = etag
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+    return headers
+
+
+def not_modified_response(
+    etag: Optional[str],
+    last_modified: Optional[str],
+    max_age: int,
+) -> Response:
+    """Ответ 304 без тела"""
+    return Response(status_code=304, headers=cache_headers(etag, last_modified, max_age))
+
+
+def conditional_response(
+    request: Optional[Request],
+    body: str,
+    etag: Optional[str],
+    last_modified: Optional[str],
+    max_age: int,
+) -> Response:
+    """JSON-ответ из готового тела или 304, если у клиента актуальная версия"""
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified, max_age)
+    return Response(
+        content=body.encode("utf-8"),
+        media_type="application/json",
+        headers=cache_headers(etag, last_modified, max_age),
+    )
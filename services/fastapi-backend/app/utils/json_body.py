@@ -0,0 +1,51 @@
+"""
+Сборка JSON-ответов из уже сериализованных фрагментов.
+
+JSONB payload читается из БД как текст (payload::text) и вклеивается в тело
+ответа как есть, без json.loads/json.dumps и валидации pydantic: для
+больших payload (NEO feed) это основная часть CPU и памяти на запрос.
+"""
+from datetime import datetime
+from typing import Any
+import json
+
+
+class RawJson(str):
+    """Строка, которая уже является корректным JSON и вставляется без кодирования"""
+
+
+def json_default(value: Any) -> Any:
+    """Сериализация значений, которые json не умеет кодировать сам"""
+    if isinstance(value, datetime):
+        # Как pydantic: UTC записывается суффиксом Z
+        return value.isoformat().replace("+00:00", "Z")
+    return str(value)
+
+
+def dumps_with_raw(value: Any) -> str:
+    """Сериализовать значение в JSON, вставляя фрагменты RawJson как есть"""
+    if isinstance(value, RawJson):
+        return value
+    if isinstance(value, dict):
+        return "{" + ",".join(
+            f"{json.dumps(str(key))}:{dumps_with_raw(item)}" for key, item in value.items()
+        ) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(dumps_with_raw(item) for item in value) + "]"
+    return json.dumps(value, default=json_default, ensure_ascii=False)
+
+
+def space_latest_body(source: str, fetched_at: datetime, payload: RawJson) -> str:
+    """Тело ответа /space/{source}/latest (формат SpaceLatestResponse)"""
+    return dumps_with_raw({"source": source, "fetched_at": fetched_at, "payload": payload, "message": None})
+
+
+def iss_last_body(row_id: int, fetched_at: datetime, source_url: str, payload: RawJson) -> str:
+    """Тело ответа /iss/last (формат IssLastResponse)"""
+    return dumps_with_raw({
+        "id": row_id,
+        "fetched_at": fetched_at,
+        "source_url": source_url,
+        "payload": payload,
+        "message": None,
+    })
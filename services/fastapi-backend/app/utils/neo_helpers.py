@@ -0,0 +1,155 @@
+"""
+Утилиты для нормализации NEO feed (NASA Asteroids - NeoWs).
+
+Выполняются при сохранении feed: каждое сближение объекта с телом
+становится строкой neo_approaches с числовыми расстоянием, скоростью,
+диаметром, признаком опасности и временем сближения. Строки для ответа
+/astro/events собираются из этих колонок без разбора payload.
+
+Feed также хранится по календарным дням (neo_feed_days): split_neo_windows
+делит дни, которые нужно запросить, на диапазоны размера запроса NeoWs,
+а merge_neo_feed собирает ответ вида feed из дней.
+"""
+from app.utils.validators import extract_number
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Optional
+
+
+def feed_days(feed: Any) -> dict[date, list[dict[str, Any]]]:
+    """Объекты feed по дням"""
+    if not isinstance(feed, dict):
+        return {}
+    days = {}
+    for date_str, objects in (feed.get("near_earth_objects") or {}).items():
+        try:
+            day = date.fromisoformat(date_str)
+        except (TypeError, ValueError):
+            continue
+        days[day] = objects if isinstance(objects, list) else []
+    return days
+
+
+def merge_neo_feed(days: dict[date, list[dict[str, Any]]]) -> dict[str, Any]:
+    """Собрать feed (element_count, near_earth_objects) из объектов по дням"""
+    ordered = sorted(days.items())
+    return {
+        "element_count": sum(len(objects) for _, objects in ordered),
+        "near_earth_objects": {day.isoformat(): objects for day, objects in ordered},
+    }
+
+
+def split_neo_windows(days: list[date], max_days: int) -> list[tuple[date, date]]:
+    """
+    Разбить дни на непрерывные диапазоны не длиннее max_days.
+    
+    Returns:
+        Пары (start_date, end_date) включительно
+    """
+    windows: list[tuple[date, date]] = []
+    for day in sorted(set(days)):
+        if windows:
+            start, end = windows[-1]
+            if day == end + timedelta(days=1) and (day - start).days < max_days:
+                windows[-1] = (start, day)
+                continue
+        windows.append((day, day))
+    return windows
+
+
+def _parse_approach_at(approach: dict[str, Any], date_str: str) -> Optional[datetime]:
+    """Время сближения: epoch в мс, затем "2024-Jan-01 12:34", затем дата дня"""
+    epoch_ms = extract_number(approach.get("epoch_date_close_approach"))
+    if epoch_ms is not None:
+        return datetime.fromtimestamp(epoch_ms / 1000, tz=timezone.utc)
+    full = approach.get("close_approach_date_full")
+    if isinstance(full, str):
+        try:
+            return datetime.strptime(full, "%Y-%b-%d %H:%M").replace(tzinfo=timezone.utc)
+        except ValueError:
+            pass
+    day = approach.get("close_approach_date") or date_str
+    try:
+        return datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    except (TypeError, ValueError):
+        return None
+
+
+def _diameter_m(neo: dict[str, Any]) -> Optional[float]:
+    """Средний оценочный диаметр в метрах"""
+    meters = (neo.get("estimated_diameter") or {}).get("meters") or {}
+    low = extract_number(meters.get("estimated_diameter_min"))
+    high = extract_number(meters.get("estimated_diameter_max"))
+    if low is not None and high is not None:
+        return (low + high) / 2
+    return extract_number(meters.get("estimated_diameter_avg"))
+
+
+def normalize_neo_feed(feed: Any) -> list[dict[str, Any]]:
+    """
+    Развернуть ответ NeoWs feed в строки сближений.
+    
+    Returns:
+        Словари с ключами neo_id, name, approach_at, orbiting_body,
+        miss_distance_km, velocity_kmh, diameter_m, is_hazardous
+    """
+    if not isinstance(feed, dict):
+        return []
+    rows = []
+    for date_str, objects in (feed.get("near_earth_objects") or {}).items():
+        if not isinstance(objects, list):
+            continue
+        for neo in objects:
+            if not isinstance(neo, dict):
+                continue
+            neo_id = str(neo.get("id") or neo.get("neo_reference_id") or "")
+            if not neo_id:
+                continue
+            for approach in neo.get("close_approach_data") or []:
+                if not isinstance(approach, dict):
+                    continue
+                approach_at = _parse_approach_at(approach, date_str)
+                if approach_at is None:
+                    continue
+                rows.append({
+                    "neo_id": neo_id,
+                    "name": neo.get("name") or "Неизвестный объект",
+                    "approach_at": approach_at,
+                    "orbiting_body": approach.get("orbiting_body") or "Earth",
+                    "miss_distance_km": extract_number((approach.get("miss_distance") or {}).get("kilometers")),
+                    "velocity_kmh": extract_number((approach.get("relative_velocity") or {}).get("kilometers_per_hour")),
+                    "diameter_m": _diameter_m(neo),
+                    "is_hazardous": bool(neo.get("is_potentially_hazardous_asteroid")),
+                })
+    return rows
+
+
+def format_neo_event(row: dict[str, Any], number: int) -> dict[str, Any]:
+    """Событие /astro/events из строки neo_approaches (формат прежнего ответа)"""
+    distance_km = f"{row['miss_distance_km']:,.0f}" if row["miss_distance_km"] is not None else "N/A"
+    velocity_kmh = f"{row['velocity_kmh']:,.0f}" if row["velocity_kmh"] is not None else "N/A"
+    diameter_km = f"{row['diameter_m'] / 1000:.2f}" if row["diameter_m"] else "N/A"
+    hazard_status = "Потенциально опасен" if row["is_hazardous"] else "Безопасен"
+    orbiting_body = row["orbiting_body"]
+    return {
+        "number": number,
+        "name": row["name"],
+        "type": f"Сближение с {orbiting_body}",
+        "when": row["approach_at"].strftime("%Y-%m-%d %H:%M:%S UTC"),
+        "approach_at": row["approach_at"].isoformat(),
+        "extra": f"Расстояние: {distance_km} км, "
+                 f"Скорость: {velocity_kmh} км/ч, "
+                 f"Диаметр: {diameter_km} км, "
+                 f"Статус: {hazard_status}",
+        "source": "NASA NeoWs",
+        "neo_id": row["neo_id"],
+        "distance_km": distance_km,
+        "velocity_kmh": velocity_kmh,
+        "diameter_km": diameter_km,
+        "hazard_status": hazard_status,
+        "orbiting_body": orbiting_body,
+        # Числовые значения для сортировки и фильтрации на клиенте
+        "miss_distance_km": row["miss_distance_km"],
+        "relative_velocity_kmh": row["velocity_kmh"],
+        "diameter_m": row["diameter_m"],
+        "is_hazardous": row["is_hazardous"],
+    }
@@ -0,0 +1,66 @@
+"""
+Утилиты для нормализации датасетов NASA OSDR
+
+Аналог оригинальных looksOsdrDict()/flattenOsdr() из Laravel проекта.
+Выполняются при синхронизации, чтобы в osdr_items лежала одна плоская
+строка на датасет с готовыми rest_url и title.
+"""
+from typing import Any, Optional
+
+OSDR_API_BASE = "https://visualization.osdr.nasa.gov/biodata/api/v2"
+
+
+def looks_osdr_dict(raw: dict[str, Any]) -> bool:
+    """
+    Проверяет, является ли словарь объектом вида {"OSD-1": {...}, "OSD-2": {...}}
+    
+    Точная реализация оригинального looksOsdrDict() из PHP:
+    - словарь ключей "OSD-xxx" ИЛИ значения содержат REST_URL
+    """
+    for key, value in raw.items():
+        # Проверяем ключи вида "OSD-xxx"
+        if isinstance(key, str) and key.startswith("OSD-"):
+            return True
+        # Проверяем, содержат ли значения REST_URL
+        if isinstance(value, dict) and ("REST_URL" in value or "rest_url" in value):
+            return True
+    return False
+
+
+def normalize_rest_url(rest_url: Optional[str], dataset_id: Optional[str]) -> Optional[str]:
+    """
+    Привести REST_URL к ссылке на страницу датасета.
+    
+    - URL assay (.../dataset/OSD-940/assay/...) сворачивается до URL датасета
+    - если URL нет, он строится из dataset_id
+    - в конце всегда ?format=browser для перенаправления в браузерную версию
+    """
+    if rest_url and isinstance(rest_url, str) and "/assay/" in rest_url and "/dataset/" in rest_url:
+        # Например: .../dataset/OSD-940/assay/... -> .../dataset/OSD-940
+        parts = rest_url.split("/dataset/")
+        if len(parts) > 1:
+            rest_url = parts[0] + "/dataset/" + parts[1].split("/")[0]
+    
+    if not rest_url and dataset_id:
+        rest_url = f"{OSDR_API_BASE}/dataset/{dataset_id}/"
+    
+    if rest_url and isinstance(rest_url, str):
+        if "?format=" not in rest_url:
+            rest_url = rest_url.rstrip("/") + "/?format=browser"
+        elif "?format=browser" not in rest_url:
+            # Заменяем существующий format на browser
+            rest_url = rest_url.split("?format=")[0] + "?format=browser"
+    
+    return rest_url
+
+
+def flatten_osdr_item(item: dict[str, Any]) -> list[tuple[Optional[str], dict[str, Any]]]:
+    """
+    Развернуть элемент вида {"OSD-1": {...}, "OSD-2": {...}} в отдельные датасеты.
+    
+    Returns:
+        Список пар (dataset_id из ключа или None, сырые данные датасета)
+    """
+    if not looks_osdr_dict(item):
+        return [(None, item)]
+    return [(key, value) for key, value in item.items() if isinstance(value, dict)]
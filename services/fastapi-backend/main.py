@@ -6,11 +6,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.config.settings import settings
 from app.database.connection import init_db
 from app.state.app_state import app_state
-from app.services.scheduler_service import SchedulerService
+from app.clients.nasa_client import NASA_API_BASE, SPACEX_API_BASE
+from app.services.scheduler_service import scheduler_service
+from app.redis.cache import response_cache
+from app.services.iss_stream_service import iss_stream_service
+from app.services.iss_refresh_service import iss_refresh_service
 from app.middleware.error_handler import error_handler
 from app.middleware.rate_limit import limiter, rate_limit_handler
 from slowapi.errors import RateLimitExceeded
-from app.routes import health_routes, iss_routes, osdr_routes, space_routes, jwst_routes, astronomy_routes, cms_routes, telemetry_routes
+from app.routes import health_routes, iss_routes, osdr_routes, space_routes, jwst_routes, astronomy_routes, donki_routes, cms_routes, telemetry_routes
 
 # Настройка логирования
 logging.basicConfig(
@@ -19,10 +23,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Инициализация планировщика
-scheduler = SchedulerService()
-
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Управление жизненным циклом приложения"""
@@ -33,15 +33,36 @@ async def lifespan(app: FastAPI):
     await init_db()
     logger.info("Database initialized")
     
+    # Пул HTTP соединений к внешним API (по одному клиенту на хост)
+    await app_state.open_http_clients([
+        settings.where_iss_url,
+        settings.nasa_api_url,
+        settings.jwst_host,
+        NASA_API_BASE,
+        SPACEX_API_BASE,
+    ])
+    logger.info("HTTP client pool opened")
+    
+    # Подписка на инвалидации кэша ответов
+    await response_cache.start()
+    logger.info("Response cache started")
+    
+    # Подписка на поток позиций ISS для SSE клиентов
+    await iss_stream_service.start()
+    logger.info("ISS stream started")
+    
     # Запуск планировщика
-    await scheduler.start()
+    await scheduler_service.start()
     logger.info("Scheduler started")
     
     yield
     
     # Shutdown
     logger.info("Shutting down FastAPI application...")
-    await scheduler.stop()
+    await scheduler_service.stop()
+    await iss_refresh_service.stop()
+    await response_cache.stop()
+    await iss_stream_service.stop()
     await app_state.close()
     logger.info("Application stopped")
 
@@ -77,6 +98,7 @@ app.include_router(osdr_routes.router, tags=["OSDR"])
 app.include_router(space_routes.router, tags=["Space"])
 app.include_router(jwst_routes.router, tags=["JWST"])
 app.include_router(astronomy_routes.router, tags=["Astronomy"])
+app.include_router(donki_routes.router, tags=["DONKI"])
 app.include_router(cms_routes.router, tags=["CMS"])
 app.include_router(telemetry_routes.router, tags=["Telemetry"])
 
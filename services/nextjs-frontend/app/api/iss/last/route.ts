@@ -1,5 +1,6 @@
 import { NextRequest, NextResponse } from 'next/server'
 import { checkRateLimit, rateLimitConfigs } from '@/utils/rateLimit'
+import { conditionalRequestHeaders, validatorHeaders } from '@/utils/conditional'
 
 // В серверных API routes используем внутренний URL контейнера
 const API_BASE = process.env.API_URL || 'http://fastapi-backend:8000'
@@ -31,9 +32,23 @@ export async function GET(request: NextRequest) {
     const response = await fetch(`${API_BASE}/iss/last`, {
       headers: {
         'Content-Type': 'application/json',
+        ...conditionalRequestHeaders(request),
       },
     })
     
+    // У браузера актуальная версия - отвечаем 304 без тела
+    if (response.status === 304) {
+      return new NextResponse(null, {
+        status: 304,
+        headers: {
+          ...validatorHeaders(response),
+          'X-RateLimit-Limit': rateLimitConfigs.iss.maxRequests.toString(),
+          'X-RateLimit-Remaining': rateLimitResult.remaining.toString(),
+          'X-RateLimit-Reset': new Date(rateLimitResult.resetTime).toISOString(),
+        },
+      })
+    }
+    
     if (!response.ok) {
       const errorText = await response.text()
       console.error(`FastAPI error (${response.status}):`, errorText)
@@ -50,9 +65,12 @@ export async function GET(request: NextRequest) {
       )
     }
     
-    const data = await response.json()
-    return NextResponse.json(data, {
+    // Тело FastAPI передается как есть, без разбора и повторной сериализации
+    const body = await response.text()
+    return new NextResponse(body, {
       headers: {
+        'Content-Type': 'application/json',
+        ...validatorHeaders(response),
         'X-RateLimit-Limit': rateLimitConfigs.iss.maxRequests.toString(),
         'X-RateLimit-Remaining': rateLimitResult.remaining.toString(),
         'X-RateLimit-Reset': new Date(rateLimitResult.resetTime).toISOString(),
@@ -0,0 +1,67 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { checkRateLimit, rateLimitConfigs } from '@/utils/rateLimit'
+
+// В серверных API routes используем внутренний URL контейнера
+const API_BASE = process.env.API_URL || 'http://fastapi-backend:8000'
+
+// Поток не кэшируется и не собирается статически
+export const dynamic = 'force-dynamic'
+
+export async function GET(request: NextRequest) {
+  const rateLimitResult = checkRateLimit(request, rateLimitConfigs.iss)
+  
+  if (!rateLimitResult.allowed) {
+    return NextResponse.json(
+      {
+        error: 'Rate limit exceeded',
+        message: rateLimitResult.message,
+        retryAfter: Math.ceil((rateLimitResult.resetTime - Date.now()) / 1000),
+      },
+      {
+        status: 429,
+        headers: {
+          'Retry-After': Math.ceil((rateLimitResult.resetTime - Date.now()) / 1000).toString(),
+        },
+      }
+    )
+  }
+
+  try {
+    const headers: Record<string, string> = { Accept: 'text/event-stream' }
+    const lastEventId = request.headers.get('last-event-id')
+    if (lastEventId) {
+      headers['Last-Event-ID'] = lastEventId
+    }
+    
+    // Поток SSE от FastAPI передается браузеру как есть
+    const response = await fetch(`${API_BASE}/iss/stream`, {
+      headers,
+      cache: 'no-store',
+      signal: request.signal,
+    })
+    
+    if (!response.ok || !response.body) {
+      const errorText = await response.text()
+      console.error(`FastAPI error (${response.status}):`, errorText)
+      return NextResponse.json(
+        { error: 'Failed to open ISS stream', details: errorText },
+        { status: response.status || 502 }
+      )
+    }
+    
+    return new Response(response.body, {
+      headers: {
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache, no-transform',
+        Connection: 'keep-alive',
+        'X-Accel-Buffering': 'no',
+      },
+    })
+  } catch (error: any) {
+    console.error('Error opening ISS stream:', error)
+    return NextResponse.json(
+      { error: 'Internal server error', details: error.message },
+      { status: 500 }
+    )
+  }
+}
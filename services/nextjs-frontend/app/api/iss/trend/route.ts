@@ -29,11 +29,20 @@ export async function GET(request: NextRequest) {
     const { searchParams } = new URL(request.url)
     const limit = searchParams.get('limit') || '240'
     
+    const url = new URL(`${API_BASE}/iss/trend`)
+    url.searchParams.set('limit', limit)
+    for (const key of ['from', 'to', 'max_points']) {
+      const value = searchParams.get(key)
+      if (value) {
+        url.searchParams.set(key, value)
+      }
+    }
+    
     const controller = new AbortController()
     const timeoutId = setTimeout(() => controller.abort(), 30000) // 30 секунд таймаут
     
     try {
-      const response = await fetch(`${API_BASE}/iss/trend?limit=${limit}`, {
+      const response = await fetch(url.toString(), {
         headers: {
           'Content-Type': 'application/json',
         },
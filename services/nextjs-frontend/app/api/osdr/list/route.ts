@@ -1,5 +1,6 @@
 import { NextRequest, NextResponse } from 'next/server'
 import { checkRateLimit, rateLimitConfigs } from '@/utils/rateLimit'
+import { conditionalRequestHeaders, validatorHeaders } from '@/utils/conditional'
 
 const API_BASE = process.env.API_URL || 'http://fastapi-backend:8000'
 
@@ -30,20 +31,38 @@ export async function GET(request: NextRequest) {
     const { searchParams } = new URL(request.url)
     const limit = searchParams.get('limit') || '20'
     const search = searchParams.get('search') || ''
+    const cursor = searchParams.get('cursor') || ''
     
     const url = new URL(`${API_BASE}/osdr/list`)
     url.searchParams.set('limit', limit)
     if (search) {
       url.searchParams.set('search', search)
     }
+    if (cursor) {
+      url.searchParams.set('cursor', cursor)
+    }
     
     const response = await fetch(url.toString(), {
       headers: {
         'Content-Type': 'application/json',
+        ...conditionalRequestHeaders(request),
       },
       // signal: AbortSignal.timeout(10000),
     })
     
+    // У браузера актуальная версия - отвечаем 304 без тела
+    if (response.status === 304) {
+      return new NextResponse(null, {
+        status: 304,
+        headers: {
+          ...validatorHeaders(response),
+          'X-RateLimit-Limit': rateLimitConfigs.osdr.maxRequests.toString(),
+          'X-RateLimit-Remaining': rateLimitResult.remaining.toString(),
+          'X-RateLimit-Reset': new Date(rateLimitResult.resetTime).toISOString(),
+        },
+      })
+    }
+    
     if (!response.ok) {
       const errorText = await response.text()
       console.error(`FastAPI error (${response.status}):`, errorText)
@@ -53,9 +72,12 @@ export async function GET(request: NextRequest) {
       )
     }
     
-    const data = await response.json()
-    return NextResponse.json(data, {
+    // Тело FastAPI передается как есть, без разбора и повторной сериализации
+    const body = await response.text()
+    return new NextResponse(body, {
       headers: {
+        'Content-Type': 'application/json',
+        ...validatorHeaders(response),
         'X-RateLimit-Limit': rateLimitConfigs.osdr.maxRequests.toString(),
         'X-RateLimit-Remaining': rateLimitResult.remaining.toString(),
         'X-RateLimit-Reset': new Date(rateLimitResult.resetTime).toISOString(),
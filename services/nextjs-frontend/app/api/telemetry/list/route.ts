@@ -29,8 +29,15 @@ export async function GET(request: NextRequest) {
   try {
     const { searchParams } = new URL(request.url)
     const limit = searchParams.get('limit') || '100'
+    const cursor = searchParams.get('cursor') || ''
 
-    const response = await fetch(`${API_BASE}/telemetry/list?limit=${limit}`, {
+    const url = new URL(`${API_BASE}/telemetry/list`)
+    url.searchParams.set('limit', limit)
+    if (cursor) {
+      url.searchParams.set('cursor', cursor)
+    }
+
+    const response = await fetch(url.toString(), {
       headers: {
         'Content-Type': 'application/json',
       },
@@ -64,6 +64,38 @@ export default function IssMapScripts() {
               },
             })
             
+            // Точки трассы (от старых к новым), общие для тренда и потока позиций
+            let trendPoints: any[] = []
+            
+            const renderPoints = (currentLat?: number, currentLon?: number) => {
+              const points = trendPoints
+              
+              if (points.length) {
+                const pts = points.map((p: any) => [p.lat, p.lon])
+                trail.setLatLngs(pts)
+                
+                const targetLat = currentLat !== undefined && !isNaN(currentLat) && currentLat !== 0 ? currentLat : pts[pts.length - 1][0]
+                const targetLon = currentLon !== undefined && !isNaN(currentLon) && currentLon !== 0 ? currentLon : pts[pts.length - 1][1]
+                
+                if (!isNaN(targetLat) && !isNaN(targetLon)) {
+                  marker.setLatLng([targetLat, targetLon])
+                  map.panTo([targetLat, targetLon], { animate: false })
+                }
+              } else if (currentLat !== undefined && currentLon !== undefined && !isNaN(currentLat) && !isNaN(currentLon) && currentLat !== 0 && currentLon !== 0) {
+                marker.setLatLng([currentLat, currentLon])
+                map.panTo([currentLat, currentLon], { animate: false })
+              }
+              
+              const times = points.map((p: any) => new Date(p.at).toLocaleTimeString())
+              speedChart.data.labels = times
+              speedChart.data.datasets[0].data = points.map((p: any) => p.velocity)
+              speedChart.update()
+              
+              altChart.data.labels = times
+              altChart.data.datasets[0].data = points.map((p: any) => p.altitude)
+              altChart.update()
+            }
+            
             // Функция загрузки тренда
             const loadTrend = async () => {
               try {
@@ -87,37 +119,52 @@ export default function IssMapScripts() {
                   return
                 }
                 
-                const points = trendData.points || []
-                
-                if (points.length) {
-                  const pts = points.map((p: any) => [p.lat, p.lon])
-                  trail.setLatLngs(pts)
-                  
-                  const targetLat = !isNaN(currentLat) && currentLat !== 0 ? currentLat : pts[pts.length - 1][0]
-                  const targetLon = !isNaN(currentLon) && currentLon !== 0 ? currentLon : pts[pts.length - 1][1]
-                  
-                  if (!isNaN(targetLat) && !isNaN(targetLon)) {
-                    marker.setLatLng([targetLat, targetLon])
-                    map.panTo([targetLat, targetLon], { animate: false })
-                  }
-                } else if (!isNaN(currentLat) && !isNaN(currentLon) && currentLat !== 0 && currentLon !== 0) {
-                  marker.setLatLng([currentLat, currentLon])
-                  map.panTo([currentLat, currentLon], { animate: false })
-                }
-                
-                const times = points.map((p: any) => new Date(p.at).toLocaleTimeString())
-                speedChart.data.labels = times
-                speedChart.data.datasets[0].data = points.map((p: any) => p.velocity)
-                speedChart.update()
-                
-                altChart.data.labels = times
-                altChart.data.datasets[0].data = points.map((p: any) => p.altitude)
-                altChart.update()
+                trendPoints = trendData.points || []
+                renderPoints(currentLat, currentLon)
               } catch (e) {
                 console.error('Error loading trend:', e)
               }
             }
             
+            // Новые точки приходят по SSE; при недоступности потока - опрос раз в 15 секунд
+            let trendInterval: ReturnType<typeof setInterval> | null = null
+            const startPolling = () => {
+              if (!trendInterval) {
+                trendInterval = setInterval(loadTrend, 15000)
+                mapEl.dataset.intervalId = trendInterval.toString()
+              }
+            }
+            
+            const startStream = () => {
+              if (typeof window.EventSource === 'undefined') {
+                startPolling()
+                return
+              }
+              const source = new window.EventSource('/api/iss/stream')
+              source.addEventListener('position', (event: MessageEvent) => {
+                try {
+                  const point = JSON.parse(event.data)
+                  if (point.lat === null || point.lon === null) {
+                    return
+                  }
+                  const lastPoint = trendPoints[trendPoints.length - 1]
+                  if (lastPoint && new Date(point.at) <= new Date(lastPoint.at)) {
+                    return
+                  }
+                  trendPoints = [...trendPoints, point].slice(-240)
+                  renderPoints(point.lat, point.lon)
+                } catch (e) {
+                  console.error('Error handling ISS position:', e)
+                }
+              })
+              source.onerror = () => {
+                // EventSource переподключается сам; если поток закрыт - переходим на опрос
+                if (source.readyState === window.EventSource.CLOSED) {
+                  startPolling()
+                }
+              }
+            }
+            
             const clearMapData = async () => {
               try {
                 const response = await fetch('/api/iss/clear', {
@@ -126,6 +173,7 @@ export default function IssMapScripts() {
                 const result = await response.json()
                 
                 if (result.success) {
+                  trendPoints = []
                   trail.setLatLngs([])
                   speedChart.data.labels = []
                   speedChart.data.datasets[0].data = []
@@ -149,9 +197,7 @@ export default function IssMapScripts() {
             }
             
             loadTrend()
-            const trendInterval = setInterval(loadTrend, 15000)
-            
-            mapEl.dataset.intervalId = trendInterval.toString()
+            startStream()
             
             mapEl.dataset.initialized = 'true'
           }
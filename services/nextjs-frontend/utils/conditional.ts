@@ -0,0 +1,35 @@
+/**
+ * Conditional HTTP Utility
+ * Проброс условных запросов (ETag / Last-Modified / 304) между браузером и FastAPI
+ */
+
+const REQUEST_HEADERS = ['if-none-match', 'if-modified-since']
+const RESPONSE_HEADERS = ['etag', 'last-modified', 'cache-control']
+
+/**
+ * Условные заголовки запроса браузера для передачи в FastAPI
+ */
+export function conditionalRequestHeaders(request: Request): Record<string, string> {
+  const headers: Record<string, string> = {}
+  for (const name of REQUEST_HEADERS) {
+    const value = request.headers.get(name)
+    if (value) {
+      headers[name] = value
+    }
+  }
+  return headers
+}
+
+/**
+ * Валидаторы и Cache-Control из ответа FastAPI для передачи браузеру
+ */
+export function validatorHeaders(response: Response): Record<string, string> {
+  const headers: Record<string, string> = {}
+  for (const name of RESPONSE_HEADERS) {
+    const value = response.headers.get(name)
+    if (value) {
+      headers[name] = value
+    }
+  }
+  return headers
+}